@@ -13,8 +13,10 @@ Autor: Pablo Jimenez
 =================================================================
 """
 
-from nicegui import ui
+from nicegui import Client, app, ui
 from database.db_handler import DatabaseHandler
+from database.async_db_handler import AsyncDatabaseHandler
+from models.fleet import RobotFleet
 from ui.main_interface import MainInterface
 
 
@@ -30,18 +32,25 @@ def main():
     
     # Inicializar base de datos
     print("[APP] Inicializando base de datos...")
-    db = DatabaseHandler("data/robot_cocina.db")
+    db = DatabaseHandler("data/robot_cocina.db", escritura_diferida=True)
     db.initialize_database()
     print(f"[APP] Base de datos lista. {db.get_recipe_count()} recetas disponibles.")
     
-    # Crear interfaz
-    print("[APP] Creando interfaz de usuario...")
-    interface = MainInterface(db)
+    # La interfaz accede a la BD sin bloquear el bucle de eventos
+    async_db = AsyncDatabaseHandler(db)
     
-    # Página principal
+    # Volcar escrituras pendientes y cerrar el pool al apagar el servidor
+    app.on_shutdown(async_db.close)
+    
+    # Flota de robots: todas las unidades comparten el bucle de eventos
+    flota = RobotFleet()
+    robot_id = flota.agregar(encender=False)
+    
+    # Página principal: una interfaz por navegador (sus propios elementos)
+    # sobre el robot compartido; el bus del robot difunde su estado a todas
     @ui.page('/')
-    def index():
-        interface.create_ui()
+    def index(client: Client):
+        MainInterface(async_db, robot=flota.robot(robot_id)).create_ui(client)
     
     # Configurar y lanzar servidor
     print("[APP] Iniciando servidor web...")
@@ -0,0 +1,20 @@
+"""
+Utilidades compartidas por los benchmarks del bucle de eventos.
+"""
+
+import asyncio
+import time
+
+
+async def sondear_bucle(retrasos: list, periodo: float = 0.01) -> None:
+    """Mide cuánto llega tarde un sleep de `periodo` s (retraso del bucle)."""
+    while True:
+        inicio = time.perf_counter()
+        await asyncio.sleep(periodo)
+        retrasos.append(time.perf_counter() - inicio - periodo)
+
+
+def percentil(valores: list, p: float) -> float:
+    """Percentil `p` (0-1) de `valores`; 0.0 si está vacío."""
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(len(ordenados) * p))] if ordenados else 0.0
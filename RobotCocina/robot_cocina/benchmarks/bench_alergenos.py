@@ -0,0 +1,113 @@
+"""
+BENCHMARK: detección de alérgenos en un catálogo grande.
+
+Compara, sobre N recetas sintéticas:
+- anterior: bucles anidados ingrediente × alérgeno × palabra con `in`
+  (y la lista de claves ya detectadas reconstruida en cada vuelta)
+- detectar(): el autómata Aho-Corasick, receta a receta
+- detectar_catalogo(): el autómata sobre todo el catálogo en una pasada
+
+Comprueba que el autómata encuentra todo lo que encontraba el código
+anterior; las coincidencias de más son nombres con tildes que la
+búsqueda anterior no plegaba ("Salmón", "Atún").
+
+Uso (desde robot_cocina/):
+    python -m benchmarks.bench_alergenos [--recetas 100000]
+"""
+
+import argparse
+import random
+import time
+
+from models.alergenos import ALERGENOS, DetectorAlergenos
+from models.receta import Receta, Ingrediente
+
+NOMBRES = [
+    "Tomate triturado", "Cebolla", "Ajo", "Aceite de oliva", "Sal", "Pimienta negra",
+    "Harina de trigo", "Leche entera", "Mantequilla", "Huevos", "Queso rallado",
+    "Nata para cocinar", "Salmón fresco", "Merluza", "Atún en lata", "Gambas peladas",
+    "Mejillones", "Calamar", "Salsa de soja", "Tofu firme", "Almendras tostadas",
+    "Piñones", "Nueces", "Apio", "Mostaza de Dijon", "Semillas de sésamo", "Pan rallado",
+    "Pasta seca", "Arroz bomba", "Pollo troceado", "Ternera picada", "Zanahoria",
+    "Patata", "Calabacín", "Pimiento rojo", "Champiñones", "Espinacas frescas",
+    "Caldo de verduras", "Vino blanco", "Azúcar", "Limón", "Perejil", "Comino",
+]
+
+
+def _catalogo(n: int, semilla: int = 7) -> list:
+    rng = random.Random(semilla)
+    return [
+        Receta(
+            nombre=f"Receta {i}",
+            descripcion="",
+            ingredientes=[Ingrediente(nombre, 100, "g") for nombre in rng.sample(NOMBRES, rng.randint(4, 12))],
+            pasos=[],
+            tiempo_total=0,
+        )
+        for i in range(n)
+    ]
+
+
+def _detectar_anterior(ingredientes) -> list:
+    """MainInterface._detectar_alergenos antes del autómata."""
+    alergenos_detectados = []
+    for ing in ingredientes:
+        nombre_lower = ing.nombre.lower()
+        for alergeno_key, alergeno_info in ALERGENOS.items():
+            if alergeno_key not in [a['key'] for a in alergenos_detectados]:
+                for ingrediente_alergeno in alergeno_info['ingredientes']:
+                    if ingrediente_alergeno in nombre_lower:
+                        alergenos_detectados.append({
+                            'key': alergeno_key,
+                            'icono': alergeno_info['icono'],
+                            'nombre': alergeno_info['nombre'],
+                            'color': alergeno_info['color'],
+                            'encontrado_en': ing.nombre
+                        })
+                        break
+    return alergenos_detectados
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--recetas", type=int, default=100_000)
+    args = parser.parse_args()
+
+    recetas = _catalogo(args.recetas)
+    ingredientes = sum(len(r.ingredientes) for r in recetas)
+    print(f"{args.recetas} recetas, {ingredientes} ingredientes\n")
+
+    inicio = time.perf_counter()
+    detector = DetectorAlergenos()
+    compilar = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    anterior = [_detectar_anterior(r.ingredientes) for r in recetas]
+    t_anterior = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    actual = [detector.detectar(r.ingredientes) for r in recetas]
+    t_actual = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    catalogo = detector.detectar_catalogo(recetas)
+    t_catalogo = time.perf_counter() - inicio
+
+    extra = 0
+    for a, b, c in zip(anterior, actual, catalogo):
+        claves_a, claves_b = {x['key'] for x in a}, [x['key'] for x in b]
+        assert claves_a <= set(claves_b), "El autómata ha perdido un alérgeno"
+        assert set(claves_b) == set(c), "detectar y detectar_catalogo no coinciden"
+        extra += len(claves_b) - len(claves_a)
+
+    print(f"{'método':<22} {'total (s)':>10} {'µs/receta':>10} {'vs anterior':>12}")
+    for nombre, t in (("anterior (bucles)", t_anterior),
+                      ("detectar()", t_actual),
+                      ("detectar_catalogo()", t_catalogo)):
+        print(f"{nombre:<22} {t:>10.2f} {t / len(recetas) * 1e6:>10.1f} {t_anterior / t:>11.1f}x")
+    print(f"\nCompilar el autómata: {compilar * 1e3:.2f} ms · "
+          f"alérgenos de más por tildes plegadas: {extra}")
+
+
+if __name__ == "__main__":
+    main()
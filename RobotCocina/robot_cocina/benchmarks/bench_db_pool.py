@@ -0,0 +1,92 @@
+"""
+BENCHMARK: conexión por llamada vs pool de conexiones.
+
+Simula cargas concurrentes de la página de recetas (get_all_recipes y,
+por cada tarjeta, get_notes + is_favorite) y mide la latencia por llamada.
+
+Uso (desde robot_cocina/):
+    python -m benchmarks.bench_db_pool [--hilos 8] [--cargas 20]
+"""
+
+import argparse
+import os
+import sqlite3
+import statistics
+import tempfile
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from database.db_handler import DatabaseHandler
+
+
+class HandlerSinPool(DatabaseHandler):
+    """Comportamiento anterior: abre y cierra una conexión por llamada."""
+
+    @contextmanager
+    def get_connection(self):
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+
+def _cargar_pagina(db, tiempos):
+    inicio = time.perf_counter()
+    recetas = db.get_all_recipes()
+    tiempos["get_all_recipes"].append(time.perf_counter() - inicio)
+    for r in recetas:
+        inicio = time.perf_counter()
+        db.get_notes(r.id)
+        tiempos["get_notes"].append(time.perf_counter() - inicio)
+        inicio = time.perf_counter()
+        db.is_favorite(r.id)
+        tiempos["is_favorite"].append(time.perf_counter() - inicio)
+
+
+def medir(db, hilos: int, cargas: int) -> dict:
+    tiempos = defaultdict(list)
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=hilos) as ex:
+        for f in [ex.submit(_cargar_pagina, db, tiempos) for _ in range(cargas)]:
+            f.result()
+    total = time.perf_counter() - inicio
+    resultado = {"total_s": total}
+    for metodo, muestras in tiempos.items():
+        muestras.sort()
+        resultado[metodo] = (
+            statistics.mean(muestras) * 1e6,
+            muestras[int(len(muestras) * 0.95)] * 1e6,
+        )
+    return resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--hilos", type=int, default=8)
+    parser.add_argument("--cargas", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        ruta = os.path.join(tmp, "bench.db")
+        pooled = DatabaseHandler(ruta, pool_size=args.hilos)
+        pooled.initialize_database()
+        sin_pool = HandlerSinPool(ruta)
+
+        print(f"{args.cargas} cargas de página con {args.hilos} hilos "
+              f"({pooled.get_recipe_count()} recetas)\n")
+        for nombre, db in (("conexión por llamada", sin_pool), ("pool", pooled)):
+            r = medir(db, args.hilos, args.cargas)
+            print(f"== {nombre}: {r['total_s']:.3f}s total")
+            for metodo in ("get_all_recipes", "get_notes", "is_favorite"):
+                media, p95 = r[metodo]
+                print(f"   {metodo:16s} media {media:8.1f} µs   p95 {p95:8.1f} µs")
+        print(f"\nPool: {pooled.get_pool_stats()}")
+        pooled.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+BENCHMARK: filtro "sin alérgenos" del explorador sobre un catálogo grande.
+
+Genera N recetas con perfil (la máscara de alérgenos se reparte con
+frecuencias parecidas a las del catálogo de fábrica) y mide la primera
+página y una página profunda del explorador con:
+- columna: query_recipes(excluir_alergenos=...), con la máscara en
+  recetas.alergenos dentro del índice de resumen
+- join: la misma consulta leyendo la máscara de receta_perfil (una
+  búsqueda por clave primaria por cada fila recorrida)
+
+Cuanto más excluye el filtro, más filas hay que recorrer para llenar
+una página; el último caso (todos los alérgenos) es el peor.
+
+Uso (desde robot_cocina/):
+    python -m benchmarks.bench_filtro_alergenos [--recetas 500000]
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from database.db_handler import DatabaseHandler
+from models.alergenos import ALERGENOS, mascara_alergenos
+from models.perfil import VERSION_PERFIL
+
+# Probabilidad de que una receta contenga cada alérgeno
+FRECUENCIAS = {
+    'gluten': 0.35, 'lactosa': 0.45, 'huevo': 0.25, 'frutos_secos': 0.08, 'pescado': 0.12,
+    'marisco': 0.06, 'soja': 0.05, 'apio': 0.08, 'mostaza': 0.03, 'sesamo': 0.02,
+}
+FILTROS = [
+    ['gluten'],
+    ['gluten', 'lactosa'],
+    ['gluten', 'lactosa', 'huevo', 'frutos_secos'],
+    list(ALERGENOS),
+]
+PAGINA = 25
+
+
+def _poblar(db: DatabaseHandler, n: int, semilla: int = 3):
+    rng = random.Random(semilla)
+    with db.get_connection() as conn:
+        inicio = conn.execute('SELECT COALESCE(MAX(id), 0) FROM recetas').fetchone()[0] + 1
+        conn.executemany('''
+            INSERT INTO recetas (id, nombre, descripcion, ingredientes, pasos, tiempo_total, porciones, dificultad)
+            VALUES (?, ?, ?, '[]', '[]', ?, 4, ?)
+        ''', [(inicio + i, f"Receta {rng.random():.8f}", "Receta sintética",
+               rng.randint(300, 3600), rng.choice(("Fácil", "Media", "Difícil")))
+              for i in range(n)])
+        conn.executemany('''
+            INSERT INTO receta_perfil (receta_id, calorias, proteinas, carbohidratos, grasas,
+                                       alergenos, cobertura, version)
+            VALUES (?, 0, 0, 0, 0, ?, 1, ?)
+        ''', [(inicio + i, mascara_alergenos(k for k, p in FRECUENCIAS.items() if rng.random() < p),
+               VERSION_PERFIL) for i in range(n)])
+        conn.commit()
+
+
+def _consulta_join(db: DatabaseHandler, excluir, offset: int) -> list:
+    """El mismo listado sin la columna: máscara leída de receta_perfil."""
+    with db.get_connection() as conn:
+        return conn.execute(f'''
+            SELECT {db._COLUMNAS_RESUMEN} FROM recetas r
+            JOIN receta_perfil pf ON pf.receta_id = r.id
+            WHERE (pf.alergenos & ?) = 0
+            ORDER BY r.es_fabrica DESC, r.nombre
+            LIMIT ? OFFSET ?
+        ''', (mascara_alergenos(excluir), PAGINA, offset)).fetchall()
+
+
+def _ms(funcion, repeticiones: int = 3) -> float:
+    mejor = float('inf')
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor * 1e3
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--recetas", type=int, default=500_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseHandler(os.path.join(tmp, "bench.db"), cache_size=0)
+        db.initialize_database()
+        inicio = time.perf_counter()
+        _poblar(db, args.recetas)
+        print(f"{db.get_recipe_count()} recetas generadas en {time.perf_counter() - inicio:.1f} s\n")
+
+        print(f"{'excluye':<42} {'pasan':>8} {'columna p1':>11} {'join p1':>9} "
+              f"{'columna p200':>13} {'join p200':>10}  (ms)")
+        for excluir in FILTROS:
+            with db.get_connection() as conn:
+                pasan = conn.execute('SELECT COUNT(*) FROM recetas WHERE (alergenos & ?) = 0',
+                                     (mascara_alergenos(excluir),)).fetchone()[0]
+            columna = db.query_recipes(excluir_alergenos=excluir, limit=PAGINA, resumen=True)
+            join = _consulta_join(db, excluir, 0)
+            assert [r.id for r in columna] == [f['id'] for f in join], "Los dos planes no coinciden"
+
+            profunda = 200 * PAGINA
+            tiempos = [
+                _ms(lambda: db.query_recipes(excluir_alergenos=excluir, limit=PAGINA, resumen=True)),
+                _ms(lambda: _consulta_join(db, excluir, 0)),
+                _ms(lambda: db.query_recipes(excluir_alergenos=excluir, limit=PAGINA,
+                                             offset=profunda, resumen=True)),
+                _ms(lambda: _consulta_join(db, excluir, profunda)),
+            ]
+            nombre = ', '.join(excluir) if len(excluir) < len(ALERGENOS) else 'todos'
+            print(f"{nombre:<42} {pasan:>8} {tiempos[0]:>11.2f} {tiempos[1]:>9.2f} "
+                  f"{tiempos[2]:>13.2f} {tiempos[3]:>10.2f}")
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+BENCHMARK: cuántos robots pueden cocinar a la vez en un proceso.
+
+Lanza N robots de una RobotFleet (RelojReal) con la misma receta y
+mide, para cada N:
+- deriva media y máxima por paso (segundos de retraso sobre el plan)
+- retraso del bucle de eventos visto por una sonda cada 10 ms
+- CPU del proceso y actualizaciones de progreso entregadas por segundo
+  (los ticks que llegan tarde se agrupan: bajo saturación hay menos)
+- coste de get_metricas() y snapshots() con la flota en marcha
+
+Se considera que el proceso "sostiene" N robots mientras la deriva
+media por paso y el retraso p99 del bucle quedan por debajo del
+umbral (50 ms por defecto).
+
+Uso (desde robot_cocina/):
+    python -m benchmarks.bench_flota [--robots 50,200,500,1000,2000,3000] [--umbral-ms 50]
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import time
+
+from benchmarks._comun import percentil, sondear_bucle
+from models.fleet import RobotFleet
+from models.receta import Receta, Ingrediente
+
+# 2 pasos de 200 s a velocidad 0.01 → 2 s reales cada uno, en 100 ticks de 20 ms
+PASOS = [
+    {"tipo": "temperatura", "operacion": "sofreir", "duracion": 200, "temperatura": 120, "velocidad": 1},
+    {"tipo": "mecanica", "nombre": "Mezclar", "duracion": 200, "velocidad": 3},
+]
+VELOCIDAD = 0.01
+RECETA = Receta("Receta de flota", "", [Ingrediente("agua", 1000, "ml")], PASOS, 400, id=1)
+
+
+async def medir(n: int) -> dict:
+    flota = RobotFleet(velocidad_simulacion=VELOCIDAD)
+    with contextlib.redirect_stdout(io.StringIO()):
+        ids = [flota.agregar() for _ in range(n)]
+        ticks = 0
+
+        def al_progreso(_):
+            nonlocal ticks
+            ticks += 1
+
+        for rid in ids:
+            flota.robot(rid).registrar_callback_progreso(al_progreso)
+
+        retrasos: list = []
+        sonda = asyncio.create_task(sondear_bucle(retrasos))
+        cpu = time.process_time()
+        inicio = time.perf_counter()
+
+        for rid in ids:
+            flota.lanzar(rid, RECETA)
+
+        # A mitad de la receta: coste de consultar la flota en marcha
+        await asyncio.sleep(1.0)
+        t = time.perf_counter()
+        flota.get_metricas()
+        coste_metricas = time.perf_counter() - t
+        t = time.perf_counter()
+        flota.snapshots()
+        coste_snapshots = time.perf_counter() - t
+
+        await flota.esperar()
+        duracion = time.perf_counter() - inicio
+        cpu = time.process_time() - cpu
+        sonda.cancel()
+
+    metricas = flota.get_metricas()
+    assert metricas["recetas_completadas"] == n, metricas
+    return {
+        "n": n,
+        "duracion": duracion,
+        "deriva_media": metricas["deriva_media"],
+        "deriva_max": metricas["deriva_max"],
+        "lag_p99": percentil(retrasos, 0.99),
+        "cpu": cpu / duracion,
+        "progreso_s": ticks / duracion,
+        "metricas_ms": coste_metricas * 1e3,
+        "snapshots_ms": coste_snapshots * 1e3,
+    }
+
+
+async def main_async(niveles: list, umbral: float):
+    nominal = sum(max(2.0, p["duracion"] * VELOCIDAD) for p in PASOS)
+    print(f"Receta de {len(PASOS)} pasos, {nominal:.0f} s nominales por robot\n")
+    print(f"{'robots':>7} {'real (s)':>9} {'deriva media':>13} {'deriva máx':>11} "
+          f"{'lag p99':>9} {'CPU':>6} {'progreso/s':>11} {'métricas':>9} {'snapshots':>10}")
+
+    sostenidos = 0
+    for n in niveles:
+        r = await medir(n)
+        ok = r["deriva_media"] < umbral and r["lag_p99"] < umbral
+        if ok:
+            sostenidos = n
+        print(f"{n:>7} {r['duracion']:>9.2f} {r['deriva_media'] * 1e3:>10.1f} ms "
+              f"{r['deriva_max'] * 1e3:>8.1f} ms {r['lag_p99'] * 1e3:>6.1f} ms "
+              f"{r['cpu']:>6.0%} {r['progreso_s']:>11,.0f} {r['metricas_ms']:>6.2f} ms "
+              f"{r['snapshots_ms']:>7.2f} ms {'' if ok else ' ← saturado'}")
+
+    print(f"\nRobots cocinando a la vez dentro de {umbral * 1e3:.0f} ms de deriva: {sostenidos}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--robots", default="50,200,500,1000,2000,3000",
+                        help="Tamaños de flota separados por comas")
+    parser.add_argument("--umbral-ms", type=float, default=50.0)
+    args = parser.parse_args()
+    niveles = [int(n) for n in args.robots.split(",")]
+    asyncio.run(main_async(niveles, args.umbral_ms / 1e3))
+
+
+if __name__ == "__main__":
+    main()
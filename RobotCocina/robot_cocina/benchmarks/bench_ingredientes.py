@@ -0,0 +1,88 @@
+"""
+BENCHMARK: resolución de nombres de ingredientes a alimentos.
+
+Genera N nombres como los que escriben los usuarios: cada alimento de
+INFO_NUTRICIONAL con variantes de mayúsculas, tildes, plural y
+adjetivos ("Champiñones frescos", "champinon", "CHAMPIÑON laminado"),
+repartidos con una distribución de Zipf (unos pocos nombres muy
+repetidos y una cola larga). Compara:
+- anterior: nombre.lower() y recorrido de la tabla por subcadenas en
+  cada llamada, sin caché
+- resolutor: ResolutorIngredientes con cachés de varios tamaños
+
+Mide cuántos nombres acaban en el alimento del que salieron
+(coherencia), el tiempo por nombre y el hit rate de la caché.
+
+Uso (desde robot_cocina/):
+    python -m benchmarks.bench_ingredientes [--nombres 200000]
+"""
+
+import argparse
+import random
+import time
+
+from models.ingredientes import SIN_ALIMENTO, ResolutorIngredientes
+from models.nutricion import INFO_NUTRICIONAL
+
+ADJETIVOS = ["", " fresco", " frescos", " picado", " en rodajas", " de temporada", " ecológico",
+             " troceado", " laminado", " al gusto"]
+TAMAÑOS_CACHE = (64, 512, 4096)
+
+
+def _plural(palabra: str) -> str:
+    if palabra.endswith('z'):
+        return palabra[:-1] + 'ces'
+    return palabra + ('s' if palabra[-1] in 'aeiouáéíóú' else 'es')
+
+
+def _sin_tildes(texto: str) -> str:
+    return texto.translate(str.maketrans('áéíóúñ', 'aeioun'))
+
+
+def _variantes(alimento: str) -> list:
+    base = alimento.rstrip('s') if alimento.endswith('as') else alimento
+    formas = {base, _plural(base), _sin_tildes(base), _sin_tildes(_plural(base))}
+    return sorted(f"{forma}{adjetivo}" for forma in formas for adjetivo in ADJETIVOS)
+
+
+def _nombres(n: int, semilla: int = 5) -> list:
+    rng = random.Random(semilla)
+    distintos = [(i, v) for i, alimento in enumerate(INFO_NUTRICIONAL) for v in _variantes(alimento)]
+    rng.shuffle(distintos)
+    pesos = [1 / (k + 1) for k in range(len(distintos))]
+    elegidos = rng.choices(distintos, weights=pesos, k=n)
+    return [(i, nombre.capitalize() if rng.random() < 0.5 else nombre) for i, nombre in elegidos]
+
+
+def _resolver_anterior(nombre: str) -> int:
+    """MotorNutricional.resolver sin caché, como en _calcular_nutricion."""
+    nombre_lower = nombre.lower()
+    return next((i for i, clave in enumerate(INFO_NUTRICIONAL) if clave in nombre_lower), SIN_ALIMENTO)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--nombres", type=int, default=200_000)
+    args = parser.parse_args()
+
+    nombres = _nombres(args.nombres)
+    print(f"{len(nombres)} nombres, {len({n for _, n in nombres})} distintos\n")
+    print(f"{'método':<20} {'coherentes':>11} {'µs/nombre':>10} {'hit rate':>9}")
+
+    inicio = time.perf_counter()
+    coherentes = sum(_resolver_anterior(nombre) == i for i, nombre in nombres)
+    t = time.perf_counter() - inicio
+    print(f"{'anterior':<20} {coherentes / len(nombres):>11.1%} {t / len(nombres) * 1e6:>10.2f} {'-':>9}")
+
+    for tamaño in TAMAÑOS_CACHE:
+        resolutor = ResolutorIngredientes(INFO_NUTRICIONAL, cache_size=tamaño)
+        inicio = time.perf_counter()
+        coherentes = sum(resolutor.alimento(nombre) == i for i, nombre in nombres)
+        t = time.perf_counter() - inicio
+        stats = resolutor.get_stats()
+        print(f"{f'resolutor ({tamaño})':<20} {coherentes / len(nombres):>11.1%} "
+              f"{t / len(nombres) * 1e6:>10.2f} {stats['hit_rate']:>9.1%}")
+
+
+if __name__ == "__main__":
+    main()
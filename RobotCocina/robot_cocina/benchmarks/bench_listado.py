@@ -0,0 +1,92 @@
+"""
+BENCHMARK: coste de listar recetas (carga completa vs diferida vs resumen).
+
+Genera N recetas sintéticas y mide tiempo y memoria (tracemalloc) de:
+- Receta.from_dict eager (comportamiento anterior)
+- RecetaLazy (JSON sin decodificar hasta el primer acceso)
+- query_recipes(resumen=True) (proyección sin los JSON)
+
+Uso (desde robot_cocina/):
+    python -m benchmarks.bench_listado [--recetas 50000]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+from database.db_handler import DatabaseHandler
+from models.receta import Receta, Ingrediente
+
+
+def _receta_sintetica(i: int) -> Receta:
+    return Receta(
+        nombre=f"Receta sintética {i:06d}",
+        descripcion="Receta generada para el benchmark de listados",
+        ingredientes=[Ingrediente(f"ingrediente {j}", 100 + j, "g") for j in range(8)],
+        pasos=[
+            {"tipo": "temperatura", "operacion": "hervir", "duracion": 300,
+             "temperatura": 100, "velocidad": 1, "descripcion": f"Paso {j}"}
+            for j in range(5)
+        ],
+        tiempo_total=1500,
+        dificultad=("Fácil", "Media", "Difícil")[i % 3],
+    )
+
+
+def _poblar(db: DatabaseHandler, n: int):
+    with db.get_connection() as conn:
+        for i in range(n):
+            r = _receta_sintetica(i)
+            d = r.to_dict()
+            cursor = conn.execute('''
+                INSERT INTO recetas (nombre, descripcion, ingredientes, pasos, tiempo_total, porciones, dificultad, es_fabrica)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (d['nombre'], d['descripcion'], d['ingredientes'], d['pasos'],
+                  d['tiempo_total'], d['porciones'], d['dificultad'], d['es_fabrica']))
+            db._guardar_detalle(conn, cursor.lastrowid, r)
+        conn.commit()
+
+
+def medir(nombre: str, funcion):
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    resultado = funcion()
+    # Recorrer lo que pinta una tarjeta del explorador
+    for r in resultado:
+        r.nombre, r.descripcion, r.tiempo_str, r.dificultad
+    duracion = time.perf_counter() - inicio
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"   {nombre:28s} {duracion * 1000:9.1f} ms   pico {pico / 1e6:8.1f} MB")
+    return resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--recetas", type=int, default=50000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseHandler(os.path.join(tmp, "bench.db"), cache_size=0)
+        db.initialize_database()
+        _poblar(db, args.recetas)
+        total = db.get_recipe_count()
+        print(f"Listado de {total} recetas\n")
+
+        with db.get_connection() as conn:
+            filas = conn.execute('SELECT * FROM recetas ORDER BY es_fabrica DESC, nombre').fetchall()
+        print("== Deserialización de filas ya leídas")
+        medir("eager (Receta)", lambda: [Receta.from_dict(dict(f)) for f in filas])
+        medir("diferida (RecetaLazy)", lambda: [Receta.from_dict(dict(f), lazy=True) for f in filas])
+        del filas
+
+        print("\n== Consulta + deserialización")
+        medir("query_recipes()", lambda: db.query_recipes(limit=None))
+        medir("query_recipes(resumen=True)", lambda: db.query_recipes(limit=None, resumen=True))
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
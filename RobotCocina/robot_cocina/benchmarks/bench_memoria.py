@@ -0,0 +1,116 @@
+"""
+BENCHMARK: memoria de N recetas según su representación.
+
+Compara (con tracemalloc) la memoria retenida por:
+- dataclasses con __dict__ (representación anterior)
+- dataclasses con __slots__ (Receta / Ingrediente actuales)
+- RecetaBatch (arrays paralelos)
+y la de N tareas con y sin __slots__.
+
+Uso (desde robot_cocina/):
+    python -m benchmarks.bench_memoria [--recetas 100000]
+"""
+
+import argparse
+import gc
+import time
+import tracemalloc
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from models.receta import Receta, Ingrediente
+from models.receta_batch import RecetaBatch
+from models.tarea import TareaTemperatura, TipoOperacion
+
+INGREDIENTES = ["tomate", "cebolla", "ajo", "aceite de oliva", "sal", "pimienta",
+                "pollo", "arroz", "harina", "leche", "huevo", "mantequilla"]
+UNIDADES = ["g", "ml", "unidad", "cucharada"]
+
+
+@dataclass
+class IngredienteDict:
+    nombre: str
+    cantidad: float
+    unidad: str
+
+
+@dataclass
+class RecetaDict:
+    nombre: str
+    descripcion: str
+    ingredientes: List[IngredienteDict]
+    pasos: List[Dict[str, Any]]
+    tiempo_total: int
+    porciones: int = 4
+    dificultad: str = "Media"
+    es_fabrica: bool = False
+    id: Optional[int] = None
+
+
+class TareaConDict:
+    """Tarea equivalente a TareaTemperatura sin __slots__."""
+
+    def __init__(self, operacion, duracion, temperatura, velocidad=1, descripcion=""):
+        self._nombre = operacion.value.title()
+        self._duracion = duracion
+        self._descripcion = descripcion
+        self._operacion = operacion
+        self._temperatura = temperatura
+        self._velocidad = velocidad
+
+
+def _datos(i: int):
+    """Campos de la receta sintética i (nombres compartidos, como en un catálogo real)."""
+    ings = [(INGREDIENTES[(i + j) % len(INGREDIENTES)], float(50 + j * 10),
+             UNIDADES[j % len(UNIDADES)]) for j in range(8)]
+    pasos = [{"tipo": "temperatura", "operacion": "hervir", "duracion": 300,
+              "temperatura": 100, "velocidad": 1} for _ in range(4)]
+    return f"Receta {i:06d}", ings, pasos
+
+
+def _con_dict(i):
+    nombre, ings, pasos = _datos(i)
+    return RecetaDict(nombre, "", [IngredienteDict(*x) for x in ings], pasos, 1200, id=i)
+
+
+def _con_slots(i):
+    nombre, ings, pasos = _datos(i)
+    return Receta(nombre, "", [Ingrediente(*x) for x in ings], pasos, 1200, id=i)
+
+
+def medir(nombre: str, construir) -> float:
+    gc.collect()
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    resultado = construir()
+    duracion = time.perf_counter() - inicio
+    actual, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del resultado
+    gc.collect()
+    print(f"   {nombre:32s} {actual / 1e6:8.1f} MB   {duracion:6.2f} s")
+    return actual
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--recetas", type=int, default=100000)
+    args = parser.parse_args()
+    n = args.recetas
+
+    print(f"== {n} recetas (8 ingredientes, 4 pasos cada una)")
+    base = medir("dataclass con __dict__", lambda: [_con_dict(i) for i in range(n)])
+    slots = medir("dataclass con __slots__", lambda: [_con_slots(i) for i in range(n)])
+    batch = medir("RecetaBatch (columnar)", lambda: RecetaBatch(_con_slots(i) for i in range(n)))
+    print(f"   __slots__: {slots / base:.0%} de la original · columnar: {batch / base:.0%}")
+
+    print(f"\n== {n} tareas")
+    t_dict = medir("Tarea con __dict__",
+                   lambda: [TareaConDict(TipoOperacion.HERVIR, 300, 100) for _ in range(n)])
+    t_slots = medir("Tarea con __slots__",
+                    lambda: [TareaTemperatura(TipoOperacion.HERVIR, 300, 100) for _ in range(n)])
+    print(f"   __slots__: {t_slots / t_dict:.0%} de la original")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+BENCHMARK: observadores lentos con entrega síncrona frente al bus.
+
+Un robot cocina una receta de 2 pasos (4 s nominales, ticks de 20 ms)
+con K observadores que tardan `coste` ms cada uno, como una interfaz
+que reconstruye elementos en cada notificación:
+- síncrono: agregar_observador → cada tick ejecuta a todos los observadores
+- bus: suscribir(intervalo) → entrega asíncrona, fusionada y limitada
+
+Mide la duración real de la receta (deriva), el retraso del bucle de
+eventos y las entregas por segundo que recibe cada observador (lo que
+acabaría viajando por el websocket de cada navegador).
+
+Uso (desde robot_cocina/):
+    python -m benchmarks.bench_notificaciones [--observadores 10] [--coste-ms 3] [--intervalo 0.1]
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import time
+
+from benchmarks._comun import percentil, sondear_bucle
+from models.receta import Receta, Ingrediente
+from models.robot import Robot, ObservadorCallbacks
+
+PASOS = [
+    {"tipo": "temperatura", "operacion": "sofreir", "duracion": 200, "temperatura": 120, "velocidad": 1},
+    {"tipo": "mecanica", "nombre": "Mezclar", "duracion": 200, "velocidad": 3},
+]
+NOMINAL = 4.0
+RECETA = Receta("Receta de notificaciones", "", [Ingrediente("agua", 1000, "ml")], PASOS, 400, id=1)
+
+
+async def medir(modo: str, observadores: int, coste: float, intervalo: float) -> dict:
+    robot = Robot()
+    robot.velocidad_simulacion = 0.01
+    entregas = [0] * observadores
+
+    def observador(k: int) -> ObservadorCallbacks:
+        def al_progreso(_):
+            entregas[k] += 1
+            fin = time.perf_counter() + coste
+            while time.perf_counter() < fin:
+                pass
+        return ObservadorCallbacks(on_progreso=al_progreso)
+
+    for k in range(observadores):
+        if modo == "sincrono":
+            robot.agregar_observador(observador(k))
+        else:
+            robot.suscribir(observador(k), intervalo=intervalo)
+
+    retrasos: list = []
+    sonda = asyncio.create_task(sondear_bucle(retrasos))
+    with contextlib.redirect_stdout(io.StringIO()):
+        robot.encender()
+        robot.preparar_receta(RECETA)
+        inicio = time.perf_counter()
+        await robot.comenzar_receta()
+        duracion = time.perf_counter() - inicio
+        await asyncio.sleep(intervalo + 0.05)  # últimas entregas pendientes
+    sonda.cancel()
+
+    return {
+        "duracion": duracion,
+        "lag_p99": percentil(retrasos, 0.99),
+        "por_observador": sum(entregas) / observadores / duracion,
+        "stats": robot.get_stats_notificaciones(),
+    }
+
+
+async def main_async(observadores: int, coste: float, intervalo: float):
+    print(f"== {observadores} observadores de {coste * 1e3:.1f} ms · receta de {NOMINAL:.0f} s (ticks de 20 ms)\n")
+    print(f"{'modo':>22} {'real (s)':>9} {'deriva':>9} {'lag p99':>9} {'entregas/s/obs':>15}")
+    for modo, nombre in (("sincrono", "agregar_observador"), ("bus", f"suscribir({intervalo:g} s)")):
+        r = await medir(modo, observadores, coste, intervalo)
+        print(f"{nombre:>22} {r['duracion']:>9.2f} {r['duracion'] - NOMINAL:>+8.2f}s "
+              f"{r['lag_p99'] * 1e3:>6.1f} ms {r['por_observador']:>15.1f}")
+        if modo == "bus":
+            s = r["stats"]
+            print(f"{'':>22} progresos fusionados: {s['coalescidos']:,} · entregas: {s['entregas']:,}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--observadores", type=int, default=10)
+    parser.add_argument("--coste-ms", type=float, default=3.0)
+    parser.add_argument("--intervalo", type=float, default=0.1)
+    args = parser.parse_args()
+    asyncio.run(main_async(args.observadores, args.coste_ms / 1e3, args.intervalo))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+BENCHMARK: cálculo nutricional de muchas recetas.
+
+Compara, sobre N recetas sintéticas con unidades variadas:
+- anterior: recorrido lineal de INFO_NUTRICIONAL con subcadenas y
+  conversión de unidades con if/elif, ingrediente a ingrediente
+- calcular(): el MotorNutricional receta a receta
+- calcular_lote(): el MotorNutricional sobre todas las recetas a la vez
+
+Comprueba que los tres dan exactamente los mismos valores.
+
+Uso (desde robot_cocina/):
+    python -m benchmarks.bench_nutricion [--recetas 20000]
+"""
+
+import argparse
+import random
+import time
+
+from models.nutricion import INFO_NUTRICIONAL, MotorNutricional
+from models.receta import Receta, Ingrediente
+
+NOMBRES = [
+    "Tomate triturado", "Cebolla", "Ajo", "Aceite de oliva", "Sal", "Pimienta negra",
+    "Harina de trigo", "Leche entera", "Mantequilla", "Huevos", "Queso rallado",
+    "Nata para cocinar", "Salmon fresco", "Merluza", "Pan rallado", "Pasta seca",
+    "Arroz bomba", "Pollo troceado", "Ternera picada", "Zanahoria", "Patata",
+    "Calabacín", "Pimiento rojo", "Champiñones", "Espinacas frescas", "Caldo de verduras",
+    "Vino blanco", "Azucar", "Limon", "Perejil", "Comino", "Agua",
+]
+UNIDADES = ["g", "kg", "ml", "l", "unidad", "cucharada", "cda", "pizca", "al gusto"]
+
+
+def _catalogo(n: int, semilla: int = 11) -> list:
+    rng = random.Random(semilla)
+    return [
+        Receta(
+            nombre=f"Receta {i}",
+            descripcion="",
+            ingredientes=[Ingrediente(nombre, float(rng.choice((0.5, 1, 2, 15, 100, 250, 400))),
+                                      rng.choice(UNIDADES))
+                          for nombre in rng.sample(NOMBRES, rng.randint(4, 12))],
+            pasos=[],
+            tiempo_total=0,
+            porciones=rng.randint(1, 8),
+        )
+        for i in range(n)
+    ]
+
+
+def _calcular_anterior(ingredientes, porciones_base, porciones_calc) -> dict:
+    """MainInterface._calcular_nutricion antes del motor."""
+    factor = porciones_calc / porciones_base
+    total = {'calorias': 0, 'proteinas': 0, 'carbohidratos': 0, 'grasas': 0}
+    for ing in ingredientes:
+        nombre_lower = ing.nombre.lower()
+        for key, value in INFO_NUTRICIONAL.items():
+            if key in nombre_lower:
+                cantidad_g = ing.cantidad
+                if ing.unidad == 'kg': cantidad_g *= 1000
+                elif ing.unidad in ('ml', 'l'): cantidad_g = ing.cantidad * (1000 if ing.unidad == 'l' else 1)
+                elif ing.unidad == 'unidad': cantidad_g = 100
+                elif ing.unidad in ('cucharada', 'cda'): cantidad_g = 15
+                elif ing.unidad == 'pizca': cantidad_g = 1
+                for k in total: total[k] += (value[k] / 100) * cantidad_g * factor
+                break
+    for k in total: total[k] = round(total[k] / porciones_calc, 1)
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--recetas", type=int, default=20_000)
+    args = parser.parse_args()
+
+    recetas = _catalogo(args.recetas)
+    porciones = [1 + i % 12 for i in range(len(recetas))]
+    motor = MotorNutricional()
+
+    inicio = time.perf_counter()
+    anterior = [_calcular_anterior(r.ingredientes, r.porciones, p) for r, p in zip(recetas, porciones)]
+    t_anterior = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    actual = [motor.calcular(r.ingredientes, r.porciones, p) for r, p in zip(recetas, porciones)]
+    t_actual = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    lote = motor.calcular_lote(recetas, porciones)
+    t_lote = time.perf_counter() - inicio
+
+    assert actual == anterior, "calcular() no coincide con el cálculo anterior"
+    assert lote == anterior, "calcular_lote() no coincide con el cálculo anterior"
+
+    print(f"{args.recetas} recetas · resultados idénticos al cálculo anterior\n")
+    print(f"{'método':<18} {'total (ms)':>11} {'µs/receta':>10} {'vs anterior':>12}")
+    for nombre, t in (("anterior (bucles)", t_anterior),
+                      ("calcular()", t_actual),
+                      ("calcular_lote()", t_lote)):
+        print(f"{nombre:<18} {t * 1e3:>11.1f} {t / len(recetas) * 1e6:>10.1f} {t_anterior / t:>11.1f}x")
+    stats = motor.get_stats()
+    print(f"\nCaché de resolución: {stats['tamaño']} nombres, hit rate {stats['hit_rate']:.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+BENCHMARK: coste de un tick del simulador según el número de pasos.
+
+Compara el callback de progreso del Robot:
+- anterior: vuelve a sumar las duraciones de los pasos futuros en cada tick
+- actual: consulta las sumas prefijas del RecipePlan (O(1))
+
+El tick se mide en el primer paso, el peor caso para la suma (todos
+los demás pasos quedan por delante).
+
+También mide preparar_receta: compilación del plan frente a plan cacheado.
+
+Uso (desde robot_cocina/):
+    python -m benchmarks.bench_plan [--ticks 2000]
+"""
+
+import argparse
+import time
+
+from models.plan import RecipePlan
+from models.receta import Receta, Ingrediente
+from models.robot import Robot
+
+
+def _receta(num_pasos: int) -> Receta:
+    return Receta(
+        nombre=f"Receta de {num_pasos} pasos",
+        descripcion="Receta generada para el benchmark de ticks",
+        ingredientes=[Ingrediente("agua", 1000, "ml")],
+        pasos=[
+            {"tipo": "temperatura", "operacion": "hervir", "duracion": 30 + j % 60,
+             "temperatura": 100, "velocidad": 1}
+            for j in range(num_pasos)
+        ],
+        tiempo_total=0,
+    )
+
+
+def _callback_anterior(robot: Robot, actual: int, total: int) -> None:
+    """Callback previo al plan: re-suma los pasos futuros en cada tick."""
+    robot._progreso_actual = int((actual / total) * 100)
+    robot._tiempo_restante_paso = max(0, total - actual)
+    progreso_paso = actual / total
+    robot._progreso_receta = int(
+        ((robot._paso_actual + progreso_paso) / robot._total_pasos) * 100
+    )
+    pasos_futuros = sum(
+        int(p.get("duracion", 0))
+        for p in robot._receta_actual.pasos[robot._paso_actual + 1:]
+    )
+    robot._tiempo_restante_receta = robot._tiempo_restante_paso + pasos_futuros
+    robot._notificar_progreso(robot._progreso_actual)
+
+
+def medir(callback, robot: Robot, ticks: int) -> float:
+    """Microsegundos por tick."""
+    total = robot.plan.duracion(0)
+    inicio = time.perf_counter()
+    for t in range(ticks):
+        callback(robot, t % total + 1, total)
+    return (time.perf_counter() - inicio) / ticks * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--ticks", type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"{'pasos':>8} {'anterior (µs/tick)':>20} {'plan (µs/tick)':>16} {'restante':>10}")
+    for num_pasos in (10, 100, 1000, 10000):
+        robot = Robot()
+        robot.encender()
+        robot.preparar_receta(_receta(num_pasos))
+
+        anterior = medir(_callback_anterior, robot, args.ticks)
+        restante_anterior = robot.get_tiempos_restantes()["receta"]
+        actual = medir(Robot._callback_simulador, robot, args.ticks)
+        restante = robot.get_tiempos_restantes()["receta"]
+        assert restante == restante_anterior, "El plan no coincide con la suma directa"
+
+        print(f"{num_pasos:>8} {anterior:>20.2f} {actual:>16.2f} {restante:>9}s")
+
+    print(f"\n{'pasos':>8} {'compilar (ms)':>14} {'en caché (ms)':>14}")
+    for num_pasos in (10, 100, 1000, 10000):
+        receta = _receta(num_pasos)
+        receta.id = num_pasos
+        RecipePlan.clear_cache()
+        inicio = time.perf_counter()
+        RecipePlan.compilar(receta)
+        frio = (time.perf_counter() - inicio) * 1e3
+        inicio = time.perf_counter()
+        RecipePlan.compilar(receta)
+        caliente = (time.perf_counter() - inicio) * 1e3
+        print(f"{num_pasos:>8} {frio:>14.2f} {caliente:>14.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+BENCHMARK: políticas del planificador de recetas (FIFO, SJF, EDF).
+
+Simula con RelojVirtual un flujo de peticiones (llegadas de Poisson)
+sobre una flota de robots y compara, con el MISMO flujo para todas
+las políticas:
+- espera media y máxima en cola
+- profundidad media y máxima de la cola
+- plazos incumplidos y utilización de la flota
+- segundos reales que tarda la simulación
+
+A velocidad 1.0 cada segundo de receta es un segundo de reloj: los
+tiempos medidos son los de una cocina real, pero sin esperar.
+
+Uso (desde robot_cocina/):
+    python -m benchmarks.bench_planificador [--peticiones 1000] [--robots 8] [--carga 0.9]
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import random
+import time
+
+from models.fleet import RobotFleet
+from models.receta import Receta, Ingrediente
+from models.scheduler import CookScheduler, PoliticaPlanificacion
+from utils.clock import RelojVirtual
+
+
+def _recetas(n: int, rng: random.Random) -> list:
+    """Catálogo de recetas de 1 a 3 pasos y 2 a 60 minutos."""
+    recetas = []
+    for i in range(n):
+        pasos = [
+            {"tipo": "temperatura", "operacion": "hervir", "duracion": rng.randint(40, 1200),
+             "temperatura": 100, "velocidad": 1}
+            for _ in range(rng.randint(1, 3))
+        ]
+        total = sum(p["duracion"] for p in pasos)
+        recetas.append(Receta(f"Receta {i}", "", [Ingrediente("agua", 1000, "ml")], pasos, total, id=i + 1))
+    return recetas
+
+
+def _flujo(peticiones: int, robots: int, carga: float, semilla: int) -> list:
+    """(intervalo hasta la llegada, receta, prioridad, plazo) de cada petición."""
+    rng = random.Random(semilla)
+    catalogo = _recetas(40, rng)
+    media = sum(r.tiempo_total for r in catalogo) / len(catalogo)
+    # Llegadas de Poisson con tasa que da la carga pedida: λ = carga * robots / E[duración]
+    tasa = carga * robots / media
+    flujo = []
+    for _ in range(peticiones):
+        receta = rng.choice(catalogo)
+        prioridad = 1 if rng.random() < 0.05 else 0
+        plazo = receta.tiempo_total * rng.uniform(1.5, 6.0)
+        flujo.append((rng.expovariate(tasa), receta, prioridad, plazo))
+    return flujo
+
+
+async def simular(politica: PoliticaPlanificacion, flujo: list, robots: int) -> dict:
+    reloj = RelojVirtual()
+    flota = RobotFleet(reloj=reloj, velocidad_simulacion=1.0)
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(robots):
+            flota.agregar()
+        planificador = CookScheduler(flota, politica)
+
+        inicio = time.perf_counter()
+        for intervalo, receta, prioridad, plazo in flujo:
+            await reloj.dormir(intervalo)
+            planificador.encolar(receta, prioridad=prioridad, plazo=plazo)
+        await planificador.esperar()
+        duracion = time.perf_counter() - inicio
+
+    metricas = planificador.get_metricas()
+    assert metricas["completados"] == len(flujo), metricas
+    metricas["real"] = duracion
+    metricas["virtual"] = reloj.ahora()
+    return metricas
+
+
+async def main_async(peticiones: int, robots: int, carga: float, semilla: int):
+    flujo = _flujo(peticiones, robots, carga, semilla)
+    print(f"== {peticiones} peticiones, {robots} robots, carga {carga:.0%} (semilla {semilla})\n")
+    print(f"{'política':>8} {'espera media':>13} {'espera máx':>11} {'cola media':>11} "
+          f"{'cola máx':>9} {'plazos KO':>10} {'utiliz.':>8} {'simulado':>10} {'real':>7}")
+    for politica in PoliticaPlanificacion:
+        m = await simular(politica, flujo, robots)
+        print(f"{politica.value:>8} {m['espera_media'] / 60:>9.1f} min {m['espera_max'] / 60:>7.1f} min "
+              f"{m['cola_media']:>11.2f} {m['cola_max']:>9} "
+              f"{m['plazos_incumplidos'] / peticiones:>10.1%} {m['utilizacion']:>8.1%} "
+              f"{m['virtual'] / 3600:>8.1f} h {m['real']:>5.1f} s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--peticiones", type=int, default=1000)
+    parser.add_argument("--robots", type=int, default=8)
+    parser.add_argument("--carga", type=float, default=0.9)
+    parser.add_argument("--semilla", type=int, default=7)
+    args = parser.parse_args()
+    asyncio.run(main_async(args.peticiones, args.robots, args.carga, args.semilla))
+
+
+if __name__ == "__main__":
+    main()
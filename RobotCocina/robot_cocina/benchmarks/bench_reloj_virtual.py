@@ -0,0 +1,120 @@
+"""
+BENCHMARK: recetas completas sin esperas con RelojVirtual.
+
+- Secuencial: un robot cocina N recetas seguidas
+- Concurrente: M robots comparten un mismo reloj virtual
+
+Comprueba además que la simulación es fiel:
+- se emiten todos los callbacks de progreso
+- los instantes vistos por cada robot nunca retroceden
+- el tiempo virtual transcurrido coincide con la duración nominal
+
+Uso (desde robot_cocina/):
+    python -m benchmarks.bench_reloj_virtual [--recetas 1000] [--robots 50]
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import time
+
+from models.receta import Receta, Ingrediente
+from models.robot import Robot
+from utils.clock import RelojVirtual
+
+PASOS = [
+    {"tipo": "corte", "operacion": "picar", "duracion": 10, "velocidad": 5},
+    {"tipo": "temperatura", "operacion": "sofreir", "duracion": 300, "temperatura": 120, "velocidad": 1},
+    {"tipo": "mecanica", "nombre": "Mezclar", "duracion": 30, "velocidad": 3},
+    {"tipo": "temperatura", "operacion": "hervir", "duracion": 900, "temperatura": 100, "velocidad": 1},
+    {"tipo": "corte", "operacion": "triturar", "duracion": 60, "velocidad": 9},
+]
+VELOCIDAD = 0.01
+
+
+def _receta(i: int) -> Receta:
+    return Receta(f"Receta {i}", "", [Ingrediente("agua", 1000, "ml")], PASOS, 1300, id=i)
+
+
+def _duracion_nominal() -> float:
+    """Segundos de reloj que dura la receta (con el mínimo de 2 s por paso)."""
+    return sum(max(2.0, p["duracion"] * VELOCIDAD) for p in PASOS)
+
+
+def _ticks_por_receta() -> int:
+    """Callbacks de progreso que el robot debe recibir por receta."""
+    # Inicial + un tick por actualización + 100 % final, por paso
+    return sum(max(min(p["duracion"], 100), 10) + 2 for p in PASOS)
+
+
+async def cocinar(robot: Robot, recetas: int, inicio_receta: int = 0):
+    """Cocina `recetas` seguidas y devuelve (ticks, instantes monótonos)."""
+    reloj = robot.reloj
+    ticks = 0
+    monotono = True
+    ultimo = reloj.ahora()
+
+    def al_progreso(_):
+        nonlocal ticks, monotono, ultimo
+        ticks += 1
+        ahora = reloj.ahora()
+        monotono = monotono and ahora >= ultimo
+        ultimo = ahora
+
+    robot.registrar_callback_progreso(al_progreso)
+    robot.encender()
+    robot._simulator.velocidad = VELOCIDAD
+    # Toda la tanda en una sesión: el robot no pierde su turno entre recetas
+    with robot.sesion():
+        for i in range(recetas):
+            robot.preparar_receta(_receta(inicio_receta + i))
+            assert await robot.comenzar_receta(), "La receta no se completó"
+    return ticks, monotono
+
+
+async def secuencial(n: int):
+    reloj = RelojVirtual()
+    robot = Robot(reloj=reloj)
+    inicio = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        ticks, monotono = await cocinar(robot, n)
+    duracion = time.perf_counter() - inicio
+
+    # El robot notifica además dos 0 % por paso (cambio de paso e inicio
+    # de la tarea) y el 100 % final de la receta
+    esperados = n * (_ticks_por_receta() + 2 * len(PASOS) + 1)
+    print(f"== Secuencial: {n} recetas de {len(PASOS)} pasos")
+    print(f"   {duracion:.2f} s reales · {n / duracion:,.0f} recetas/s")
+    print(f"   tiempo virtual {reloj.ahora():,.1f} s (nominal {n * _duracion_nominal():,.1f} s)")
+    print(f"   callbacks {ticks:,} (esperados {esperados:,}) · monótono: {monotono}")
+
+
+async def concurrente(robots: int, por_robot: int):
+    reloj = RelojVirtual()
+    flota = [Robot(reloj=reloj) for _ in range(robots)]
+    inicio = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        resultados = await asyncio.gather(*(
+            cocinar(r, por_robot, k * por_robot) for k, r in enumerate(flota)
+        ))
+    duracion = time.perf_counter() - inicio
+
+    total = robots * por_robot
+    print(f"\n== Concurrente: {robots} robots × {por_robot} recetas en un reloj compartido")
+    print(f"   {duracion:.2f} s reales · {total / duracion:,.0f} recetas/s")
+    print(f"   tiempo virtual {reloj.ahora():,.1f} s (nominal en paralelo {por_robot * _duracion_nominal():,.1f} s)")
+    print(f"   monótono en todos los robots: {all(m for _, m in resultados)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--recetas", type=int, default=1000)
+    parser.add_argument("--robots", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(secuencial(args.recetas))
+    asyncio.run(concurrente(args.robots, max(1, args.recetas // args.robots)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+"""
+BENCHMARK: muchas sesiones de navegador sobre un robot compartido.
+
+Levanta la aplicación como app.py (una MainInterface por navegador
+sobre el robot de la flota) y abre N sesiones reales (HTTP + socket.io)
+desde un proceso aparte, para que la CPU y la memoria medidas sean
+solo las del servidor:
+- apertura: tiempo y CPU para servir las N páginas, memoria por sesión
+- receta: una sesión cocina y todas reciben el estado por el bus del
+  robot; CPU del servidor, retraso del bucle y tráfico por sesión
+- cierre: al irse los navegadores se cancelan las suscripciones y
+  las interfaces se liberan
+
+Uso (desde robot_cocina/):
+    python -m benchmarks.bench_sesiones [--sesiones 200] [--receta 1] [--puerto 8766]
+"""
+
+import argparse
+import asyncio
+import contextlib
+import gc
+import io
+import json
+import multiprocessing
+import os
+import re
+import resource
+import shutil
+import tempfile
+import time
+import uuid
+import weakref
+from pathlib import Path
+
+from benchmarks._comun import percentil, sondear_bucle
+
+BD_ORIGEN = Path(__file__).resolve().parents[2] / "data" / "robot_cocina.db"
+RECONEXION = 1.0  # segundos que NiceGUI espera una reconexión antes de borrar el cliente
+
+
+def _rss_mb() -> float:
+    """Memoria residente actual del proceso (pico si no hay /proc)."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2**20
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+# ==================== NAVEGADORES (proceso aparte) ====================
+
+def _navegadores(base: str, sesiones: int, conexion) -> None:
+    asyncio.run(_navegadores_async(base, sesiones, conexion))
+
+
+async def _navegadores_async(base: str, sesiones: int, conexion) -> None:
+    import httpx
+    import socketio
+
+    loop = asyncio.get_running_loop()
+    contadores = [[0, 0] for _ in range(sesiones)]  # [mensajes, bytes]
+    midiendo = False
+
+    def contador(k: int):
+        def registrar(evento, datos):
+            if midiendo:
+                contadores[k][0] += 1
+                contadores[k][1] += len('42' + json.dumps([evento, datos], separators=(',', ':'), default=str))
+        return registrar
+
+    limite = asyncio.Semaphore(20)
+
+    async def abrir(http, k: int):
+        async with limite:
+            respuesta = await http.get('/')
+            client_id = re.search(r"'client_id': '([0-9a-f-]+)'", respuesta.text).group(1)
+            sio = socketio.AsyncClient()
+            sio.on('*', contador(k))
+            consulta = (f"client_id={client_id}&tab_id={uuid.uuid4()}"
+                        f"&document_id={uuid.uuid4()}&implicit_handshake=true")
+            await sio.connect(f"{base}?{consulta}", socketio_path='/_nicegui_ws/socket.io',
+                              transports=['websocket'])
+            return client_id, sio
+
+    async with httpx.AsyncClient(base_url=base, timeout=60) as http:
+        abiertas = await asyncio.gather(*(abrir(http, k) for k in range(sesiones)))
+    conexion.send([client_id for client_id, _ in abiertas])
+
+    await loop.run_in_executor(None, conexion.recv)  # empieza la receta
+    midiendo = True
+    await loop.run_in_executor(None, conexion.recv)  # terminó
+    midiendo = False
+    conexion.send(contadores)
+
+    await asyncio.gather(*(sio.disconnect() for _, sio in abiertas))
+    conexion.send('cerradas')
+
+
+# ==================== SERVIDOR ====================
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sesiones", type=int, default=200)
+    parser.add_argument("--receta", type=int, default=1)
+    parser.add_argument("--puerto", type=int, default=8766)
+    args = parser.parse_args()
+
+    from nicegui import Client, app, ui
+    from database.async_db_handler import AsyncDatabaseHandler
+    from database.db_handler import DatabaseHandler
+    from models.fleet import RobotFleet
+    from ui.main_interface import MainInterface
+
+    temporal = Path(tempfile.mkdtemp())
+    shutil.copy(BD_ORIGEN, temporal / "robot_cocina.db")
+    db = DatabaseHandler(str(temporal / "robot_cocina.db"))
+    with contextlib.redirect_stdout(io.StringIO()):
+        db.initialize_database()
+    async_db = AsyncDatabaseHandler(db)
+    base = f"http://127.0.0.1:{args.puerto}"
+
+    # Igual que app.py: una interfaz por navegador sobre el robot de la flota
+    flota = RobotFleet()
+    robot_id = flota.agregar(encender=False)
+    robot = flota.robot(robot_id)
+    interfaces = weakref.WeakValueDictionary()  # no las mantiene vivas
+
+    @ui.page('/')
+    def index(client: Client):
+        interfaz = MainInterface(async_db, robot=robot)
+        interfaz.create_ui(client)
+        interfaces[client.id] = interfaz
+
+    async def recibir(conexion):
+        return await asyncio.get_running_loop().run_in_executor(None, conexion.recv)
+
+    async def escenario():
+        await asyncio.sleep(0.5)  # servidor escuchando
+        contexto = multiprocessing.get_context('spawn')
+        padre, hijo = contexto.Pipe()
+        proceso = contexto.Process(target=_navegadores, args=(base, args.sesiones, hijo), daemon=True)
+        loop = asyncio.get_running_loop()
+        salida = io.StringIO()
+        try:
+            # ===== APERTURA =====
+            gc.collect()
+            rss_inicio = _rss_mb()
+            cpu, inicio = time.process_time(), loop.time()
+            proceso.start()
+            with contextlib.redirect_stdout(salida):
+                ids = await recibir(padre)
+            apertura, cpu_apertura = loop.time() - inicio, time.process_time() - cpu
+            await asyncio.sleep(1.0)  # primera carga del explorador en cada sesión
+            gc.collect()
+            rss_abiertas = _rss_mb()
+            suscripciones = robot.get_stats_notificaciones()["suscripciones"]
+
+            # ===== RECETA =====
+            receta = await async_db.get_recipe_by_id(args.receta)
+            cocinera, cliente = interfaces[ids[0]], Client.instances[ids[0]]
+            with contextlib.redirect_stdout(salida):
+                with cliente:
+                    cocinera._encender_robot()
+                    cocinera._preparar_receta(receta)
+                await asyncio.sleep(0.5)
+                padre.send('medir')
+                retrasos: list = []
+                sonda = asyncio.create_task(sondear_bucle(retrasos))
+                cpu, inicio = time.process_time(), loop.time()
+                with cliente:
+                    await cocinera._comenzar_receta()
+                duracion, cpu_receta = loop.time() - inicio, time.process_time() - cpu
+                await asyncio.sleep(0.5)  # últimas entregas del bus
+                sonda.cancel()
+            sincronizadas = sum(interfaces[i].header_status.text == 'Completado' for i in ids)
+            padre.send('fin')
+            trafico = await recibir(padre)
+
+            # ===== CIERRE =====
+            await recibir(padre)
+            await asyncio.sleep(RECONEXION + 1.0)
+            del cocinera, cliente
+            gc.collect()
+            suscripciones_fin = robot.get_stats_notificaciones()["suscripciones"]
+            vivas = sum(1 for i in ids if i in interfaces)
+            rss_fin = _rss_mb()
+        finally:
+            proceso.join(timeout=5)
+            await async_db.close()
+            shutil.rmtree(temporal, ignore_errors=True)
+
+        n = len(ids)
+        mensajes = sum(m for m, _ in trafico) / n
+        kbytes = sum(b for _, b in trafico) / n / 1024
+        print(f"\n== {n} sesiones de navegador sobre un robot compartido\n")
+        print(f"Apertura: {apertura:.1f} s · CPU del servidor {cpu_apertura:.1f} s "
+              f"({cpu_apertura / n * 1e3:.0f} ms por página)")
+        print(f"Memoria:  RSS {rss_inicio:.0f} MB -> {rss_abiertas:.0f} MB "
+              f"({(rss_abiertas - rss_inicio) / n * 1024:.0f} KB por sesión) · suscripciones {suscripciones}")
+        print(f"Receta:   \"{receta.nombre}\" en {duracion:.1f} s · CPU del servidor {cpu_receta / duracion:.0%} "
+              f"· lag p99 {percentil(retrasos, 0.99) * 1e3:.1f} ms")
+        print(f"          por sesión: {mensajes:.0f} mensajes, {kbytes:.0f} KB · "
+              f"estado final en {sincronizadas}/{n} interfaces")
+        print(f"Cierre:   suscripciones {suscripciones_fin} · interfaces vivas {vivas} · RSS {rss_fin:.0f} MB")
+        app.shutdown()
+
+    app.on_startup(escenario)
+    ui.run(port=args.puerto, show=False, reload=False, reconnect_timeout=RECONEXION,
+           title="bench_sesiones")
+
+
+if __name__ == "__main__":
+    main()
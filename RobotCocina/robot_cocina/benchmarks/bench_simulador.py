@@ -0,0 +1,133 @@
+"""
+BENCHMARK: coste de N simuladores en pausa, latencia de detener()
+y deriva bajo carga.
+
+Compara el CookingSimulator actual (espera por eventos y ticks por
+plazos) con el anterior (sondeo de la pausa cada 50 ms y sleeps
+relativos ininterrumpibles):
+- CPU del proceso con N simuladores pausados durante unos segundos
+- Tiempo desde detener() hasta que simular_tarea() devuelve
+- Duración real de un paso de 2 s con el bucle de eventos cargado
+
+Uso (desde robot_cocina/):
+    python -m benchmarks.bench_simulador [--simuladores 1000] [--segundos 3]
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import time
+
+from utils.simulator import CookingSimulator
+
+
+class SimuladorSondeo(CookingSimulator):
+    """Bucle de simulación anterior: sondea la pausa con sleep(0.05)."""
+
+    async def simular_tarea(self, duracion, callback_progreso):
+        self._detenido = False
+        self._pausado = False
+        duracion_real = max(2.0, duracion * self._velocidad)
+        num_pasos = max(min(duracion, 100), 10)
+        intervalo = duracion_real / num_pasos
+        for i in range(1, num_pasos + 1):
+            if self._detenido:
+                return False
+            while self._pausado and not self._detenido:
+                await asyncio.sleep(0.05)
+            if self._detenido:
+                return False
+            await asyncio.sleep(intervalo)
+            callback_progreso(int((i / num_pasos) * duracion), duracion)
+        return True
+
+
+async def medir_pausa(clase, n: int, segundos: float) -> float:
+    """Segundos de CPU consumidos por n simuladores pausados."""
+    # 3600 s a velocidad 0.001 → ticks de 36 ms: todos llegan pronto a la pausa
+    simuladores = [clase(velocidad_multiplicador=0.001) for _ in range(n)]
+    with contextlib.redirect_stdout(io.StringIO()):
+        tareas = [asyncio.create_task(s.simular_tarea(3600, lambda a, t: None))
+                  for s in simuladores]
+        await asyncio.sleep(0)
+        for s in simuladores:
+            s.pausar()
+        await asyncio.sleep(0.2)
+
+        cpu = time.process_time()
+        await asyncio.sleep(segundos)
+        cpu = time.process_time() - cpu
+
+        for s in simuladores:
+            s.detener()
+        await asyncio.gather(*tareas)
+    return cpu
+
+
+async def medir_detencion(clase, intentos: int = 20) -> float:
+    """Milisegundos medios entre detener() y el retorno de simular_tarea()."""
+    total = 0.0
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(intentos):
+            # 60 s a velocidad 1 → ticks de 1 s: el peor caso para un sleep fijo
+            s = clase(velocidad_multiplicador=1.0)
+            tarea = asyncio.create_task(s.simular_tarea(60, lambda a, t: None))
+            await asyncio.sleep(0.05)
+            inicio = time.perf_counter()
+            s.detener()
+            await tarea
+            total += time.perf_counter() - inicio
+    return total / intentos * 1e3
+
+
+async def _carga(bloqueo: float) -> None:
+    """Simula otros clientes: bloquea el bucle `bloqueo` s de cada 2 * `bloqueo`."""
+    while True:
+        time.sleep(bloqueo)
+        await asyncio.sleep(bloqueo)
+
+
+async def medir_deriva(clase, bloqueo: float = 0.004) -> float:
+    """Segundos reales que tarda un paso nominal de 2 s con el bucle cargado."""
+    s = clase(velocidad_multiplicador=0.01)
+    carga = asyncio.create_task(_carga(bloqueo))
+    with contextlib.redirect_stdout(io.StringIO()):
+        inicio = time.perf_counter()
+        # 200 s a velocidad 0.01 → 2 s reales en 100 ticks de 20 ms
+        await s.simular_tarea(200, lambda a, t: time.sleep(0.001))
+        duracion = time.perf_counter() - inicio
+    carga.cancel()
+    return duracion
+
+
+async def main_async(n: int, segundos: float):
+    print(f"== {n} simuladores en pausa durante {segundos:.0f} s")
+    for nombre, clase in (("sondeo (anterior)", SimuladorSondeo),
+                          ("eventos (actual)", CookingSimulator)):
+        cpu = await medir_pausa(clase, n, segundos)
+        print(f"   {nombre:20s} CPU {cpu:6.3f} s  ({cpu / segundos:6.1%} de un núcleo)")
+
+    print("\n== Latencia de detener() (ticks de 1 s)")
+    for nombre, clase in (("sondeo (anterior)", SimuladorSondeo),
+                          ("eventos (actual)", CookingSimulator)):
+        ms = await medir_detencion(clase, intentos=5)
+        print(f"   {nombre:20s} {ms:8.2f} ms")
+
+    print("\n== Paso nominal de 2 s con el bucle cargado")
+    for nombre, clase in (("sleeps relativos", SimuladorSondeo),
+                          ("plazos (actual)", CookingSimulator)):
+        duracion = await medir_deriva(clase)
+        print(f"   {nombre:20s} {duracion:6.3f} s  (deriva {duracion - 2.0:+.3f} s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--simuladores", type=int, default=1000)
+    parser.add_argument("--segundos", type=float, default=3.0)
+    args = parser.parse_args()
+    asyncio.run(main_async(args.simuladores, args.segundos))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""
+BENCHMARK: mensajes y bytes de websocket por receta cocinada.
+
+Levanta la aplicación NiceGUI en este proceso, conecta un cliente
+socket.io real (como lo haría el navegador) y cocina una receta de
+la base de datos desde la interfaz, contando todo lo que el
+servidor envía al cliente mientras dura la receta:
+- reconstrucción (anterior): cada actualización de progreso vacía y
+  reconstruye la tarjeta del paso; cada cambio de estado reconstruye
+  la lista de pasos entera
+- diferencial (actual): la tarjeta se construye una vez por paso, la
+  lista una vez por receta, y solo se cambian textos y valores
+
+Los bytes son los del paquete socket.io de cada mensaje (JSON
+compacto), sin cabeceras de websocket ni compresión.
+
+Uso (desde robot_cocina/):
+    python -m benchmarks.bench_websocket [--receta 1] [--puerto 8765]
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import re
+import shutil
+import tempfile
+import uuid
+from collections import Counter
+from pathlib import Path
+
+import httpx
+import socketio
+from nicegui import Client, app, ui
+
+from database.async_db_handler import AsyncDatabaseHandler
+from database.db_handler import DatabaseHandler
+from ui.main_interface import MainInterface
+
+BD_ORIGEN = Path(__file__).resolve().parents[2] / "data" / "robot_cocina.db"
+
+
+class InterfazReconstruccion(MainInterface):
+    """Panel de ejecución anterior: vacía y reconstruye en cada notificación."""
+
+    def _on_progreso_changed(self, progreso):
+        self._en_tick = True
+        try:
+            super()._on_progreso_changed(progreso)
+        finally:
+            self._en_tick = False
+
+    def _mostrar_paso_actual(self):
+        self._paso_mostrado = None
+        super()._mostrar_paso_actual()
+
+    def _mostrar_completado(self):
+        self._paso_mostrado = None
+        super()._mostrar_completado()
+
+    def _limpiar_paso(self):
+        self._paso_mostrado = None
+        super()._limpiar_paso()
+
+    def _actualizar_lista_pasos(self):
+        if getattr(self, '_en_tick', False):
+            return  # antes la lista solo se tocaba en los cambios de estado
+        self._lista_de = False
+        super()._actualizar_lista_pasos()
+
+
+class Contador:
+    """Mensajes recibidos por el cliente socket.io."""
+
+    def __init__(self):
+        self.activo = False
+        self.mensajes = 0
+        self.bytes = 0
+        self.tipos = Counter()
+
+    def registrar(self, evento: str, datos) -> None:
+        if not self.activo:
+            return
+        paquete = '42' + json.dumps([evento, datos], separators=(',', ':'), default=str)
+        self.mensajes += 1
+        self.bytes += len(paquete.encode())
+        self.tipos[evento] += 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--receta", type=int, default=1)
+    parser.add_argument("--puerto", type=int, default=8765)
+    args = parser.parse_args()
+
+    temporal = Path(tempfile.mkdtemp())
+    shutil.copy(BD_ORIGEN, temporal / "robot_cocina.db")
+    db = DatabaseHandler(str(temporal / "robot_cocina.db"))
+    with contextlib.redirect_stdout(io.StringIO()):
+        db.initialize_database()
+    async_db = AsyncDatabaseHandler(db)
+    base = f"http://127.0.0.1:{args.puerto}"
+
+    interfaces = {}
+    modo = {"clase": MainInterface}
+
+    @ui.page('/')
+    def index(client: Client):
+        interfaz = modo["clase"](async_db)
+        interfaz.create_ui(client)
+        interfaces[client.id] = interfaz
+
+    async def medir(clase) -> dict:
+        modo["clase"] = clase
+        async with httpx.AsyncClient(base_url=base) as http:
+            respuesta = await http.get('/')
+        client_id = re.search(r"'client_id': '([0-9a-f-]+)'", respuesta.text).group(1)
+
+        contador = Contador()
+        sio = socketio.AsyncClient()
+        sio.on('*', contador.registrar)
+        consulta = f"client_id={client_id}&tab_id={uuid.uuid4()}&document_id={uuid.uuid4()}&implicit_handshake=true"
+        await sio.connect(f"{base}?{consulta}", socketio_path='/_nicegui_ws/socket.io', transports=['websocket'])
+
+        cliente = Client.instances[client_id]
+        interfaz = interfaces[client_id]
+        receta = await async_db.get_recipe_by_id(args.receta)
+        with cliente:
+            interfaz._encender_robot()
+            interfaz._preparar_receta(receta)
+        await asyncio.sleep(0.5)  # deja salir la carga inicial de la página
+
+        contador.activo = True
+        loop = asyncio.get_running_loop()
+        inicio = loop.time()
+        with cliente:
+            await interfaz._comenzar_receta()
+        duracion = loop.time() - inicio
+        await asyncio.sleep(0.5)  # últimas actualizaciones en la cola de salida
+        contador.activo = False
+
+        await sio.disconnect()
+        return {"receta": receta.nombre, "pasos": receta.num_pasos, "duracion": duracion,
+                "mensajes": contador.mensajes, "bytes": contador.bytes, "tipos": contador.tipos}
+
+    async def escenario():
+        await asyncio.sleep(0.5)  # servidor escuchando
+        try:
+            resultados = []
+            for nombre, clase in (("reconstrucción (anterior)", InterfazReconstruccion),
+                                  ("diferencial (actual)", MainInterface)):
+                with contextlib.redirect_stdout(io.StringIO()):
+                    r = await medir(clase)
+                resultados.append((nombre, r))
+
+            r0 = resultados[0][1]
+            print(f"\n== \"{r0['receta']}\" ({r0['pasos']} pasos) · un cliente socket.io\n")
+            print(f"{'modo':>26} {'real (s)':>9} {'mensajes':>9} {'bytes':>10} {'bytes/s':>9}")
+            for nombre, r in resultados:
+                print(f"{nombre:>26} {r['duracion']:>9.1f} {r['mensajes']:>9,} {r['bytes']:>10,} "
+                      f"{r['bytes'] / r['duracion']:>9,.0f}")
+            antes, despues = r0["bytes"], resultados[1][1]["bytes"]
+            print(f"\nReducción de bytes por receta: {1 - despues / antes:.1%}")
+        finally:
+            await async_db.close()
+            shutil.rmtree(temporal, ignore_errors=True)
+            app.shutdown()
+
+    app.on_startup(escenario)
+    ui.run(port=args.puerto, show=False, reload=False, title="bench_websocket")
+
+
+if __name__ in {"__main__", "__mp_main__"}:
+    main()
@@ -0,0 +1,75 @@
+"""
+Fachada asíncrona del DatabaseHandler.
+Ejecuta las consultas en un pool de hilos propio para no bloquear el
+bucle de eventos (NiceGUI y el simulador comparten ese bucle).
+"""
+
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from database.db_handler import DatabaseHandler
+
+
+class AsyncDatabaseHandler:
+    """
+    Misma API que DatabaseHandler, pero cada método es una corrutina.
+
+        db = AsyncDatabaseHandler(DatabaseHandler(ruta))
+        recetas = await db.query_recipes(dificultad='Fácil')
+
+    - Los métodos públicos se envuelven bajo demanda (__getattr__) y se
+      ejecutan en un ThreadPoolExecutor dedicado
+    - El executor tiene por defecto tantos hilos como conexiones el pool.
+      El hilo de escritura diferida y el de recálculo de perfiles toman
+      conexiones del mismo pool: mientras trabajan, una consulta puede
+      esperar a que quede una libre (hasta el timeout del pool)
+    - `sync` da acceso al handler síncrono (scripts, inicialización)
+    """
+
+    def __init__(self, db: DatabaseHandler, max_workers: Optional[int] = None):
+        """
+        Args:
+            db: Handler síncrono al que se delegan las llamadas
+            max_workers: Hilos del executor (por defecto, el tamaño del pool)
+        """
+        self._db = db
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers or db.get_pool_stats()['max_size'],
+            thread_name_prefix='db'
+        )
+
+    @property
+    def sync(self) -> DatabaseHandler:
+        """Handler síncrono subyacente."""
+        return self._db
+
+    async def run(self, funcion, *args, **kwargs):
+        """Ejecuta cualquier función bloqueante en el executor de la BD."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, functools.partial(funcion, *args, **kwargs)
+        )
+
+    def __getattr__(self, nombre: str):
+        if nombre.startswith('_'):
+            raise AttributeError(nombre)
+        metodo = getattr(self._db, nombre)
+        if not callable(metodo):
+            return metodo
+
+        @functools.wraps(metodo)
+        async def envoltorio(*args, **kwargs):
+            return await self.run(metodo, *args, **kwargs)
+
+        # Se guarda para no volver a pasar por __getattr__
+        setattr(self, nombre, envoltorio)
+        return envoltorio
+
+    async def close(self) -> None:
+        """Vuelca escrituras pendientes, cierra el pool y detiene el executor."""
+        try:
+            await self.run(self._db.close)
+        finally:
+            self._executor.shutdown(wait=True)
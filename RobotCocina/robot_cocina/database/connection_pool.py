@@ -0,0 +1,190 @@
+"""
+Pool de conexiones SQLite para el DatabaseHandler.
+Reutiliza conexiones entre llamadas en lugar de abrir una por consulta.
+"""
+
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from queue import LifoQueue, Empty
+from typing import Dict, Iterator, Optional, Tuple, Union
+
+from utils.exceptions import DatabaseError
+
+
+class ConnectionPool:
+    """
+    Pool de conexiones SQLite reutilizables.
+
+    Características:
+    - Conexiones reutilizadas entre llamadas (LIFO: la más reciente primero)
+    - Reentrante por hilo: las llamadas anidadas del mismo hilo (o de la
+      misma tarea asyncio, que corre en ese hilo) comparten la conexión
+    - Tamaño máximo configurable; si se agota se espera hasta `timeout`
+    - Health check (SELECT 1) de las conexiones que llevan tiempo ociosas
+    - PRAGMAs por conexión aplicados al crearla (synchronous, cache_size...)
+    - close() cierra todas las conexiones (hook de apagado)
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        max_size: int = 5,
+        timeout: float = 5.0,
+        health_check_interval: float = 30.0,
+        pragmas: Optional[Dict[str, Union[str, int]]] = None
+    ):
+        """
+        Args:
+            db_path: Ruta del fichero SQLite
+            max_size: Máximo de conexiones abiertas a la vez
+            timeout: Segundos de espera cuando el pool está agotado
+            health_check_interval: Segundos de inactividad tras los que
+                una conexión se comprueba antes de reutilizarla
+            pragmas: PRAGMAs que se ejecutan en cada conexión nueva
+        """
+        if max_size < 1:
+            raise ValueError("El tamaño del pool debe ser al menos 1")
+        self._db_path = db_path
+        self._max_size = max_size
+        self._timeout = timeout
+        self._health_check_interval = health_check_interval
+        self._pragmas = dict(pragmas or {})
+
+        self._ociosas: "LifoQueue[Tuple[sqlite3.Connection, float]]" = LifoQueue()
+        self._disponibles = threading.BoundedSemaphore(max_size)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._cerrado = False
+        self._stats = {"creadas": 0, "reutilizadas": 0, "descartadas": 0}
+
+    @property
+    def max_size(self) -> int:
+        return self._max_size
+
+    @property
+    def cerrado(self) -> bool:
+        return self._cerrado
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """
+        Presta una conexión durante el bloque `with`.
+
+        Al salir se devuelve al pool; si quedó una transacción abierta
+        (p. ej. por una excepción) se hace rollback antes.
+        """
+        local = self._local
+        conn = getattr(local, "conn", None)
+        if conn is not None:
+            # Llamada anidada en el mismo hilo: reutilizar la conexión prestada
+            local.profundidad += 1
+            try:
+                yield conn
+            finally:
+                local.profundidad -= 1
+            return
+
+        conn = self._adquirir()
+        local.conn = conn
+        local.profundidad = 1
+        try:
+            yield conn
+        finally:
+            local.conn = None
+            local.profundidad = 0
+            self._liberar(conn)
+
+    def close(self) -> None:
+        """Cierra el pool y todas sus conexiones ociosas."""
+        with self._lock:
+            self._cerrado = True
+        while True:
+            try:
+                conn, _ = self._ociosas.get_nowait()
+            except Empty:
+                break
+            self._cerrar(conn)
+
+    def get_stats(self) -> dict:
+        """Estadísticas del pool."""
+        with self._lock:
+            stats = dict(self._stats)
+        stats["ociosas"] = self._ociosas.qsize()
+        stats["max_size"] = self._max_size
+        return stats
+
+    # ==================== INTERNOS ====================
+
+    def _adquirir(self) -> sqlite3.Connection:
+        if self._cerrado:
+            raise DatabaseError("El pool de conexiones está cerrado")
+        if not self._disponibles.acquire(timeout=self._timeout):
+            raise DatabaseError(
+                f"Pool de conexiones agotado ({self._max_size}) tras {self._timeout}s"
+            )
+        try:
+            while True:
+                try:
+                    conn, ultimo_uso = self._ociosas.get_nowait()
+                except Empty:
+                    return self._crear()
+                if self._esta_sana(conn, ultimo_uso):
+                    self._contar("reutilizadas")
+                    return conn
+                self._cerrar(conn)
+                self._contar("descartadas")
+        except BaseException:
+            self._disponibles.release()
+            raise
+
+    def _liberar(self, conn: sqlite3.Connection) -> None:
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+            if self._cerrado:
+                self._cerrar(conn)
+            else:
+                self._ociosas.put((conn, time.monotonic()))
+        except sqlite3.Error:
+            self._cerrar(conn)
+            self._contar("descartadas")
+        finally:
+            self._disponibles.release()
+
+    def _crear(self) -> sqlite3.Connection:
+        try:
+            conn = sqlite3.connect(self._db_path, check_same_thread=False)
+        except sqlite3.Error as e:
+            raise DatabaseError(f"No se pudo abrir la base de datos: {e}")
+        conn.row_factory = sqlite3.Row
+        try:
+            for nombre, valor in self._pragmas.items():
+                conn.execute(f"PRAGMA {nombre} = {valor}")
+        except sqlite3.Error as e:
+            conn.close()
+            raise DatabaseError(f"No se pudo configurar la conexión: {e}")
+        self._contar("creadas")
+        return conn
+
+    def _esta_sana(self, conn: sqlite3.Connection, ultimo_uso: float) -> bool:
+        """Health check: solo consulta si la conexión llevaba tiempo ociosa."""
+        if time.monotonic() - ultimo_uso < self._health_check_interval:
+            return True
+        try:
+            conn.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    @staticmethod
+    def _cerrar(conn: sqlite3.Connection) -> None:
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+
+    def _contar(self, clave: str) -> None:
+        with self._lock:
+            self._stats[clave] += 1
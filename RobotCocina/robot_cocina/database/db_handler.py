@@ -3,90 +3,453 @@ Gestor de base de datos SQLite para el robot de cocina.
 Maneja recetas de fábrica y de usuario - VERSIÓN AMPLIADA.
 """
 
+import atexit
+import json
+import re
 import sqlite3
+import threading
 from pathlib import Path
-from typing import List, Optional
-from models.receta import Receta, Ingrediente
+from typing import Dict, Iterable, List, Optional
+from database.connection_pool import ConnectionPool
+from database.write_queue import WriteBehindQueue
+from models.alergenos import mascara_alergenos
+from models.nutricion import RESOLUTOR_INGREDIENTES
+from models.perfil import VERSION_PERFIL, CalculadorPerfiles, PerfilReceta
+from models.receta import Receta, RecetaResumen, Ingrediente
+from utils.cache import LRUCache
 from utils.exceptions import DatabaseError
 
 
 class DatabaseHandler:
-    """Maneja todas las operaciones de base de datos."""
+    """
+    Maneja todas las operaciones de base de datos.
     
-    def __init__(self, db_path: str = "data/robot_cocina.db"):
+    Las lecturas de recetas pasan por una caché LRU (id -> Receta y
+    listados). Las recetas devueltas se comparten entre llamadas, hilos
+    y navegadores: son de solo lectura. Para editar una se construye
+    una Receta nueva con el mismo id y se guarda con update_recipe(),
+    que invalida la caché.
+    
+    Con `escritura_diferida` el fin de las ejecuciones y las notas nuevas
+    se encolan y se escriben en lote (ver WriteBehindQueue). Las lecturas
+    de historial y notas vuelcan antes la cola, así que siempre ven sus
+    propias escrituras.
+    
+    Cada receta tiene un perfil derivado (nutrición por porción, máscara
+    de alérgenos, cobertura) en receta_perfil: se escribe con la receta
+    y, si cambian las tablas de las que sale (VERSION_PERFIL), un hilo
+    de fondo recalcula los desactualizados por lotes.
+    """
+    
+    # PRAGMAs por conexión (el modo WAL es persistente y se fija en
+    # initialize_database). Con WAL, synchronous=NORMAL no corrompe la BD
+    # ante un cierre inesperado y evita un fsync por cada commit.
+    PRAGMAS_CONEXION = {
+        'synchronous': 'NORMAL',
+        'cache_size': -16000,           # 16 MB de caché de páginas
+        'mmap_size': 64 * 1024 * 1024,  # 64 MB mapeados en memoria
+        'temp_store': 'MEMORY',
+        'busy_timeout': 5000,           # ms esperando a otro escritor
+    }
+    
+    LOTE_PERFILES = 500  # recetas por transacción al recalcular perfiles
+    
+    def __init__(
+        self,
+        db_path: str = "data/robot_cocina.db",
+        pool_size: int = 5,
+        cache_size: int = 1024,
+        cache_listas_size: int = 64,
+        escritura_diferida: bool = False,
+        intervalo_volcado: float = 0.5
+    ):
+        """
+        Args:
+            db_path: Ruta del fichero SQLite
+            pool_size: Máximo de conexiones simultáneas del pool
+            cache_size: Máximo de recetas en caché (0 la desactiva)
+            cache_listas_size: Máximo de listados en caché
+            escritura_diferida: Agrupa las escrituras de historial y notas
+                en transacciones por lotes
+            intervalo_volcado: Máximo de segundos que una escritura diferida
+                espera antes de llegar a la BD
+        """
         self.db_path = db_path
         Path("data").mkdir(exist_ok=True)
+        self._pool = ConnectionPool(db_path, max_size=pool_size, pragmas=self.PRAGMAS_CONEXION)
+        self._cache_recetas = LRUCache(cache_size)
+        self._cache_listas = LRUCache(cache_listas_size if cache_size else 0)
+        # Sube con cada invalidación: lo leído antes de una escritura no se cachea después
+        self._generacion_cache = 0
+        self._lock_generacion = threading.Lock()
+        self._cola_escritura = (
+            WriteBehindQueue(self._pool, flush_interval=intervalo_volcado)
+            if escritura_diferida else None
+        )
+        if self._cola_escritura:
+            # Red de seguridad si el proceso termina sin llamar a close()
+            atexit.register(self._cola_escritura.close)
+        self._perfiles = CalculadorPerfiles()
+        self._hilo_perfiles: Optional[threading.Thread] = None
+        self._parar_perfiles = threading.Event()
+        self._stats_perfiles = {'recalculados': 0, 'ultimo_error': None}
+        # Sin perfiles pendientes; no vuelve a haberlos: add/update_recipe guardan el suyo
+        self._perfiles_vigentes = False
     
     def get_connection(self):
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        return conn
+        """
+        Presta una conexión del pool (usar con `with`).
+        La conexión se devuelve al pool al salir del bloque.
+        """
+        return self._pool.connection()
+    
+    def close(self):
+        """
+        Vuelca las escrituras pendientes y cierra el pool de conexiones
+        (llamar al apagar la aplicación).
+        """
+        try:
+            self._parar_perfiles.set()
+            if self._hilo_perfiles:
+                self._hilo_perfiles.join()
+            if self._cola_escritura:
+                self._cola_escritura.close()
+        finally:
+            self._pool.close()
+    
+    def flush_writes(self) -> int:
+        """Escribe ya las escrituras diferidas pendientes. Devuelve cuántas había."""
+        return self._cola_escritura.flush() if self._cola_escritura else 0
+    
+    def get_write_queue_stats(self) -> Optional[dict]:
+        """Estadísticas de la cola de escritura diferida (None si está desactivada)."""
+        return self._cola_escritura.get_stats() if self._cola_escritura else None
+    
+    def _escribir(self, sql: str, params: tuple) -> bool:
+        """
+        Encola la escritura si la escritura diferida está activa.
+        Devuelve False si no lo está (el llamante escribe en el momento).
+        """
+        if self._cola_escritura is None:
+            return False
+        self._cola_escritura.submit(sql, params)
+        return True
+    
+    def get_pool_stats(self) -> dict:
+        """Estadísticas del pool de conexiones (monitorización)."""
+        return self._pool.get_stats()
+    
+    def get_cache_stats(self) -> dict:
+        """Aciertos/fallos de las cachés de recetas, listados e ingredientes (monitorización)."""
+        return {
+            'recetas': self._cache_recetas.get_stats(),
+            'listas': self._cache_listas.get_stats(),
+            'ingredientes': self._perfiles.resolutor.get_stats(),
+        }
+    
+    def clear_cache(self):
+        """Vacía las cachés (p. ej. si otro proceso modificó la base de datos)."""
+        with self._lock_generacion:
+            self._generacion_cache += 1
+            self._cache_recetas.clear()
+            self._cache_listas.clear()
+        self._perfiles_vigentes = False
     
     def initialize_database(self):
         try:
-            conn = self.get_connection()
-            cursor = conn.cursor()
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                
+                # WAL: los lectores no bloquean al escritor ni viceversa
+                # (persistente en el fichero; el resto de PRAGMAs los aplica el pool)
+                cursor.execute('PRAGMA journal_mode = WAL')
             
-            # Tabla de recetas
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS recetas (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    nombre TEXT NOT NULL,
-                    descripcion TEXT,
-                    ingredientes TEXT NOT NULL,
-                    pasos TEXT NOT NULL,
-                    tiempo_total INTEGER NOT NULL,
-                    porciones INTEGER DEFAULT 4,
-                    dificultad TEXT DEFAULT 'Media',
-                    es_fabrica INTEGER DEFAULT 0,
-                    fecha_creacion TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
+                # Tabla de recetas
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS recetas (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        nombre TEXT NOT NULL,
+                        descripcion TEXT,
+                        ingredientes TEXT NOT NULL,
+                        pasos TEXT NOT NULL,
+                        tiempo_total INTEGER NOT NULL,
+                        porciones INTEGER DEFAULT 4,
+                        dificultad TEXT DEFAULT 'Media',
+                        es_fabrica INTEGER DEFAULT 0,
+                        fecha_creacion TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    )
+                ''')
             
-            # Tabla de favoritos
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS favoritos (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    receta_id INTEGER NOT NULL,
-                    fecha_agregado TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (receta_id) REFERENCES recetas(id) ON DELETE CASCADE,
-                    UNIQUE(receta_id)
-                )
-            ''')
+                # Tabla de favoritos
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS favoritos (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        receta_id INTEGER NOT NULL,
+                        fecha_agregado TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        FOREIGN KEY (receta_id) REFERENCES recetas(id) ON DELETE CASCADE,
+                        UNIQUE(receta_id)
+                    )
+                ''')
             
-            # Tabla de historial de ejecuciones
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS historial (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    receta_id INTEGER NOT NULL,
-                    receta_nombre TEXT NOT NULL,
-                    fecha_inicio TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    fecha_fin TIMESTAMP,
-                    duracion_real INTEGER,
-                    porciones_cocinadas INTEGER,
-                    completada INTEGER DEFAULT 0,
-                    cancelada INTEGER DEFAULT 0,
-                    FOREIGN KEY (receta_id) REFERENCES recetas(id) ON DELETE SET NULL
-                )
-            ''')
+                # Tabla de historial de ejecuciones
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS historial (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        receta_id INTEGER NOT NULL,
+                        receta_nombre TEXT NOT NULL,
+                        fecha_inicio TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        fecha_fin TIMESTAMP,
+                        duracion_real INTEGER,
+                        porciones_cocinadas INTEGER,
+                        completada INTEGER DEFAULT 0,
+                        cancelada INTEGER DEFAULT 0,
+                        FOREIGN KEY (receta_id) REFERENCES recetas(id) ON DELETE SET NULL
+                    )
+                ''')
             
-            # Tabla de notas de recetas
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS notas_recetas (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    receta_id INTEGER NOT NULL,
-                    nota TEXT NOT NULL,
-                    fecha TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (receta_id) REFERENCES recetas(id) ON DELETE CASCADE
-                )
-            ''')
-            
-            conn.commit()
-            conn.close()
+                # Tabla de notas de recetas
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS notas_recetas (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        receta_id INTEGER NOT NULL,
+                        nota TEXT NOT NULL,
+                        fecha TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        FOREIGN KEY (receta_id) REFERENCES recetas(id) ON DELETE CASCADE
+                    )
+                ''')
+                cursor.execute('CREATE INDEX IF NOT EXISTS idx_notas_receta ON notas_recetas(receta_id, fecha)')
+
+                self._aplicar_migraciones(conn)
+                conn.commit()
             if self.get_recipe_count(solo_fabrica=True) == 0:
                 self.load_factory_recipes()
+            if self.count_stale_profiles():
+                self.start_profile_rebuild()
         except sqlite3.Error as e:
             raise DatabaseError(f"Error al inicializar la base de datos: {e}")
+
+    # ==================== MIGRACIONES ====================
+
+    def _aplicar_migraciones(self, conn):
+        """Aplica en orden las migraciones pendientes según PRAGMA user_version."""
+        migraciones = [
+            self._migracion_tablas_normalizadas,
+            self._migracion_busqueda_fts,
+            self._migracion_indices_filtros,
+            self._migracion_indice_resumen,
+            self._migracion_perfiles,
+            self._migracion_mascara_alergenos,
+        ]
+        version = conn.execute('PRAGMA user_version').fetchone()[0]
+        if conn.in_transaction:
+            conn.commit()
+        for numero, migracion in enumerate(migraciones, start=1):
+            if version < numero:
+                # Cada migración y su user_version en una sola transacción:
+                # si falla, la siguiente ejecución la repite desde cero.
+                # Por eso las migraciones no usan executescript (hace COMMIT)
+                conn.execute('BEGIN')
+                try:
+                    migracion(conn)
+                    conn.execute(f'PRAGMA user_version = {numero}')
+                    conn.commit()
+                except BaseException:
+                    conn.rollback()
+                    raise
+
+    def _migracion_tablas_normalizadas(self, conn):
+        """v1: ingredientes y pasos en tablas propias con índices."""
+        cursor = conn.cursor()
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS receta_ingredientes (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                receta_id INTEGER NOT NULL,
+                posicion INTEGER NOT NULL,
+                nombre TEXT NOT NULL COLLATE NOCASE,
+                cantidad REAL DEFAULT 0,
+                unidad TEXT,
+                FOREIGN KEY (receta_id) REFERENCES recetas(id) ON DELETE CASCADE
+            )
+        ''')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS receta_pasos (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                receta_id INTEGER NOT NULL,
+                posicion INTEGER NOT NULL,
+                tipo TEXT,
+                operacion TEXT,
+                duracion INTEGER DEFAULT 0,
+                temperatura INTEGER DEFAULT 0,
+                velocidad INTEGER DEFAULT 0,
+                descripcion TEXT,
+                FOREIGN KEY (receta_id) REFERENCES recetas(id) ON DELETE CASCADE
+            )
+        ''')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_ingredientes_receta ON receta_ingredientes(receta_id, posicion)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_ingredientes_nombre ON receta_ingredientes(nombre)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_pasos_receta ON receta_pasos(receta_id, posicion)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_pasos_tipo ON receta_pasos(tipo, operacion)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_pasos_operacion ON receta_pasos(operacion)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_pasos_temperatura ON receta_pasos(temperatura)')
+
+        # Rellenar desde las columnas JSON de las recetas existentes
+        cursor.execute('SELECT * FROM recetas')
+        for row in cursor.fetchall():
+            self._guardar_detalle(conn, row['id'], Receta.from_dict(dict(row)))
+
+    def _migracion_busqueda_fts(self, conn):
+        """v2: índice FTS5 sobre nombre, descripción, ingredientes y pasos."""
+        cursor = conn.cursor()
+        cursor.execute('''
+            CREATE VIRTUAL TABLE IF NOT EXISTS recetas_fts USING fts5(
+                nombre, descripcion, ingredientes, pasos,
+                tokenize = 'unicode61 remove_diacritics 2',
+                prefix = '2 3'
+            )
+        ''')
+        texto_ingredientes = '''(SELECT group_concat(nombre, ' ') FROM receta_ingredientes
+                                   WHERE receta_id = {id})'''
+        texto_pasos = '''(SELECT group_concat(coalesce(operacion, '') || ' ' || coalesce(descripcion, ''), ' ')
+                            FROM receta_pasos WHERE receta_id = {id})'''
+
+        # Triggers que mantienen el índice sincronizado
+        triggers = [
+            f'''CREATE TRIGGER IF NOT EXISTS recetas_fts_ai AFTER INSERT ON recetas BEGIN
+                INSERT INTO recetas_fts (rowid, nombre, descripcion, ingredientes, pasos)
+                VALUES (NEW.id, NEW.nombre, NEW.descripcion,
+                        {texto_ingredientes.format(id='NEW.id')}, {texto_pasos.format(id='NEW.id')});
+            END''',
+            '''CREATE TRIGGER IF NOT EXISTS recetas_fts_au AFTER UPDATE OF nombre, descripcion ON recetas BEGIN
+                UPDATE recetas_fts SET nombre = NEW.nombre, descripcion = NEW.descripcion
+                WHERE rowid = NEW.id;
+            END''',
+            '''CREATE TRIGGER IF NOT EXISTS recetas_fts_ad AFTER DELETE ON recetas BEGIN
+                DELETE FROM recetas_fts WHERE rowid = OLD.id;
+            END''',
+            f'''CREATE TRIGGER IF NOT EXISTS recetas_fts_ing_ai AFTER INSERT ON receta_ingredientes BEGIN
+                UPDATE recetas_fts SET ingredientes = {texto_ingredientes.format(id='NEW.receta_id')}
+                WHERE rowid = NEW.receta_id;
+            END''',
+            f'''CREATE TRIGGER IF NOT EXISTS recetas_fts_ing_ad AFTER DELETE ON receta_ingredientes BEGIN
+                UPDATE recetas_fts SET ingredientes = {texto_ingredientes.format(id='OLD.receta_id')}
+                WHERE rowid = OLD.receta_id;
+            END''',
+            f'''CREATE TRIGGER IF NOT EXISTS recetas_fts_pasos_ai AFTER INSERT ON receta_pasos BEGIN
+                UPDATE recetas_fts SET pasos = {texto_pasos.format(id='NEW.receta_id')}
+                WHERE rowid = NEW.receta_id;
+            END''',
+            f'''CREATE TRIGGER IF NOT EXISTS recetas_fts_pasos_ad AFTER DELETE ON receta_pasos BEGIN
+                UPDATE recetas_fts SET pasos = {texto_pasos.format(id='OLD.receta_id')}
+                WHERE rowid = OLD.receta_id;
+            END''',
+        ]
+        for trigger in triggers:
+            cursor.execute(trigger)
+
+        # Indexar las recetas existentes
+        cursor.execute(f'''
+            INSERT INTO recetas_fts (rowid, nombre, descripcion, ingredientes, pasos)
+            SELECT r.id, r.nombre, r.descripcion,
+                   {texto_ingredientes.format(id='r.id')}, {texto_pasos.format(id='r.id')}
+            FROM recetas r
+        ''')
+
+    def _migracion_indices_filtros(self, conn):
+        """v3: índices para los filtros y el orden del explorador de recetas."""
+        cursor = conn.cursor()
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_recetas_orden ON recetas(es_fabrica DESC, nombre)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_recetas_dificultad ON recetas(dificultad, tiempo_total)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_recetas_tiempo ON recetas(tiempo_total)')
+
+    def _migracion_indice_resumen(self, conn):
+        """
+        v4: índice que cubre la proyección de resumen del explorador.
+
+        Con él los listados se resuelven leyendo solo el índice, sin tocar
+        las filas que contienen el JSON de ingredientes y pasos. Sustituye
+        a idx_recetas_orden, que es un prefijo suyo.
+        """
+        cursor = conn.cursor()
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_recetas_resumen ON recetas(
+                es_fabrica DESC, nombre, dificultad, tiempo_total, porciones, descripcion
+            )
+        ''')
+        cursor.execute('DROP INDEX IF EXISTS idx_recetas_orden')
+
+    def _migracion_perfiles(self, conn):
+        """
+        v5: perfil derivado por receta (nutrición, alérgenos, cobertura).
+
+        Se crea vacío: initialize_database lanza el recálculo en segundo
+        plano para las recetas que aún no tienen perfil.
+        """
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS receta_perfil (
+                receta_id INTEGER PRIMARY KEY,
+                calorias REAL NOT NULL,
+                proteinas REAL NOT NULL,
+                carbohidratos REAL NOT NULL,
+                grasas REAL NOT NULL,
+                alergenos INTEGER NOT NULL DEFAULT 0,
+                cobertura REAL NOT NULL DEFAULT 0,
+                version TEXT NOT NULL,
+                FOREIGN KEY (receta_id) REFERENCES recetas(id) ON DELETE CASCADE
+            )
+        ''')
+
+    def _migracion_mascara_alergenos(self, conn):
+        """
+        v6: máscara de alérgenos en `recetas` para filtrar el explorador.
+
+        Es una copia de receta_perfil.alergenos que mantiene un trigger
+        (NULL = perfil aún sin calcular: esas recetas no pasan ningún
+        filtro de exclusión). Se añade al final del índice de resumen:
+        el filtro se evalúa sobre el índice, recorrido ya en el orden
+        del listado, sin leer las filas ni ordenar.
+        """
+        cursor = conn.cursor()
+        columnas = {fila['name'] for fila in cursor.execute('PRAGMA table_info(recetas)')}
+        if 'alergenos' not in columnas:
+            cursor.execute('ALTER TABLE recetas ADD COLUMN alergenos INTEGER')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS receta_perfil_alergenos_ai AFTER INSERT ON receta_perfil BEGIN
+                UPDATE recetas SET alergenos = NEW.alergenos WHERE id = NEW.receta_id;
+            END
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS receta_perfil_alergenos_au AFTER UPDATE OF alergenos ON receta_perfil BEGIN
+                UPDATE recetas SET alergenos = NEW.alergenos WHERE id = NEW.receta_id;
+            END
+        ''')
+        cursor.execute('''
+            UPDATE recetas SET alergenos = (
+                SELECT p.alergenos FROM receta_perfil p WHERE p.receta_id = recetas.id
+            )
+        ''')
+        cursor.execute('DROP INDEX IF EXISTS idx_recetas_resumen')
+        cursor.execute('''
+            CREATE INDEX idx_recetas_resumen ON recetas(
+                es_fabrica DESC, nombre, dificultad, tiempo_total, porciones, descripcion, alergenos
+            )
+        ''')
+
+    def _guardar_detalle(self, conn, recipe_id: int, receta: Receta):
+        """Escribe ingredientes y pasos de la receta en las tablas normalizadas."""
+        conn.execute('DELETE FROM receta_ingredientes WHERE receta_id = ?', (recipe_id,))
+        conn.execute('DELETE FROM receta_pasos WHERE receta_id = ?', (recipe_id,))
+        conn.executemany('''
+            INSERT INTO receta_ingredientes (receta_id, posicion, nombre, cantidad, unidad)
+            VALUES (?, ?, ?, ?, ?)
+        ''', [(recipe_id, i, ing.nombre, ing.cantidad, ing.unidad)
+              for i, ing in enumerate(receta.ingredientes)])
+        conn.executemany('''
+            INSERT INTO receta_pasos (receta_id, posicion, tipo, operacion, duracion, temperatura, velocidad, descripcion)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ''', [(recipe_id, i, p.get('tipo'), p.get('operacion', p.get('nombre')),
+               int(p.get('duracion', 0) or 0), int(p.get('temperatura', 0) or 0),
+               int(p.get('velocidad', 0) or 0), p.get('descripcion', ''))
+              for i, p in enumerate(receta.pasos)])
     
     def load_factory_recipes(self):
         """Carga recetas de fábrica ampliadas."""
@@ -645,73 +1008,150 @@ class DatabaseHandler:
             tiempo_total=950, porciones=6, dificultad="Fácil", es_fabrica=True
         )
 
+    # ==================== CACHÉ ====================
+
+    def _cachear(self, cache: LRUCache, clave, valor, generacion: int):
+        """
+        Guarda un valor leído de la BD salvo que haya habido una
+        invalidación desde `generacion` (leída antes de consultar): las
+        lecturas y las escrituras van en hilos distintos y un resultado
+        anterior a la escritura no debe quedarse en la caché.
+        """
+        with self._lock_generacion:
+            if generacion == self._generacion_cache:
+                cache.put(clave, valor)
+
+    def _recetas_desde_filas(self, rows, generacion: int) -> List[Receta]:
+        """
+        Deserializa filas reutilizando las recetas ya cacheadas por id.
+        Las nuevas se crean con decodificación diferida (RecetaLazy).
+        """
+        recetas = []
+        for row in rows:
+            receta = self._cache_recetas.get(row['id'])
+            if receta is None:
+                receta = Receta.from_dict(dict(row), lazy=True)
+                self._cachear(self._cache_recetas, receta.id, receta, generacion)
+            recetas.append(receta)
+        return recetas
+
+    def _lista_cacheada(self, clave: tuple, cargar):
+        """
+        Read-through de listados. Las claves son (vista, depende_de_favoritos, ...)
+        para poder invalidar solo lo afectado. Devuelve siempre una copia.
+        """
+        valor = self._cache_listas.get(clave)
+        if valor is None:
+            generacion = self._generacion_cache
+            valor = cargar()
+            self._cachear(self._cache_listas, clave, valor, generacion)
+        return valor.copy()
+
+    def _invalidar_receta(self, recipe_id: Optional[int] = None):
+        """Invalida una receta y todos los listados (cambió el catálogo)."""
+        with self._lock_generacion:
+            self._generacion_cache += 1
+            if recipe_id is not None:
+                self._cache_recetas.invalidate(recipe_id)
+            self._cache_listas.clear()
+
+    def _invalidar_favoritos(self):
+        """Invalida solo los listados que dependen de los favoritos."""
+        with self._lock_generacion:
+            self._generacion_cache += 1
+            self._cache_listas.invalidate_where(lambda clave: clave[1])
+
+    def _invalidar_alergenos(self):
+        """
+        Invalida los listados filtrados por alérgenos (cambiaron perfiles:
+        los triggers copian su máscara en recetas.alergenos).
+        """
+        with self._lock_generacion:
+            self._generacion_cache += 1
+            self._cache_listas.invalidate_where(lambda clave: clave[0] == 'query' and clave[-1])
+
     # ==================== CRUD ====================
 
     def get_all_recipes(self, incluir_fabrica: bool = True) -> List[Receta]:
+        def cargar():
+            generacion = self._generacion_cache
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                if incluir_fabrica:
+                    cursor.execute('SELECT * FROM recetas ORDER BY es_fabrica DESC, nombre')
+                else:
+                    cursor.execute('SELECT * FROM recetas WHERE es_fabrica = 0 ORDER BY nombre')
+                rows = cursor.fetchall()
+            return self._recetas_desde_filas(rows, generacion)
         try:
-            conn = self.get_connection()
-            cursor = conn.cursor()
-            if incluir_fabrica:
-                cursor.execute('SELECT * FROM recetas ORDER BY es_fabrica DESC, nombre')
-            else:
-                cursor.execute('SELECT * FROM recetas WHERE es_fabrica = 0 ORDER BY nombre')
-            rows = cursor.fetchall()
-            conn.close()
-            return [Receta.from_dict(dict(row)) for row in rows]
+            return self._lista_cacheada(('todas', False, incluir_fabrica), cargar)
         except sqlite3.Error as e:
             raise DatabaseError(f"Error al obtener recetas: {e}")
     
     def get_recipe_by_id(self, recipe_id: int) -> Optional[Receta]:
+        receta = self._cache_recetas.get(recipe_id)
+        if receta is not None:
+            return receta
+        generacion = self._generacion_cache
         try:
-            conn = self.get_connection()
-            cursor = conn.cursor()
-            cursor.execute('SELECT * FROM recetas WHERE id = ?', (recipe_id,))
-            row = cursor.fetchone()
-            conn.close()
-            return Receta.from_dict(dict(row)) if row else None
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute('SELECT * FROM recetas WHERE id = ?', (recipe_id,))
+                row = cursor.fetchone()
+            if not row:
+                return None
+            receta = Receta.from_dict(dict(row))
+            self._cachear(self._cache_recetas, receta.id, receta, generacion)
+            return receta
         except sqlite3.Error as e:
             raise DatabaseError(f"Error al obtener receta: {e}")
     
     def add_recipe(self, receta: Receta, es_fabrica: bool = False) -> int:
         try:
-            conn = self.get_connection()
-            cursor = conn.cursor()
-            receta.es_fabrica = es_fabrica
-            datos = receta.to_dict()
-            cursor.execute('''
-                INSERT INTO recetas (nombre, descripcion, ingredientes, pasos, tiempo_total, porciones, dificultad, es_fabrica)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (datos['nombre'], datos['descripcion'], datos['ingredientes'], datos['pasos'],
-                  datos['tiempo_total'], datos['porciones'], datos['dificultad'], datos['es_fabrica']))
-            recipe_id = cursor.lastrowid
-            conn.commit()
-            conn.close()
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                receta.es_fabrica = es_fabrica
+                datos = receta.to_dict()
+                cursor.execute('''
+                    INSERT INTO recetas (nombre, descripcion, ingredientes, pasos, tiempo_total, porciones, dificultad, es_fabrica)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ''', (datos['nombre'], datos['descripcion'], datos['ingredientes'], datos['pasos'],
+                      datos['tiempo_total'], datos['porciones'], datos['dificultad'], datos['es_fabrica']))
+                recipe_id = cursor.lastrowid
+                self._guardar_detalle(conn, recipe_id, receta)
+                self._guardar_perfiles(conn, [(recipe_id, self._perfiles.calcular(receta))])
+                conn.commit()
+            self._invalidar_receta()
             return recipe_id
         except sqlite3.Error as e:
             raise DatabaseError(f"Error al añadir receta: {e}")
     
     def delete_user_recipe(self, recipe_id: int) -> bool:
         try:
-            conn = self.get_connection()
-            cursor = conn.cursor()
-            cursor.execute('DELETE FROM recetas WHERE id = ? AND es_fabrica = 0', (recipe_id,))
-            affected = cursor.rowcount
-            conn.commit()
-            conn.close()
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute('DELETE FROM recetas WHERE id = ? AND es_fabrica = 0', (recipe_id,))
+                affected = cursor.rowcount
+                if affected > 0:
+                    cursor.execute('DELETE FROM receta_ingredientes WHERE receta_id = ?', (recipe_id,))
+                    cursor.execute('DELETE FROM receta_pasos WHERE receta_id = ?', (recipe_id,))
+                    cursor.execute('DELETE FROM receta_perfil WHERE receta_id = ?', (recipe_id,))
+                conn.commit()
+            if affected > 0:
+                self._invalidar_receta(recipe_id)
             return affected > 0
         except sqlite3.Error as e:
             raise DatabaseError(f"Error al eliminar receta: {e}")
     
     def get_recipe_count(self, solo_fabrica: bool = False) -> int:
         try:
-            conn = self.get_connection()
-            cursor = conn.cursor()
-            if solo_fabrica:
-                cursor.execute('SELECT COUNT(*) FROM recetas WHERE es_fabrica = 1')
-            else:
-                cursor.execute('SELECT COUNT(*) FROM recetas')
-            count = cursor.fetchone()[0]
-            conn.close()
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                if solo_fabrica:
+                    cursor.execute('SELECT COUNT(*) FROM recetas WHERE es_fabrica = 1')
+                else:
+                    cursor.execute('SELECT COUNT(*) FROM recetas')
+                count = cursor.fetchone()[0]
             return count
         except sqlite3.Error as e:
             raise DatabaseError(f"Error al contar recetas: {e}")
@@ -721,19 +1161,22 @@ class DatabaseHandler:
     def update_recipe(self, receta: Receta) -> bool:
         """Actualiza una receta existente (solo recetas de usuario)."""
         try:
-            conn = self.get_connection()
-            cursor = conn.cursor()
-            datos = receta.to_dict()
-            cursor.execute('''
-                UPDATE recetas SET 
-                    nombre = ?, descripcion = ?, ingredientes = ?, pasos = ?,
-                    tiempo_total = ?, porciones = ?, dificultad = ?
-                WHERE id = ? AND es_fabrica = 0
-            ''', (datos['nombre'], datos['descripcion'], datos['ingredientes'], datos['pasos'],
-                  datos['tiempo_total'], datos['porciones'], datos['dificultad'], receta.id))
-            affected = cursor.rowcount
-            conn.commit()
-            conn.close()
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                datos = receta.to_dict()
+                cursor.execute('''
+                    UPDATE recetas SET 
+                        nombre = ?, descripcion = ?, ingredientes = ?, pasos = ?,
+                        tiempo_total = ?, porciones = ?, dificultad = ?
+                    WHERE id = ? AND es_fabrica = 0
+                ''', (datos['nombre'], datos['descripcion'], datos['ingredientes'], datos['pasos'],
+                      datos['tiempo_total'], datos['porciones'], datos['dificultad'], receta.id))
+                affected = cursor.rowcount
+                if affected > 0:
+                    self._guardar_detalle(conn, receta.id, receta)
+                    self._guardar_perfiles(conn, [(receta.id, self._perfiles.calcular(receta))])
+                conn.commit()
+            self._invalidar_receta(receta.id)
             return affected > 0
         except sqlite3.Error as e:
             raise DatabaseError(f"Error al actualizar receta: {e}")
@@ -760,16 +1203,251 @@ class DatabaseHandler:
         except sqlite3.Error as e:
             raise DatabaseError(f"Error al duplicar receta: {e}")
 
+    # ==================== CONSULTAS POR INGREDIENTE Y PASO ====================
+
+    def get_recipes_by_ingredient(self, ingrediente: str) -> List[Receta]:
+        """
+        Recetas con algún ingrediente cuyo nombre empieza por `ingrediente`
+        (sin distinguir mayúsculas). Usa el índice sobre el nombre.
+        """
+        patron = self._escapar_like(ingrediente.strip()) + '%'
+        generacion = self._generacion_cache
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute('''
+                    SELECT * FROM recetas
+                    WHERE id IN (
+                        SELECT receta_id FROM receta_ingredientes
+                        WHERE nombre LIKE ? ESCAPE '\\'
+                    )
+                    ORDER BY es_fabrica DESC, nombre
+                ''', (patron,))
+                rows = cursor.fetchall()
+            return self._recetas_desde_filas(rows, generacion)
+        except sqlite3.Error as e:
+            raise DatabaseError(f"Error al buscar por ingrediente: {e}")
+
+    def get_recipes_by_step(
+        self,
+        tipo: Optional[str] = None,
+        operacion: Optional[str] = None,
+        temperatura_mayor_que: Optional[int] = None
+    ) -> List[Receta]:
+        """
+        Recetas con al menos un paso que cumpla todos los criterios dados.
+
+        Args:
+            tipo: 'corte', 'temperatura' o 'mecanica'
+            operacion: Operación del paso (p. ej. 'sofreir')
+            temperatura_mayor_que: Temperatura estrictamente superior (°C)
+        """
+        condiciones, params = [], []
+        if tipo:
+            condiciones.append('tipo = ?')
+            params.append(tipo)
+        if operacion:
+            condiciones.append('operacion = ?')
+            params.append(operacion)
+        if temperatura_mayor_que is not None:
+            condiciones.append('temperatura > ?')
+            params.append(temperatura_mayor_que)
+        where = ' AND '.join(condiciones) or '1'
+        generacion = self._generacion_cache
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(f'''
+                    SELECT * FROM recetas
+                    WHERE id IN (SELECT receta_id FROM receta_pasos WHERE {where})
+                    ORDER BY es_fabrica DESC, nombre
+                ''', params)
+                rows = cursor.fetchall()
+            return self._recetas_desde_filas(rows, generacion)
+        except sqlite3.Error as e:
+            raise DatabaseError(f"Error al buscar por pasos: {e}")
+
+    # ==================== EXPLORADOR (FILTROS Y PAGINACIÓN) ====================
+
+    # Proyección de resumen: sin los JSON de ingredientes y pasos
+    _COLUMNAS_RESUMEN = '''
+        r.id, r.nombre, r.descripcion, r.tiempo_total, r.porciones, r.dificultad, r.es_fabrica,
+        (SELECT COUNT(*) FROM receta_pasos p WHERE p.receta_id = r.id) AS num_pasos,
+        (SELECT COUNT(*) FROM receta_ingredientes i WHERE i.receta_id = r.id) AS num_ingredientes
+    '''
+
+    def _convertir_filas(self, rows, resumen: bool, generacion: int) -> list:
+        """Filas completas -> Receta; filas de resumen -> RecetaResumen."""
+        if resumen:
+            return [RecetaResumen.from_dict(dict(row)) for row in rows]
+        return self._recetas_desde_filas(rows, generacion)
+
+    def query_recipes(
+        self,
+        categoria: Optional[List[str]] = None,
+        dificultad: Optional[str] = None,
+        tiempo_min: Optional[int] = None,
+        tiempo_max: Optional[int] = None,
+        favoritos: bool = False,
+        limit: Optional[int] = 24,
+        offset: int = 0,
+        resumen: bool = False,
+        excluir_alergenos: Optional[Iterable[str]] = None
+    ) -> list:
+        """
+        Recetas filtradas y paginadas íntegramente en SQL.
+
+        Args:
+            categoria: Palabras clave de la categoría; se buscan como prefijo
+                en el nombre a través del índice FTS
+            dificultad: 'Fácil', 'Media' o 'Difícil'
+            tiempo_min: Tiempo total mínimo en segundos (inclusive)
+            tiempo_max: Tiempo total máximo en segundos (inclusive)
+            favoritos: Solo recetas marcadas como favoritas
+            limit: Tamaño de página (None = sin límite)
+            offset: Desplazamiento de la página
+            resumen: Devuelve RecetaResumen (sin ingredientes ni pasos)
+                en lugar de Receta
+            excluir_alergenos: Claves de ALERGENOS; se descartan las recetas
+                que contengan alguno (y las que aún no tienen perfil)
+        """
+        filters = {
+            'categoria': categoria, 'dificultad': dificultad,
+            'tiempo_min': tiempo_min, 'tiempo_max': tiempo_max, 'favoritos': favoritos,
+            'excluir_alergenos': excluir_alergenos,
+        }
+        where, params = self._filtros_sql(filters)
+
+        def cargar():
+            generacion = self._generacion_cache
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(f'''
+                    SELECT {self._COLUMNAS_RESUMEN if resumen else 'r.*'} FROM recetas r
+                    WHERE 1 {where}
+                    ORDER BY r.es_fabrica DESC, r.nombre
+                    LIMIT ? OFFSET ?
+                ''', [*params, -1 if limit is None else limit, offset])
+                rows = cursor.fetchall()
+            return self._convertir_filas(rows, resumen, generacion)
+        # La máscara de alérgenos va la última (ver _invalidar_alergenos)
+        clave = ('query', bool(favoritos), tuple(categoria or ()), dificultad,
+                 tiempo_min, tiempo_max, limit, offset, resumen,
+                 mascara_alergenos(excluir_alergenos or ()))
+        try:
+            if clave[-1] and not self._perfiles_al_dia():
+                # Las recetas sin perfil no pasan el filtro y el recálculo
+                # aún las cambiará: no se cachea lo que va a quedar obsoleto
+                return cargar()
+            return self._lista_cacheada(clave, cargar)
+        except sqlite3.Error as e:
+            raise DatabaseError(f"Error al filtrar recetas: {e}")
+
+    # ==================== BÚSQUEDA DE TEXTO ====================
+
+    def search_recipes(
+        self,
+        query: str,
+        filters: Optional[dict] = None,
+        limit: Optional[int] = 50,
+        offset: int = 0,
+        resumen: bool = False
+    ) -> list:
+        """
+        Búsqueda de texto completo (FTS5) en nombre, descripción,
+        ingredientes y pasos, ordenada por relevancia (bm25).
+
+        Cada palabra de `query` se busca como prefijo y sin acentos
+        ("champi" encuentra "Champiñones"), junto con su singular y su
+        sinónimo ("nueces" también busca "nuez", "papas" "patata").
+
+        Args:
+            query: Texto introducido por el usuario
+            filters: Filtros opcionales con las mismas claves que
+                query_recipes() (categoria, dificultad, tiempo_min,
+                tiempo_max, favoritos, excluir_alergenos) y es_fabrica
+            limit: Máximo de resultados (None = sin límite)
+            offset: Desplazamiento para paginar
+            resumen: Devuelve RecetaResumen en lugar de Receta
+        """
+        match = self._construir_match(query)
+        if not match:
+            return []
+        where, params = self._filtros_sql(filters or {})
+        generacion = self._generacion_cache
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(f'''
+                    SELECT {self._COLUMNAS_RESUMEN if resumen else 'r.*'} FROM recetas_fts
+                    JOIN recetas r ON r.id = recetas_fts.rowid
+                    WHERE recetas_fts MATCH ? {where}
+                    ORDER BY bm25(recetas_fts, 10.0, 3.0, 2.0, 1.0)
+                    LIMIT ? OFFSET ?
+                ''', [match, *params, -1 if limit is None else limit, offset])
+                rows = cursor.fetchall()
+            return self._convertir_filas(rows, resumen, generacion)
+        except sqlite3.Error as e:
+            raise DatabaseError(f"Error en la búsqueda: {e}")
+
+    @staticmethod
+    def _construir_match(query: str) -> str:
+        """Convierte el texto libre en una consulta FTS5 de prefijos (AND de ORs de variantes)."""
+        terminos = []
+        for palabra in re.findall(r'\w+', query or ''):
+            variantes = RESOLUTOR_INGREDIENTES.variantes(palabra)
+            if len(variantes) == 1:
+                terminos.append(f'"{palabra}"*')
+            else:
+                terminos.append('(' + ' OR '.join(f'"{v}"*' for v in variantes) + ')')
+        return ' '.join(terminos)
+
+    @staticmethod
+    def _filtros_sql(filters: dict):
+        """Traduce el diccionario de filtros a condiciones SQL sobre `r`."""
+        condiciones, params = [], []
+        frases = [' '.join(re.findall(r'\w+', kw)) for kw in filters.get('categoria') or []]
+        frases = [f for f in frases if f]
+        if frases:
+            condiciones.append('r.id IN (SELECT rowid FROM recetas_fts WHERE recetas_fts MATCH ?)')
+            params.append('nombre : (' + ' OR '.join(f'"{f}"*' for f in frases) + ')')
+        if filters.get('favoritos'):
+            condiciones.append('r.id IN (SELECT receta_id FROM favoritos)')
+        if filters.get('dificultad'):
+            condiciones.append('r.dificultad = ?')
+            params.append(filters['dificultad'])
+        if filters.get('tiempo_min') is not None:
+            condiciones.append('r.tiempo_total >= ?')
+            params.append(filters['tiempo_min'])
+        if filters.get('tiempo_max') is not None:
+            condiciones.append('r.tiempo_total <= ?')
+            params.append(filters['tiempo_max'])
+        if filters.get('es_fabrica') is not None:
+            condiciones.append('r.es_fabrica = ?')
+            params.append(1 if filters['es_fabrica'] else 0)
+        excluir = mascara_alergenos(filters.get('excluir_alergenos') or ())
+        if excluir:
+            # Sin índice por el operador &: se evalúa sobre idx_recetas_resumen
+            condiciones.append('(r.alergenos & ?) = 0')
+            params.append(excluir)
+        where = ''.join(f' AND {c}' for c in condiciones)
+        return where, params
+
+    @staticmethod
+    def _escapar_like(texto: str) -> str:
+        """Escapa los comodines de LIKE (usar con ESCAPE '\\')."""
+        return texto.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
     # ==================== FAVORITOS ====================
     
     def add_favorite(self, recipe_id: int) -> bool:
         """Añade una receta a favoritos."""
         try:
-            conn = self.get_connection()
-            cursor = conn.cursor()
-            cursor.execute('INSERT OR IGNORE INTO favoritos (receta_id) VALUES (?)', (recipe_id,))
-            conn.commit()
-            conn.close()
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute('INSERT OR IGNORE INTO favoritos (receta_id) VALUES (?)', (recipe_id,))
+                conn.commit()
+            self._invalidar_favoritos()
             return True
         except sqlite3.Error as e:
             raise DatabaseError(f"Error al añadir favorito: {e}")
@@ -777,89 +1455,244 @@ class DatabaseHandler:
     def remove_favorite(self, recipe_id: int) -> bool:
         """Elimina una receta de favoritos."""
         try:
-            conn = self.get_connection()
-            cursor = conn.cursor()
-            cursor.execute('DELETE FROM favoritos WHERE receta_id = ?', (recipe_id,))
-            affected = cursor.rowcount
-            conn.commit()
-            conn.close()
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute('DELETE FROM favoritos WHERE receta_id = ?', (recipe_id,))
+                affected = cursor.rowcount
+                conn.commit()
+            self._invalidar_favoritos()
             return affected > 0
         except sqlite3.Error as e:
             raise DatabaseError(f"Error al eliminar favorito: {e}")
     
     def is_favorite(self, recipe_id: int) -> bool:
         """Comprueba si una receta está en favoritos."""
-        try:
-            conn = self.get_connection()
-            cursor = conn.cursor()
-            cursor.execute('SELECT 1 FROM favoritos WHERE receta_id = ?', (recipe_id,))
-            result = cursor.fetchone() is not None
-            conn.close()
-            return result
-        except sqlite3.Error as e:
-            return False
+        return recipe_id in self.get_favorite_ids()
     
     def get_favorites(self) -> List[Receta]:
         """Obtiene todas las recetas favoritas."""
+        def cargar():
+            generacion = self._generacion_cache
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute('''
+                    SELECT r.* FROM recetas r
+                    INNER JOIN favoritos f ON r.id = f.receta_id
+                    ORDER BY f.fecha_agregado DESC
+                ''')
+                rows = cursor.fetchall()
+            return self._recetas_desde_filas(rows, generacion)
         try:
-            conn = self.get_connection()
-            cursor = conn.cursor()
-            cursor.execute('''
-                SELECT r.* FROM recetas r
-                INNER JOIN favoritos f ON r.id = f.receta_id
-                ORDER BY f.fecha_agregado DESC
-            ''')
-            rows = cursor.fetchall()
-            conn.close()
-            return [Receta.from_dict(dict(row)) for row in rows]
+            return self._lista_cacheada(('favoritas', True), cargar)
         except sqlite3.Error as e:
             raise DatabaseError(f"Error al obtener favoritos: {e}")
 
     def get_favorite_ids(self) -> set:
         """Obtiene los IDs de las recetas favoritas."""
+        def cargar():
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute('SELECT receta_id FROM favoritos')
+                return {row[0] for row in cursor.fetchall()}
         try:
-            conn = self.get_connection()
-            cursor = conn.cursor()
-            cursor.execute('SELECT receta_id FROM favoritos')
-            ids = {row[0] for row in cursor.fetchall()}
-            conn.close()
-            return ids
+            return self._lista_cacheada(('favoritos_ids', True), cargar)
         except sqlite3.Error as e:
             return set()
 
+    def get_recipe_flags(self, recipe_ids: Iterable[int]) -> Dict[int, dict]:
+        """
+        Obtiene en una sola consulta el número de notas y si es favorita
+        para un conjunto de recetas (evita una consulta por tarjeta).
+
+        Returns:
+            {receta_id: {'notas': int, 'favorita': bool}}
+        """
+        ids = [int(i) for i in recipe_ids if i is not None]
+        if not ids:
+            return {}
+        try:
+            self.flush_writes()
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute('''
+                    SELECT ids.value AS receta_id,
+                           (SELECT COUNT(*) FROM notas_recetas n WHERE n.receta_id = ids.value) AS notas,
+                           EXISTS (SELECT 1 FROM favoritos f WHERE f.receta_id = ids.value) AS favorita
+                    FROM json_each(?) ids
+                ''', (json.dumps(ids),))
+                rows = cursor.fetchall()
+            return {row['receta_id']: {'notas': row['notas'], 'favorita': bool(row['favorita'])} for row in rows}
+        except sqlite3.Error as e:
+            raise DatabaseError(f"Error al obtener notas y favoritos: {e}")
+
+    # ==================== PERFILES ====================
+
+    _UPSERT_PERFIL = '''
+        INSERT INTO receta_perfil (receta_id, calorias, proteinas, carbohidratos, grasas,
+                                   alergenos, cobertura, version)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT (receta_id) DO UPDATE SET
+            calorias = excluded.calorias, proteinas = excluded.proteinas,
+            carbohidratos = excluded.carbohidratos, grasas = excluded.grasas,
+            alergenos = excluded.alergenos, cobertura = excluded.cobertura,
+            version = excluded.version
+    '''
+    # Filas sin perfil o con un perfil de otras tablas
+    _PERFILES_PENDIENTES = '''
+        FROM recetas r LEFT JOIN receta_perfil p ON p.receta_id = r.id
+        WHERE p.receta_id IS NULL OR p.version != ?
+    '''
+
+    def _guardar_perfiles(self, conn, perfiles, solo_desactualizados: bool = False):
+        """
+        Escribe perfiles (receta_id, PerfilReceta). Con `solo_desactualizados`
+        no pisa un perfil ya vigente: el recálculo de fondo nunca sobrescribe
+        lo que add_recipe/update_recipe acaban de guardar.
+        """
+        sql = self._UPSERT_PERFIL
+        if solo_desactualizados:
+            sql += ' WHERE receta_perfil.version != excluded.version'
+        conn.executemany(sql, [
+            (recipe_id, p.calorias, p.proteinas, p.carbohidratos, p.grasas,
+             p.alergenos, p.cobertura, p.version)
+            for recipe_id, p in perfiles
+        ])
+
+    def get_recipe_profile(self, recipe_id: int) -> Optional[PerfilReceta]:
+        """
+        Perfil guardado de una receta. Si falta o está desactualizado
+        (el recálculo de fondo aún no ha llegado a ella) se calcula y
+        se guarda en el momento.
+        """
+        try:
+            with self.get_connection() as conn:
+                row = conn.execute('SELECT * FROM receta_perfil WHERE receta_id = ?',
+                                   (recipe_id,)).fetchone()
+            if row is not None and row['version'] == VERSION_PERFIL:
+                return PerfilReceta.from_row(row)
+            receta = self.get_recipe_by_id(recipe_id)
+            if receta is None:
+                return None
+            perfil = self._perfiles.calcular(receta)
+            with self.get_connection() as conn:
+                self._guardar_perfiles(conn, [(recipe_id, perfil)], solo_desactualizados=True)
+                conn.commit()
+            self._invalidar_alergenos()
+            return perfil
+        except sqlite3.Error as e:
+            raise DatabaseError(f"Error al obtener el perfil de la receta: {e}")
+
+    def count_stale_profiles(self) -> int:
+        """Recetas sin perfil o con un perfil calculado con otras tablas."""
+        try:
+            with self.get_connection() as conn:
+                return conn.execute(f'SELECT COUNT(*) {self._PERFILES_PENDIENTES}',
+                                    (VERSION_PERFIL,)).fetchone()[0]
+        except sqlite3.Error as e:
+            raise DatabaseError(f"Error al contar perfiles pendientes: {e}")
+
+    def _perfiles_al_dia(self) -> bool:
+        """True si ninguna receta tiene el perfil pendiente (se recuerda en cuanto lo es)."""
+        if not self._perfiles_vigentes:
+            self._perfiles_vigentes = self.count_stale_profiles() == 0
+        return self._perfiles_vigentes
+
+    def rebuild_profiles(self, lote: Optional[int] = None) -> int:
+        """
+        Recalcula todos los perfiles pendientes, `lote` recetas por
+        transacción (las escrituras de la interfaz no esperan al total).
+        Devuelve cuántos se recalcularon.
+        """
+        lote = lote or self.LOTE_PERFILES
+        total = 0
+        try:
+            while not self._parar_perfiles.is_set():
+                with self.get_connection() as conn:
+                    rows = conn.execute(
+                        f'SELECT r.* {self._PERFILES_PENDIENTES} ORDER BY r.id LIMIT ?',
+                        (VERSION_PERFIL, lote)
+                    ).fetchall()
+                    if not rows:
+                        break
+                    recetas = [Receta.from_dict(dict(row), lazy=True) for row in rows]
+                    perfiles = self._perfiles.calcular_lote(recetas)
+                    self._guardar_perfiles(conn, zip((r.id for r in recetas), perfiles),
+                                           solo_desactualizados=True)
+                    conn.commit()
+                self._invalidar_alergenos()
+                total += len(rows)
+                self._stats_perfiles['recalculados'] += len(rows)
+            return total
+        except sqlite3.Error as e:
+            raise DatabaseError(f"Error al recalcular perfiles: {e}")
+
+    def start_profile_rebuild(self) -> bool:
+        """
+        Lanza rebuild_profiles() en un hilo de fondo (close() lo detiene
+        entre lotes). Devuelve False si ya había uno en marcha.
+        """
+        if self._hilo_perfiles and self._hilo_perfiles.is_alive():
+            return False
+        self._parar_perfiles.clear()
+        self._hilo_perfiles = threading.Thread(target=self._recalcular_en_fondo,
+                                               name="perfiles", daemon=True)
+        self._hilo_perfiles.start()
+        return True
+
+    def _recalcular_en_fondo(self):
+        try:
+            self.rebuild_profiles()
+        except DatabaseError as e:
+            # Lo que falte se calcula bajo demanda en get_recipe_profile
+            self._stats_perfiles['ultimo_error'] = str(e)
+
+    def get_profile_stats(self) -> dict:
+        """Estado del recálculo de perfiles (monitorización)."""
+        return {
+            **self._stats_perfiles,
+            'en_curso': bool(self._hilo_perfiles and self._hilo_perfiles.is_alive()),
+            'version': VERSION_PERFIL,
+        }
+
     # ==================== HISTORIAL ====================
     
     def start_execution(self, receta: Receta, porciones: int = None) -> int:
         """Registra el inicio de una ejecución."""
         try:
-            conn = self.get_connection()
-            cursor = conn.cursor()
-            cursor.execute('''
-                INSERT INTO historial (receta_id, receta_nombre, porciones_cocinadas)
-                VALUES (?, ?, ?)
-            ''', (receta.id, receta.nombre, porciones or receta.porciones))
-            exec_id = cursor.lastrowid
-            conn.commit()
-            conn.close()
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute('''
+                    INSERT INTO historial (receta_id, receta_nombre, porciones_cocinadas)
+                    VALUES (?, ?, ?)
+                ''', (receta.id, receta.nombre, porciones or receta.porciones))
+                exec_id = cursor.lastrowid
+                conn.commit()
             return exec_id
         except sqlite3.Error as e:
             raise DatabaseError(f"Error al registrar ejecución: {e}")
     
+    _SQL_FIN_EJECUCION = '''
+        UPDATE historial SET 
+            fecha_fin = CURRENT_TIMESTAMP,
+            duracion_real = ?,
+            completada = ?,
+            cancelada = ?
+        WHERE id = ?
+    '''
+    
     def finish_execution(self, exec_id: int, completada: bool = True, duracion_real: int = 0) -> bool:
-        """Registra el fin de una ejecución."""
+        """
+        Registra el fin de una ejecución.
+        Con escritura diferida se encola (fecha_fin se fija al volcar).
+        """
+        params = (duracion_real, 1 if completada else 0, 0 if completada else 1, exec_id)
         try:
-            conn = self.get_connection()
-            cursor = conn.cursor()
-            cursor.execute('''
-                UPDATE historial SET 
-                    fecha_fin = CURRENT_TIMESTAMP,
-                    duracion_real = ?,
-                    completada = ?,
-                    cancelada = ?
-                WHERE id = ?
-            ''', (duracion_real, 1 if completada else 0, 0 if completada else 1, exec_id))
-            conn.commit()
-            conn.close()
+            if self._escribir(self._SQL_FIN_EJECUCION, params):
+                return True
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(self._SQL_FIN_EJECUCION, params)
+                conn.commit()
             return True
         except sqlite3.Error as e:
             raise DatabaseError(f"Error al finalizar ejecución: {e}")
@@ -867,17 +1700,17 @@ class DatabaseHandler:
     def get_history(self, limit: int = 50) -> List[dict]:
         """Obtiene el historial de ejecuciones."""
         try:
-            conn = self.get_connection()
-            cursor = conn.cursor()
-            cursor.execute('''
-                SELECT h.*, r.dificultad, r.tiempo_total as tiempo_estimado
-                FROM historial h
-                LEFT JOIN recetas r ON h.receta_id = r.id
-                ORDER BY h.fecha_inicio DESC
-                LIMIT ?
-            ''', (limit,))
-            rows = cursor.fetchall()
-            conn.close()
+            self.flush_writes()
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute('''
+                    SELECT h.*, r.dificultad, r.tiempo_total as tiempo_estimado
+                    FROM historial h
+                    LEFT JOIN recetas r ON h.receta_id = r.id
+                    ORDER BY h.fecha_inicio DESC
+                    LIMIT ?
+                ''', (limit,))
+                rows = cursor.fetchall()
             return [dict(row) for row in rows]
         except sqlite3.Error as e:
             raise DatabaseError(f"Error al obtener historial: {e}")
@@ -885,41 +1718,41 @@ class DatabaseHandler:
     def get_stats(self) -> dict:
         """Obtiene estadísticas de uso."""
         try:
-            conn = self.get_connection()
-            cursor = conn.cursor()
+            self.flush_writes()
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
             
-            # Total de ejecuciones
-            cursor.execute('SELECT COUNT(*) FROM historial')
-            total_ejecuciones = cursor.fetchone()[0]
+                # Total de ejecuciones
+                cursor.execute('SELECT COUNT(*) FROM historial')
+                total_ejecuciones = cursor.fetchone()[0]
             
-            # Completadas
-            cursor.execute('SELECT COUNT(*) FROM historial WHERE completada = 1')
-            completadas = cursor.fetchone()[0]
+                # Completadas
+                cursor.execute('SELECT COUNT(*) FROM historial WHERE completada = 1')
+                completadas = cursor.fetchone()[0]
             
-            # Canceladas
-            cursor.execute('SELECT COUNT(*) FROM historial WHERE cancelada = 1')
-            canceladas = cursor.fetchone()[0]
+                # Canceladas
+                cursor.execute('SELECT COUNT(*) FROM historial WHERE cancelada = 1')
+                canceladas = cursor.fetchone()[0]
             
-            # Receta más cocinada
-            cursor.execute('''
-                SELECT receta_nombre, COUNT(*) as veces
-                FROM historial
-                GROUP BY receta_nombre
-                ORDER BY veces DESC
-                LIMIT 1
-            ''')
-            row = cursor.fetchone()
-            receta_favorita = dict(row) if row else None
+                # Receta más cocinada
+                cursor.execute('''
+                    SELECT receta_nombre, COUNT(*) as veces
+                    FROM historial
+                    GROUP BY receta_nombre
+                    ORDER BY veces DESC
+                    LIMIT 1
+                ''')
+                row = cursor.fetchone()
+                receta_favorita = dict(row) if row else None
             
-            # Tiempo total cocinando
-            cursor.execute('SELECT SUM(duracion_real) FROM historial WHERE completada = 1')
-            tiempo_total = cursor.fetchone()[0] or 0
+                # Tiempo total cocinando
+                cursor.execute('SELECT SUM(duracion_real) FROM historial WHERE completada = 1')
+                tiempo_total = cursor.fetchone()[0] or 0
             
-            # Recetas únicas cocinadas
-            cursor.execute('SELECT COUNT(DISTINCT receta_nombre) FROM historial')
-            recetas_unicas = cursor.fetchone()[0]
+                # Recetas únicas cocinadas
+                cursor.execute('SELECT COUNT(DISTINCT receta_nombre) FROM historial')
+                recetas_unicas = cursor.fetchone()[0]
             
-            conn.close()
             return {
                 'total_ejecuciones': total_ejecuciones,
                 'completadas': completadas,
@@ -935,26 +1768,31 @@ class DatabaseHandler:
     def clear_history(self) -> bool:
         """Limpia todo el historial."""
         try:
-            conn = self.get_connection()
-            cursor = conn.cursor()
-            cursor.execute('DELETE FROM historial')
-            conn.commit()
-            conn.close()
+            self.flush_writes()
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute('DELETE FROM historial')
+                conn.commit()
             return True
         except sqlite3.Error as e:
             raise DatabaseError(f"Error al limpiar historial: {e}")
 
     # ==================== NOTAS DE RECETAS ====================
     
-    def add_note(self, receta_id: int, nota: str) -> int:
-        """Añade una nota a una receta."""
+    def add_note(self, receta_id: int, nota: str) -> Optional[int]:
+        """
+        Añade una nota a una receta.
+        Devuelve su id, o None si la escritura diferida la ha encolado.
+        """
+        sql = 'INSERT INTO notas_recetas (receta_id, nota) VALUES (?, ?)'
         try:
-            conn = self.get_connection()
-            cursor = conn.cursor()
-            cursor.execute('INSERT INTO notas_recetas (receta_id, nota) VALUES (?, ?)', (receta_id, nota))
-            note_id = cursor.lastrowid
-            conn.commit()
-            conn.close()
+            if self._escribir(sql, (receta_id, nota)):
+                return None
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(sql, (receta_id, nota))
+                note_id = cursor.lastrowid
+                conn.commit()
             return note_id
         except sqlite3.Error as e:
             raise DatabaseError(f"Error al añadir nota: {e}")
@@ -962,11 +1800,11 @@ class DatabaseHandler:
     def get_notes(self, receta_id: int) -> list:
         """Obtiene todas las notas de una receta."""
         try:
-            conn = self.get_connection()
-            cursor = conn.cursor()
-            cursor.execute('SELECT * FROM notas_recetas WHERE receta_id = ? ORDER BY fecha DESC', (receta_id,))
-            rows = cursor.fetchall()
-            conn.close()
+            self.flush_writes()
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute('SELECT * FROM notas_recetas WHERE receta_id = ? ORDER BY fecha DESC', (receta_id,))
+                rows = cursor.fetchall()
             return [dict(row) for row in rows]
         except sqlite3.Error as e:
             return []
@@ -974,12 +1812,12 @@ class DatabaseHandler:
     def delete_note(self, note_id: int) -> bool:
         """Elimina una nota."""
         try:
-            conn = self.get_connection()
-            cursor = conn.cursor()
-            cursor.execute('DELETE FROM notas_recetas WHERE id = ?', (note_id,))
-            affected = cursor.rowcount
-            conn.commit()
-            conn.close()
+            self.flush_writes()
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute('DELETE FROM notas_recetas WHERE id = ?', (note_id,))
+                affected = cursor.rowcount
+                conn.commit()
             return affected > 0
         except sqlite3.Error as e:
             raise DatabaseError(f"Error al eliminar nota: {e}")
@@ -0,0 +1,182 @@
+"""
+Cola de escritura diferida (write-behind) para el DatabaseHandler.
+Agrupa escrituras pequeñas (historial, notas) en transacciones por lotes.
+"""
+
+import sqlite3
+import threading
+import time
+from itertools import groupby
+from typing import List, Sequence, Tuple
+
+from database.connection_pool import ConnectionPool
+from utils.exceptions import DatabaseError
+
+
+class WriteBehindQueue:
+    """
+    Cola de escrituras SQLite que se vuelcan en lote.
+
+    - submit() encola la sentencia y vuelve inmediatamente
+    - Un hilo de fondo vuelca la cola en UNA transacción cuando pasa
+      `flush_interval` segundos desde la primera escritura pendiente
+      o cuando se acumulan `max_batch` escrituras
+    - flush() vuelca de forma síncrona (antes de leer las tablas afectadas)
+    - close() vuelca lo pendiente y detiene el hilo (hook de apagado)
+
+    Si el lote falla por un error transitorio (BD bloqueada, pool
+    agotado) vuelve entero a la cola. Si falla una sentencia concreta
+    (p. ej. IntegrityError), el lote se repite sentencia a sentencia y
+    solo se descarta (y se registra) la que falla.
+
+    Las escrituras se aplican en el orden en que se encolaron.
+    """
+
+    def __init__(
+        self,
+        pool: ConnectionPool,
+        flush_interval: float = 0.5,
+        max_batch: int = 200
+    ):
+        """
+        Args:
+            pool: Pool del que se toma la conexión para cada volcado
+            flush_interval: Máximo de segundos que una escritura espera en cola
+            max_batch: Escrituras pendientes que fuerzan un volcado inmediato
+        """
+        if flush_interval <= 0:
+            raise ValueError("El intervalo de volcado debe ser positivo")
+        self._pool = pool
+        self._flush_interval = flush_interval
+        self._max_batch = max(1, max_batch)
+
+        self._pendientes: List[Tuple[str, Sequence]] = []
+        self._primera_pendiente = 0.0
+        self._cond = threading.Condition()
+        # Serializa los volcados (hilo de fondo y flush() explícitos)
+        self._lock_volcado = threading.Lock()
+        self._cerrada = False
+        self._stats = {"encoladas": 0, "volcados": 0, "escritas": 0, "descartadas": 0, "errores": 0}
+        self._ultimo_error = None
+
+        self._hilo = threading.Thread(target=self._bucle, name="write-behind", daemon=True)
+        self._hilo.start()
+
+    def submit(self, sql: str, params: Sequence = ()) -> None:
+        """Encola una sentencia de escritura."""
+        with self._cond:
+            if self._cerrada:
+                raise DatabaseError("La cola de escritura está cerrada")
+            primera = not self._pendientes
+            if primera:
+                self._primera_pendiente = time.monotonic()
+            self._pendientes.append((sql, tuple(params)))
+            self._stats["encoladas"] += 1
+            # Despertar al hilo para que arme el plazo o vuelque el lote lleno
+            if primera or len(self._pendientes) >= self._max_batch:
+                self._cond.notify()
+
+    def flush(self) -> int:
+        """Vuelca ya todas las escrituras pendientes. Devuelve cuántas se escribieron."""
+        with self._lock_volcado:
+            with self._cond:
+                lote, self._pendientes = self._pendientes, []
+            if not lote:
+                return 0
+            descartadas = 0
+            try:
+                with self._pool.connection() as conn:
+                    try:
+                        # Sentencias consecutivas iguales van en un solo executemany
+                        for sql, grupo in groupby(lote, key=lambda e: e[0]):
+                            conn.executemany(sql, [params for _, params in grupo])
+                    except sqlite3.OperationalError:
+                        raise
+                    except sqlite3.Error as e:
+                        # Falla una sentencia concreta (restricción, parámetros):
+                        # se repite el lote una a una y solo se pierde esa
+                        conn.rollback()
+                        with self._cond:
+                            self._stats["errores"] += 1
+                            self._ultimo_error = str(e)
+                        descartadas = self._escribir_una_a_una(conn, lote)
+                    conn.commit()
+            except (sqlite3.Error, DatabaseError) as e:
+                with self._cond:
+                    self._stats["errores"] += 1
+                    self._ultimo_error = str(e)
+                    if isinstance(e, (sqlite3.OperationalError, DatabaseError)):
+                        # Error transitorio (BD bloqueada, pool agotado): se reintenta
+                        self._pendientes[:0] = lote
+                        self._primera_pendiente = time.monotonic()
+                raise DatabaseError(f"Error al volcar escrituras diferidas: {e}")
+            escritas = len(lote) - descartadas
+            with self._cond:
+                self._stats["volcados"] += 1
+                self._stats["escritas"] += escritas
+                self._stats["descartadas"] += descartadas
+            return escritas
+
+    def close(self) -> None:
+        """Vuelca lo pendiente y detiene el hilo de fondo."""
+        with self._cond:
+            if self._cerrada:
+                return
+            self._cerrada = True
+            self._cond.notify()
+        self._hilo.join()
+        self.flush()
+
+    @property
+    def pendientes(self) -> int:
+        with self._cond:
+            return len(self._pendientes)
+
+    def get_stats(self) -> dict:
+        """Estadísticas de la cola."""
+        with self._cond:
+            stats = dict(self._stats)
+            stats["pendientes"] = len(self._pendientes)
+            stats["ultimo_error"] = self._ultimo_error
+        return stats
+
+    # ==================== INTERNOS ====================
+
+    @staticmethod
+    def _escribir_una_a_una(conn: sqlite3.Connection, lote: List[Tuple[str, Sequence]]) -> int:
+        """
+        Ejecuta el lote sentencia a sentencia en la transacción abierta.
+        Las que fallan se descartan (SQLite deshace solo esa sentencia);
+        un error transitorio se propaga para reintentar el lote entero.
+        Devuelve cuántas se descartaron.
+        """
+        descartadas = 0
+        for sql, params in lote:
+            try:
+                conn.execute(sql, params)
+            except sqlite3.OperationalError:
+                raise
+            except sqlite3.Error as e:
+                descartadas += 1
+                print(f"[WRITE-BEHIND] Escritura descartada ({e}): {' '.join(sql.split())} {params}")
+        return descartadas
+
+    def _bucle(self) -> None:
+        while True:
+            with self._cond:
+                while not self._cerrada:
+                    if self._pendientes:
+                        restante = self._primera_pendiente + self._flush_interval - time.monotonic()
+                        if restante <= 0 or len(self._pendientes) >= self._max_batch:
+                            break
+                        self._cond.wait(restante)
+                    else:
+                        self._cond.wait()
+                if self._cerrada:
+                    return
+            try:
+                self.flush()
+            except DatabaseError:
+                # Ya contabilizado en las estadísticas; los errores transitorios
+                # se reintentan en el siguiente intervalo
+                pass
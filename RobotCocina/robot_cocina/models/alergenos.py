@@ -0,0 +1,247 @@
+"""
+=================================================================
+DETECCIÓN DE ALÉRGENOS
+=================================================================
+Busca los alérgenos de ALERGENOS en nombres de ingredientes.
+
+AUTÓMATA (Aho-Corasick):
+- Todas las palabras clave de todos los alérgenos se compilan en un
+  único autómata: cada nombre se recorre UNA vez, carácter a carácter,
+  sea cual sea el número de alérgenos y palabras
+- Las transiciones se precalculan completas (DFA): un paso es una
+  sola consulta a diccionario, sin seguir enlaces de fallo
+- Antes: ingredientes × alérgenos × palabras comprobaciones `in`
+
+NORMALIZACIÓN:
+- Minúsculas y sin tildes ("Salmón" encuentra "salmon", "piñón"
+  encuentra "piñon"); se pliega carácter a carácter, así que las
+  posiciones de las coincidencias valen en el texto original
+
+MÁSCARAS:
+- Cada alérgeno tiene un bit (su posición en ALERGENOS); la máscara
+  de una receta es lo que se guarda en la base de datos
+
+CATÁLOGO:
+- detectar_catalogo() concatena los ingredientes de todas las
+  recetas y los recorre en una sola pasada
+=================================================================
+"""
+
+from __future__ import annotations
+import unicodedata
+from bisect import bisect_right
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Iterator, List, Sequence, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from models.receta import Ingrediente, Receta
+
+
+ALERGENOS: Dict[str, Dict[str, Any]] = {
+    'gluten': {'icono': '🌾', 'nombre': 'Gluten', 'color': '#d97706',
+               'ingredientes': ['harina', 'pan', 'pasta', 'trigo', 'cebada', 'centeno', 'avena', 'sémola', 'cuscús']},
+    'lactosa': {'icono': '🥛', 'nombre': 'Lácteos', 'color': '#0ea5e9',
+                'ingredientes': ['leche', 'nata', 'queso', 'mantequilla', 'yogur', 'crema', 'bechamel']},
+    'huevo': {'icono': '🥚', 'nombre': 'Huevo', 'color': '#eab308',
+              'ingredientes': ['huevo', 'yema', 'clara', 'mayonesa']},
+    'frutos_secos': {'icono': '🥜', 'nombre': 'Frutos Secos', 'color': '#92400e',
+                     'ingredientes': ['almendra', 'nuez', 'avellana', 'pistacho', 'anacardo', 'cacahuete', 'piñon']},
+    'pescado': {'icono': '🐟', 'nombre': 'Pescado', 'color': '#0284c7',
+                'ingredientes': ['merluza', 'salmon', 'bacalao', 'atun', 'anchoa', 'sardina', 'pescado']},
+    'marisco': {'icono': '🦐', 'nombre': 'Marisco', 'color': '#dc2626',
+                'ingredientes': ['gamba', 'langostino', 'mejillon', 'almeja', 'calamar', 'pulpo', 'marisco']},
+    'soja': {'icono': '🫘', 'nombre': 'Soja', 'color': '#65a30d',
+             'ingredientes': ['soja', 'tofu', 'edamame', 'salsa de soja']},
+    'apio': {'icono': '🥬', 'nombre': 'Apio', 'color': '#16a34a',
+             'ingredientes': ['apio']},
+    'mostaza': {'icono': '🟡', 'nombre': 'Mostaza', 'color': '#ca8a04',
+                'ingredientes': ['mostaza']},
+    'sesamo': {'icono': '⚪', 'nombre': 'Sésamo', 'color': '#a3a3a3',
+               'ingredientes': ['sesamo', 'ajonjoli']},
+}
+
+# Bit de cada alérgeno en las máscaras persistidas: los nuevos, siempre al final
+BITS_ALERGENOS: Dict[str, int] = {clave: 1 << i for i, clave in enumerate(ALERGENOS)}
+
+_SEPARADOR = '\x00'  # entre textos del catálogo: no está en ninguna palabra
+
+
+def mascara_alergenos(claves: Iterable[str]) -> int:
+    """Máscara de bits de un conjunto de alérgenos."""
+    mascara = 0
+    for clave in claves:
+        mascara |= BITS_ALERGENOS[clave]
+    return mascara
+
+
+def alergenos_de_mascara(mascara: int) -> Tuple[str, ...]:
+    """Claves de los alérgenos de una máscara, en el orden de ALERGENOS."""
+    return tuple(clave for clave, bit in BITS_ALERGENOS.items() if mascara & bit)
+
+
+class _Pliegue(dict):
+    """Tabla para str.translate: cada carácter → su letra base en minúscula."""
+
+    def __missing__(self, codigo: int) -> str:
+        caracter = chr(codigo)
+        base = ''.join(c for c in unicodedata.normalize('NFD', caracter)
+                       if not unicodedata.combining(c)).lower()
+        # Un carácter por carácter: las posiciones no se desplazan
+        self[codigo] = plegado = base if len(base) == 1 else caracter
+        return plegado
+
+
+_PLIEGUE = _Pliegue()
+
+
+def plegar(texto: str) -> str:
+    """Minúsculas y sin tildes, con la misma longitud que `texto`."""
+    return texto.translate(_PLIEGUE)
+
+
+@dataclass(frozen=True, slots=True)
+class CoincidenciaAlergeno:
+    """Una palabra clave de un alérgeno encontrada en un texto."""
+    alergeno: str
+    palabra: str
+    indice: int  # posición del texto en la secuencia recorrida
+    inicio: int
+    fin: int
+
+
+class DetectorAlergenos:
+    """
+    Autómata Aho-Corasick compilado a partir de una tabla de alérgenos
+    con el formato de ALERGENOS. Es inmutable tras construirse y puede
+    compartirse entre interfaces e hilos.
+    """
+
+    __slots__ = ('_alergenos', '_orden', '_patrones', '_delta', '_salidas')
+
+    def __init__(self, alergenos: Dict[str, Dict[str, Any]] = ALERGENOS):
+        self._alergenos = alergenos
+        self._orden = {clave: i for i, clave in enumerate(alergenos)}
+        # (alérgeno, palabra original, longitud) por patrón
+        self._patrones: List[Tuple[str, str, int]] = []
+        self._compilar()
+
+    # ==================== COMPILACIÓN ====================
+
+    def _compilar(self) -> None:
+        hijos: List[Dict[str, int]] = [{}]
+        salidas: List[List[int]] = [[]]
+        for clave, info in self._alergenos.items():
+            for palabra in info['ingredientes']:
+                normalizada = plegar(palabra)
+                if not normalizada:
+                    continue
+                estado = 0
+                for c in normalizada:
+                    siguiente = hijos[estado].get(c)
+                    if siguiente is None:
+                        siguiente = len(hijos)
+                        hijos[estado][c] = siguiente
+                        hijos.append({})
+                        salidas.append([])
+                    estado = siguiente
+                salidas[estado].append(len(self._patrones))
+                self._patrones.append((clave, palabra, len(normalizada)))
+
+        # Recorrido en anchura: enlace de fallo y transiciones completas.
+        # Un carácter fuera del alfabeto de las palabras siempre lleva a 0
+        delta: List[Dict[str, int]] = [{} for _ in hijos]
+        fallo = [0] * len(hijos)
+        cola = [0]
+        for estado in cola:
+            delta[estado] = {**delta[fallo[estado]], **hijos[estado]} if estado else dict(hijos[0])
+            for c, hijo in hijos[estado].items():
+                fallo[hijo] = delta[fallo[estado]].get(c, 0) if estado else 0
+                salidas[hijo].extend(salidas[fallo[hijo]])
+                cola.append(hijo)
+
+        self._delta = delta
+        self._salidas = [tuple(s) for s in salidas]
+
+    @property
+    def palabras(self) -> Tuple[str, ...]:
+        """Palabras clave compiladas, tal como aparecen en la tabla."""
+        return tuple(palabra for _, palabra, _ in self._patrones)
+
+    # ==================== BÚSQUEDA ====================
+
+    def _recorrer(self, texto: str) -> Iterator[Tuple[int, int]]:
+        """(posición final, patrón) de cada coincidencia en `texto` ya plegado."""
+        delta, salidas = self._delta, self._salidas
+        estado = 0
+        for i, c in enumerate(texto):
+            estado = delta[estado].get(c, 0)
+            if salidas[estado]:
+                for patron in salidas[estado]:
+                    yield i + 1, patron
+
+    def buscar(self, texto: str) -> List[CoincidenciaAlergeno]:
+        """Todas las coincidencias en `texto`, con sus posiciones."""
+        return list(self.escanear((texto,)))
+
+    def escanear(self, textos: Iterable[str]) -> Iterator[CoincidenciaAlergeno]:
+        """
+        Coincidencias de una secuencia de textos recorridos en una sola
+        pasada; `indice` dice en qué texto está cada una.
+        """
+        textos = list(textos)
+        inicios, acumulado = [], 0
+        for texto in textos:
+            inicios.append(acumulado)
+            acumulado += len(texto) + 1
+        patrones = self._patrones
+        for fin, patron in self._recorrer(plegar(_SEPARADOR.join(textos))):
+            indice = bisect_right(inicios, fin - 1) - 1
+            clave, palabra, longitud = patrones[patron]
+            yield CoincidenciaAlergeno(clave, palabra, indice,
+                                       fin - longitud - inicios[indice], fin - inicios[indice])
+
+    def claves(self, ingredientes: Sequence[Ingrediente]) -> Tuple[str, ...]:
+        """Alérgenos presentes en los ingredientes, en el orden de la tabla."""
+        encontrados = {self._patrones[p][0]
+                       for _, p in self._recorrer(plegar(_SEPARADOR.join(i.nombre for i in ingredientes)))}
+        return tuple(sorted(encontrados, key=self._orden.__getitem__))
+
+    def detectar(self, ingredientes: Sequence[Ingrediente]) -> List[Dict[str, Any]]:
+        """
+        Alérgenos presentes en una lista de ingredientes, con los datos
+        para mostrarlos y el primer ingrediente que los contiene.
+        """
+        primero: Dict[str, Tuple[int, int]] = {}
+        for c in self.escanear(i.nombre for i in ingredientes):
+            orden = (c.indice, self._orden[c.alergeno])
+            if c.alergeno not in primero or orden < primero[c.alergeno]:
+                primero[c.alergeno] = orden
+        detectados = []
+        for clave, (indice, _) in sorted(primero.items(), key=lambda e: e[1]):
+            info = self._alergenos[clave]
+            detectados.append({
+                'key': clave,
+                'icono': info['icono'],
+                'nombre': info['nombre'],
+                'color': info['color'],
+                'encontrado_en': ingredientes[indice].nombre,
+            })
+        return detectados
+
+    def detectar_catalogo(self, recetas: Iterable[Receta]) -> List[Tuple[str, ...]]:
+        """
+        Alérgenos de cada receta (mismo orden que `recetas`) recorriendo
+        los ingredientes de todo el catálogo en una sola pasada.
+        """
+        nombres: List[str] = []
+        receta_de: List[int] = []
+        total = 0
+        for r, receta in enumerate(recetas):
+            for ing in receta.ingredientes:
+                nombres.append(ing.nombre)
+                receta_de.append(r)
+            total = r + 1
+        encontrados: List[set] = [set() for _ in range(total)]
+        for c in self.escanear(nombres):
+            encontrados[receta_de[c.indice]].add(c.alergeno)
+        return [tuple(sorted(e, key=self._orden.__getitem__)) for e in encontrados]
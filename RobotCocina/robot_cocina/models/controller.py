@@ -66,6 +66,10 @@ class RobotController:
         """
         return self._robot.preparar_receta(receta)
     
+    def descartar_receta(self) -> bool:
+        """Descarta la receta preparada o terminada (vuelve a IDLE)."""
+        return self._robot.descartar_receta()
+    
     async def ejecutar_receta(self) -> bool:
         """
         Ejecuta la receta preparada.
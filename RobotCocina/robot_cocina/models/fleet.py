@@ -0,0 +1,404 @@
+"""
+=================================================================
+FLOTA DE ROBOTS
+=================================================================
+Gestiona N robots de cocina en un mismo bucle de eventos.
+
+REGISTRO:
+- Cada robot tiene un id ("robot-1", "robot-2"... o uno propio),
+  su RobotController y, si está cocinando, su tarea asyncio
+- Todos comparten el reloj de la flota: con RelojVirtual la flota
+  entera se simula sin esperas
+
+ESTADO:
+- snapshot(id) / snapshots(): foto inmutable de cada robot
+- get_metricas(): agregados de la flota (robots por estado,
+  recetas completadas/canceladas/con error, utilización, deriva)
+
+Las métricas se alimentan con un ObservadorRobot por robot (patrón
+Observer): no se recorre la flota en cada tick, solo al consultar.
+=================================================================
+"""
+
+from __future__ import annotations
+import asyncio
+import contextlib
+import itertools
+from dataclasses import dataclass, asdict
+from typing import Any, Callable, Dict, Iterator, List, Optional, TYPE_CHECKING
+
+from models.controller import RobotController
+from models.robot import Robot, EstadoRobot, ObservadorRobot
+from utils.clock import Reloj, RelojReal
+from utils.exceptions import TareaInvalidaError
+
+if TYPE_CHECKING:
+    from models.receta import Receta
+
+
+_OCUPADO = (EstadoRobot.EJECUTANDO, EstadoRobot.PAUSADO)
+_LIBRE = (EstadoRobot.IDLE, EstadoRobot.FINALIZADO)
+
+
+@dataclass(frozen=True, slots=True)
+class RobotSnapshot:
+    """Estado de un robot de la flota en un instante del reloj."""
+    robot_id: str
+    estado: str
+    receta: Optional[str]
+    tarea: Optional[str]
+    paso_actual: int
+    total_pasos: int
+    progreso_paso: int
+    progreso_receta: int
+    temperatura: int
+    velocidad: int
+    restante_paso: int
+    restante_receta: int
+    instante: float
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convierte la foto a diccionario (para la UI o JSON)."""
+        return asdict(self)
+
+
+class _UnidadFlota:
+    """Entrada del registro: robot, controlador y contabilidad de uso."""
+
+    __slots__ = ('robot_id', 'robot', 'controller', 'observador', 'tarea',
+                 'alta', 'inicio_ocupado', 'estado_previo')
+
+    def __init__(self, robot_id: str, robot: Robot, alta: float):
+        self.robot_id = robot_id
+        self.robot = robot
+        self.controller = RobotController(robot)
+        self.observador: Optional[_ObservadorFlota] = None
+        self.tarea: Optional[asyncio.Task] = None
+        self.alta = alta
+        self.inicio_ocupado: Optional[float] = None
+        self.estado_previo = robot.estado
+
+
+class _ObservadorFlota(ObservadorRobot):
+    """Traslada los cambios de estado de un robot a las métricas de la flota."""
+
+    def __init__(self, flota: RobotFleet, unidad: _UnidadFlota):
+        self._flota = flota
+        self._unidad = unidad
+
+    def on_estado_changed(self, estado: EstadoRobot) -> None:
+        self._flota._registrar_transicion(self._unidad, estado)
+
+    def on_progreso_changed(self, progreso: int) -> None:
+        pass
+
+    def on_evento(self, mensaje: str) -> None:
+        pass
+
+
+class RobotFleet:
+    """
+    Registro de robots que cocinan concurrentemente.
+
+        flota = RobotFleet()
+        rid = flota.agregar()                 # "robot-1", ya encendido
+        tarea = flota.lanzar(rid, receta)     # cocina en segundo plano
+        flota.snapshot(rid).progreso_receta
+        await flota.esperar()
+        flota.get_metricas()["recetas_completadas"]
+    """
+
+    def __init__(self, reloj: Optional[Reloj] = None,
+                 velocidad_simulacion: Optional[float] = None):
+        """
+        Args:
+            reloj: Reloj compartido por todos los robots (por defecto, RelojReal)
+            velocidad_simulacion: Velocidad del simulador de cada robot nuevo
+                                  (None = la del robot por defecto)
+        """
+        self._reloj: Reloj = reloj or RelojReal()
+        self._velocidad_simulacion = velocidad_simulacion
+        self._unidades: Dict[str, _UnidadFlota] = {}
+        self._secuencia = itertools.count(1)
+
+        # ===== MÉTRICAS ACUMULADAS =====
+        self._iniciadas = 0
+        self._completadas = 0
+        self._canceladas = 0
+        self._errores = 0
+        self._tiempo_ocupado = 0.0
+        self._capacidad_retirada = 0.0
+        self._pasos_medidos = 0
+        self._deriva_total = 0.0
+        self._deriva_max = 0.0
+
+    # ==================== REGISTRO ====================
+
+    def agregar(self, robot_id: Optional[str] = None, encender: bool = True) -> str:
+        """
+        Crea un robot con el reloj de la flota y lo registra.
+
+        Args:
+            robot_id: Identificador (por defecto, "robot-N")
+            encender: Dejar el robot encendido y listo
+
+        Returns:
+            Id del robot
+
+        Raises:
+            ValueError: Si el id ya está registrado
+        """
+        if robot_id is None:
+            robot_id = f"robot-{next(self._secuencia)}"
+            while robot_id in self._unidades:
+                robot_id = f"robot-{next(self._secuencia)}"
+        elif robot_id in self._unidades:
+            raise ValueError(f"Ya existe un robot con id '{robot_id}'")
+
+        robot = Robot(reloj=self._reloj)
+        if self._velocidad_simulacion is not None:
+            robot.velocidad_simulacion = self._velocidad_simulacion
+
+        unidad = _UnidadFlota(robot_id, robot, self._reloj.ahora())
+        unidad.observador = _ObservadorFlota(self, unidad)
+        robot.agregar_observador(unidad.observador)
+        self._unidades[robot_id] = unidad
+
+        if encender:
+            robot.encender()
+        return robot_id
+
+    def quitar(self, robot_id: str) -> Robot:
+        """
+        Da de baja un robot parado.
+
+        Raises:
+            KeyError: Si el id no existe
+            TareaInvalidaError: Si el robot está cocinando
+        """
+        unidad = self._unidad(robot_id)
+        if unidad.robot.esta_ocupado or unidad.tarea is not None:
+            raise TareaInvalidaError(f"El robot '{robot_id}' está cocinando")
+
+        unidad.robot.eliminar_observador(unidad.observador)
+        self._capacidad_retirada += self._reloj.ahora() - unidad.alta
+        del self._unidades[robot_id]
+        return unidad.robot
+
+    def robot(self, robot_id: str) -> Robot:
+        """Robot registrado con ese id (KeyError si no existe)."""
+        return self._unidad(robot_id).robot
+
+    def controller(self, robot_id: str) -> RobotController:
+        """Controlador del robot registrado con ese id."""
+        return self._unidad(robot_id).controller
+
+    def _unidad(self, robot_id: str) -> _UnidadFlota:
+        try:
+            return self._unidades[robot_id]
+        except KeyError:
+            raise KeyError(f"Robot desconocido: '{robot_id}'") from None
+
+    @property
+    def reloj(self) -> Reloj:
+        """Reloj compartido por la flota."""
+        return self._reloj
+
+    @property
+    def ids(self) -> List[str]:
+        """Ids registrados, en orden de alta."""
+        return list(self._unidades)
+
+    def __len__(self) -> int:
+        return len(self._unidades)
+
+    def __contains__(self, robot_id: object) -> bool:
+        return robot_id in self._unidades
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._unidades))
+
+    # ==================== COCINADO ====================
+
+    def lanzar(self, robot_id: str, receta: Receta,
+               al_terminar: Optional[Callable[[str, asyncio.Task], None]] = None) -> asyncio.Task:
+        """
+        Prepara la receta y la cocina en segundo plano.
+
+        La preparación es síncrona: una receta inválida o un robot
+        ocupado fallan aquí, antes de crear la tarea. El robot entra
+        también aquí en su sesión del reloj: con RelojVirtual, el tiempo
+        no avanza antes de que la tarea llegue a arrancar.
+
+        Args:
+            robot_id: Robot que cocina
+            receta: Receta a cocinar
+            al_terminar: Llamada (robot_id, tarea) al acabar, ANTES de que el
+                         robot salga de su sesión: puede lanzarle la siguiente
+                         receta sin que el reloj virtual avance entre medias
+
+        Returns:
+            Tarea asyncio cuyo resultado es el de comenzar_receta()
+
+        Raises:
+            KeyError: Si el id no existe
+            TareaInvalidaError / RecetaError / RobotApagadoError:
+                los mismos que Robot.preparar_receta
+        """
+        unidad = self._unidad(robot_id)
+        if unidad.tarea is not None:
+            raise TareaInvalidaError(f"El robot '{robot_id}' ya está cocinando")
+
+        unidad.robot.preparar_receta(receta)
+        sesion = contextlib.ExitStack()
+        sesion.enter_context(unidad.robot.sesion())
+        tarea = asyncio.create_task(unidad.robot.comenzar_receta(), name=f"flota:{robot_id}")
+        unidad.tarea = tarea
+        tarea.add_done_callback(lambda t, u=unidad: self._al_terminar(u, t, sesion, al_terminar))
+        return tarea
+
+    def disponible(self, robot_id: str) -> bool:
+        """Indica si el robot puede aceptar una receta ya."""
+        return self._libre(self._unidad(robot_id))
+
+    def disponibles(self) -> List[str]:
+        """Ids de los robots que pueden aceptar una receta ya, en orden de alta."""
+        return [rid for rid, u in self._unidades.items() if self._libre(u)]
+
+    @staticmethod
+    def _libre(unidad: _UnidadFlota) -> bool:
+        return unidad.tarea is None and unidad.robot.estado in _LIBRE
+
+    async def cocinar(self, robot_id: str, receta: Receta) -> bool:
+        """Prepara y cocina una receta; True si se completó."""
+        return await self.lanzar(robot_id, receta)
+
+    async def esperar(self) -> None:
+        """Espera a que terminen todas las recetas en curso."""
+        tareas = [u.tarea for u in self._unidades.values() if u.tarea is not None]
+        if tareas:
+            await asyncio.gather(*tareas, return_exceptions=True)
+
+    def parada_emergencia(self, robot_id: Optional[str] = None) -> None:
+        """Detiene un robot o, sin id, todos los que están cocinando."""
+        if robot_id is not None:
+            self._unidad(robot_id).robot.parada_emergencia()
+            return
+        for unidad in list(self._unidades.values()):
+            if unidad.robot.esta_ocupado:
+                unidad.robot.parada_emergencia()
+
+    def _al_terminar(self, unidad: _UnidadFlota, tarea: asyncio.Task,
+                     sesion: contextlib.ExitStack,
+                     al_terminar: Optional[Callable[[str, asyncio.Task], None]]) -> None:
+        """Libera la tarea del registro y cierra la sesión del robot."""
+        if unidad.tarea is tarea:
+            unidad.tarea = None
+        if not tarea.cancelled() and tarea.exception() is not None:
+            print(f"[FLOTA] Error en {unidad.robot_id}: {tarea.exception()}")
+        try:
+            if al_terminar is not None:
+                al_terminar(unidad.robot_id, tarea)
+        finally:
+            sesion.close()
+
+    # ==================== MÉTRICAS ====================
+
+    def _registrar_transicion(self, unidad: _UnidadFlota, estado: EstadoRobot) -> None:
+        """Contabiliza el inicio y el final de cada receta de un robot."""
+        anterior = unidad.estado_previo
+        unidad.estado_previo = estado
+        if anterior in _OCUPADO:
+            if estado in _OCUPADO:
+                return  # pausa o reanudación: el robot sigue ocupado
+            if unidad.inicio_ocupado is not None:
+                self._tiempo_ocupado += self._reloj.ahora() - unidad.inicio_ocupado
+                unidad.inicio_ocupado = None
+            if estado == EstadoRobot.FINALIZADO:
+                self._completadas += 1
+                self._acumular_derivas(unidad.robot.get_derivas())
+            elif estado == EstadoRobot.ERROR:
+                self._errores += 1
+            else:
+                self._canceladas += 1
+        elif estado in _OCUPADO:
+            self._iniciadas += 1
+            unidad.inicio_ocupado = self._reloj.ahora()
+
+    def _acumular_derivas(self, derivas: List[float]) -> None:
+        for deriva in derivas:
+            self._pasos_medidos += 1
+            self._deriva_total += deriva
+            self._deriva_max = max(self._deriva_max, deriva)
+
+    def snapshot(self, robot_id: str) -> RobotSnapshot:
+        """Foto del estado de un robot."""
+        return self._snapshot(self._unidad(robot_id), self._reloj.ahora())
+
+    def snapshots(self) -> Dict[str, RobotSnapshot]:
+        """Fotos de todos los robots en el mismo instante, en orden de alta."""
+        ahora = self._reloj.ahora()
+        return {rid: self._snapshot(u, ahora) for rid, u in self._unidades.items()}
+
+    @staticmethod
+    def _snapshot(unidad: _UnidadFlota, instante: float) -> RobotSnapshot:
+        robot = unidad.robot
+        estado = robot.get_estado_completo()
+        tiempos = robot.get_tiempos_restantes()
+        return RobotSnapshot(
+            robot_id=unidad.robot_id,
+            estado=estado["estado"],
+            receta=estado["receta_actual"],
+            tarea=estado["tarea_actual"],
+            paso_actual=estado["paso_actual"],
+            total_pasos=estado["total_pasos"],
+            progreso_paso=estado["progreso_paso"],
+            progreso_receta=estado["progreso_receta"],
+            temperatura=estado["temperatura"],
+            velocidad=estado["velocidad"],
+            restante_paso=tiempos["paso"],
+            restante_receta=tiempos["receta"],
+            instante=instante,
+        )
+
+    def get_metricas(self) -> Dict[str, Any]:
+        """
+        Métricas agregadas de la flota.
+
+        - utilizacion: fracción del tiempo (reloj de la flota) que los
+          robots registrados han pasado cocinando o en pausa
+        - deriva_media / deriva_max: segundos de retraso por paso en las
+          recetas completadas; crecen cuando el proceso se satura
+        """
+        ahora = self._reloj.ahora()
+        por_estado = {e.value: 0 for e in EstadoRobot}
+        ocupado = self._tiempo_ocupado
+        capacidad = self._capacidad_retirada
+        cocinando = 0
+
+        for unidad in self._unidades.values():
+            estado = unidad.robot.estado
+            por_estado[estado.value] += 1
+            capacidad += ahora - unidad.alta
+            if estado in _OCUPADO:
+                cocinando += 1
+            if unidad.inicio_ocupado is not None:
+                ocupado += ahora - unidad.inicio_ocupado
+
+        return {
+            "robots": len(self._unidades),
+            "por_estado": por_estado,
+            "cocinando": cocinando,
+            "recetas_iniciadas": self._iniciadas,
+            "recetas_completadas": self._completadas,
+            "recetas_canceladas": self._canceladas,
+            "recetas_error": self._errores,
+            "tiempo_ocupado": round(ocupado, 3),
+            "utilizacion": round(ocupado / capacidad, 4) if capacidad > 0 else 0.0,
+            "deriva_media": (self._deriva_total / self._pasos_medidos
+                             if self._pasos_medidos else 0.0),
+            "deriva_max": self._deriva_max,
+        }
+
+    def __repr__(self) -> str:
+        return f"RobotFleet(robots={len(self._unidades)}, reloj={type(self._reloj).__name__})"
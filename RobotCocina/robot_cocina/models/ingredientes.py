@@ -0,0 +1,193 @@
+"""
+=================================================================
+RESOLUCIÓN DE NOMBRES DE INGREDIENTES
+=================================================================
+Convierte el nombre libre de un ingrediente ("Champiñones frescos")
+en una forma canónica ("champinon fresco") y, a partir de ella, en
+el id de su alimento y su máscara de alérgenos.
+
+NORMALIZACIÓN:
+- Minúsculas y sin tildes (plegar), sin signos de puntuación
+- Plurales: cada palabra se pasa a singular; si alguna de las formas
+  posibles ("limones" → "limone" / "limon") es una palabra conocida
+  (alimentos, alérgenos, sinónimos) gana esa, si no se aplica la
+  regla general del español
+- Sinónimos: SINONIMOS sustituye palabras o expresiones completas
+  ("papa" → "patata", "crema de leche" → "nata")
+
+Así "Champiñones frescos", "champiñon" y "champinon" acaban en el
+mismo alimento, y "nueces" encuentra el alérgeno de "nuez".
+
+CACHÉ:
+- resolver() guarda nombre → IngredienteResuelto en una LRU acotada;
+  nutrición, alérgenos y búsqueda comparten el mismo resolutor
+  (RESOLUTOR_INGREDIENTES en models.nutricion) y sus aciertos
+- get_stats() da el hit rate y cuántos nombres no tienen alimento
+=================================================================
+"""
+
+from __future__ import annotations
+import re
+from dataclasses import dataclass
+from typing import Dict, Iterable, Optional, Tuple
+
+from models.alergenos import DetectorAlergenos, mascara_alergenos, plegar
+from utils.cache import LRUCache
+
+
+SIN_ALIMENTO = -1  # id de los ingredientes sin entrada en la tabla
+
+# Sube este número si cambian las reglas de normalización: los perfiles
+# guardados dependen de ellas (ver VERSION_PERFIL)
+VERSION_NORMALIZACION = 1
+
+# Forma alternativa → forma de las tablas (alimentos o alérgenos).
+# Ojo: un sinónimo no debe hacer desaparecer una palabra de alérgeno
+SINONIMOS: Dict[str, str] = {
+    'papa': 'patata',
+    'jitomate': 'tomate',
+    'zucchini': 'calabacín',
+    'brécol': 'brocoli',
+    'champignon': 'champiñon',
+    'seta': 'champiñon',
+    'cebolleta': 'cebolla',
+    'chalota': 'cebolla',
+    'alubia': 'judias',
+    'habichuela': 'judias',
+    'vacuno': 'ternera',
+    'buey': 'ternera',
+    'bacon': 'cerdo',
+    'beicon': 'cerdo',
+    'panceta': 'cerdo',
+    'crema de leche': 'nata',
+    'parmesano': 'queso',
+    'mozzarella': 'queso',
+    'emmental': 'queso',
+    'requesón': 'queso',
+    'fideo': 'pasta',
+    'espagueti': 'pasta',
+    'macarrón': 'pasta',
+    'tallarín': 'pasta',
+    'aove': 'aceite de oliva',
+}
+
+_PALABRA = re.compile(r'[^\W_]+')
+
+
+def _singular_regla(palabra: str) -> str:
+    """Singular por la regla general: -es tras l, n, r, j; -s tras a, e, o."""
+    if len(palabra) <= 3 or palabra[-1] != 's':
+        return palabra
+    if palabra[-2] == 'e' and palabra[-3] in 'lnrj':
+        return palabra[:-2]
+    if palabra[-2] in 'aeo':
+        return palabra[:-1]
+    return palabra
+
+
+@dataclass(frozen=True, slots=True)
+class IngredienteResuelto:
+    """Resultado de resolver un nombre de ingrediente."""
+    canonico: str
+    alimento: int    # índice en la tabla de alimentos o SIN_ALIMENTO
+    alergenos: int   # máscara de bits (ver BITS_ALERGENOS)
+
+
+class ResolutorIngredientes:
+    """
+    Resuelve nombres de ingredientes contra una lista de alimentos (en
+    orden de prioridad: gana el primero contenido en el nombre) y un
+    DetectorAlergenos. Las tablas no cambian tras construirlo y la
+    caché es segura entre hilos: puede compartirse.
+    """
+
+    __slots__ = ('_alimentos', '_detector', '_vocabulario', '_sinonimos',
+                 '_patron_sinonimos', '_resueltos', '_sin_alimento')
+
+    def __init__(self, alimentos: Iterable[str], sinonimos: Dict[str, str] = SINONIMOS,
+                 detector: Optional[DetectorAlergenos] = None, cache_size: int = 4096):
+        alimentos = tuple(alimentos)
+        self._detector = detector or DetectorAlergenos()
+        conocidas = (*alimentos, *self._detector.palabras, *sinonimos, *sinonimos.values())
+        self._vocabulario = frozenset(_singular_regla(p)
+                                      for texto in conocidas for p in _PALABRA.findall(plegar(texto)))
+        self._sinonimos = {self._normalizar(k): self._normalizar(v) for k, v in sinonimos.items()}
+        # Las expresiones más largas primero: "crema de leche" antes que "crema"
+        alternativas = sorted(self._sinonimos, key=len, reverse=True)
+        self._patron_sinonimos = (re.compile(r'\b(?:' + '|'.join(map(re.escape, alternativas)) + r')\b')
+                                  if alternativas else None)
+        self._alimentos = tuple(self.canonizar(a) for a in alimentos)
+        self._resueltos = LRUCache(max_size=cache_size)
+        self._sin_alimento = 0
+
+    @property
+    def alimentos(self) -> Tuple[str, ...]:
+        """Forma canónica de cada alimento, en el orden de la tabla."""
+        return self._alimentos
+
+    # ==================== NORMALIZACIÓN ====================
+
+    def singular(self, palabra: str) -> str:
+        """Singular de una palabra ya plegada, preferiendo las palabras conocidas."""
+        if len(palabra) <= 3 or palabra[-1] != 's' or palabra in self._vocabulario:
+            return palabra
+        candidatos = [palabra[:-1]]
+        if palabra.endswith('es'):
+            candidatos.insert(0, palabra[:-2])
+            if palabra.endswith('ces'):
+                candidatos.insert(0, palabra[:-3] + 'z')
+        for candidato in candidatos:
+            if candidato in self._vocabulario:
+                return candidato
+        return _singular_regla(palabra)
+
+    def _normalizar(self, texto: str) -> str:
+        return ' '.join(self.singular(p) for p in _PALABRA.findall(plegar(texto)))
+
+    def canonizar(self, nombre: str) -> str:
+        """Forma canónica de un nombre: plegado, en singular y con sinónimos sustituidos."""
+        canonico = self._normalizar(nombre)
+        if self._patron_sinonimos is None:
+            return canonico
+        return self._patron_sinonimos.sub(lambda m: self._sinonimos[m.group()], canonico)
+
+    def variantes(self, palabra: str) -> Tuple[str, ...]:
+        """
+        Formas de una palabra suelta para buscarla: plegada, en singular
+        y su sinónimo (si es de una sola palabra), sin repetidas.
+        """
+        plegada = plegar(palabra)
+        singular = self.singular(plegada)
+        sinonimo = self._sinonimos.get(singular, singular)
+        formas = [plegada, singular] + ([sinonimo] if ' ' not in sinonimo else [])
+        return tuple(dict.fromkeys(formas))
+
+    # ==================== RESOLUCIÓN ====================
+
+    def resolver(self, nombre: str) -> IngredienteResuelto:
+        """Forma canónica, alimento y alérgenos de un ingrediente (con caché)."""
+        resuelto = self._resueltos.get(nombre)
+        if resuelto is None:
+            canonico = self.canonizar(nombre)
+            alimento = next((i for i, clave in enumerate(self._alimentos) if clave in canonico),
+                            SIN_ALIMENTO)
+            if alimento == SIN_ALIMENTO:
+                self._sin_alimento += 1
+            alergenos = mascara_alergenos(c.alergeno for c in self._detector.escanear((canonico,)))
+            resuelto = IngredienteResuelto(canonico, alimento, alergenos)
+            self._resueltos.put(nombre, resuelto)
+        return resuelto
+
+    def alimento(self, nombre: str) -> int:
+        """Id del alimento de un ingrediente o SIN_ALIMENTO."""
+        return self.resolver(nombre).alimento
+
+    def alergenos(self, nombre: str) -> int:
+        """Máscara de alérgenos de un ingrediente."""
+        return self.resolver(nombre).alergenos
+
+    def get_stats(self) -> dict:
+        """Contadores de la caché y nombres resueltos sin alimento."""
+        stats = self._resueltos.get_stats()
+        stats['sin_alimento'] = self._sin_alimento
+        return stats
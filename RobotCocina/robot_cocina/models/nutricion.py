@@ -0,0 +1,226 @@
+"""
+=================================================================
+MOTOR NUTRICIONAL
+=================================================================
+Calorías y macronutrientes por porción de una receta o de un lote.
+
+TABLAS:
+- INFO_NUTRICIONAL: valores por 100 g de cada alimento
+- Los valores viven en una matriz NumPy (alimentos × nutrientes)
+  con una fila extra de ceros al final: los ingredientes que no
+  se resuelven usan el id -1 y no suman nada
+- Las unidades se convierten a gramos con una tabla
+  (multiplicador, gramos fijos) en vez de una cadena de if/elif
+
+RESOLUCIÓN:
+- Los nombres de ingrediente se resuelven con un
+  ResolutorIngredientes (tildes, plurales, sinónimos y caché LRU);
+  RESOLUTOR_INGREDIENTES, sobre esta tabla, es el que comparten
+  nutrición, alérgenos y búsqueda
+
+UNA RECETA:
+- calcular() hace las mismas operaciones sobre las filas de la
+  matriz como tuplas (para 5-10 ingredientes NumPy no compensa)
+
+LOTES:
+- calcular_lote() reúne los gramos de N recetas en una matriz
+  (recetas × ingredientes) y obtiene los nutrientes de todas a la
+  vez; las sumas se acumulan por columnas en el orden de los
+  ingredientes, así el resultado es idéntico al de la suma
+  ingrediente a ingrediente
+=================================================================
+"""
+
+from __future__ import annotations
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, TYPE_CHECKING
+
+import numpy as np
+
+from models.ingredientes import SIN_ALIMENTO, ResolutorIngredientes
+
+if TYPE_CHECKING:
+    from models.receta import Ingrediente, Receta
+
+
+NUTRIENTES: Tuple[str, ...] = ('calorias', 'proteinas', 'carbohidratos', 'grasas')
+
+INFO_NUTRICIONAL: Dict[str, Dict[str, float]] = {
+    'tomate': {'calorias': 18, 'proteinas': 0.9, 'carbohidratos': 3.9, 'grasas': 0.2},
+    'cebolla': {'calorias': 40, 'proteinas': 1.1, 'carbohidratos': 9, 'grasas': 0.1},
+    'ajo': {'calorias': 149, 'proteinas': 6.4, 'carbohidratos': 33, 'grasas': 0.5},
+    'zanahoria': {'calorias': 41, 'proteinas': 0.9, 'carbohidratos': 10, 'grasas': 0.2},
+    'patata': {'calorias': 77, 'proteinas': 2, 'carbohidratos': 17, 'grasas': 0.1},
+    'calabacín': {'calorias': 17, 'proteinas': 1.2, 'carbohidratos': 3.1, 'grasas': 0.3},
+    'calabaza': {'calorias': 26, 'proteinas': 1, 'carbohidratos': 6.5, 'grasas': 0.1},
+    'pimiento': {'calorias': 20, 'proteinas': 0.9, 'carbohidratos': 4.6, 'grasas': 0.2},
+    'pepino': {'calorias': 16, 'proteinas': 0.7, 'carbohidratos': 3.6, 'grasas': 0.1},
+    'berenjena': {'calorias': 25, 'proteinas': 1, 'carbohidratos': 6, 'grasas': 0.2},
+    'puerro': {'calorias': 61, 'proteinas': 1.5, 'carbohidratos': 14, 'grasas': 0.3},
+    'champiñon': {'calorias': 22, 'proteinas': 3.1, 'carbohidratos': 3.3, 'grasas': 0.3},
+    'espinaca': {'calorias': 23, 'proteinas': 2.9, 'carbohidratos': 3.6, 'grasas': 0.4},
+    'brocoli': {'calorias': 34, 'proteinas': 2.8, 'carbohidratos': 7, 'grasas': 0.4},
+    'coliflor': {'calorias': 25, 'proteinas': 1.9, 'carbohidratos': 5, 'grasas': 0.3},
+    'judias': {'calorias': 31, 'proteinas': 1.8, 'carbohidratos': 7, 'grasas': 0.1},
+    'manzana': {'calorias': 52, 'proteinas': 0.3, 'carbohidratos': 14, 'grasas': 0.2},
+    'limon': {'calorias': 29, 'proteinas': 1.1, 'carbohidratos': 9, 'grasas': 0.3},
+    'pollo': {'calorias': 239, 'proteinas': 27, 'carbohidratos': 0, 'grasas': 14},
+    'ternera': {'calorias': 250, 'proteinas': 26, 'carbohidratos': 0, 'grasas': 15},
+    'cerdo': {'calorias': 242, 'proteinas': 27, 'carbohidratos': 0, 'grasas': 14},
+    'carne': {'calorias': 250, 'proteinas': 26, 'carbohidratos': 0, 'grasas': 15},
+    'merluza': {'calorias': 89, 'proteinas': 17, 'carbohidratos': 0, 'grasas': 2},
+    'salmon': {'calorias': 208, 'proteinas': 20, 'carbohidratos': 0, 'grasas': 13},
+    'pescado': {'calorias': 100, 'proteinas': 18, 'carbohidratos': 0, 'grasas': 3},
+    'leche': {'calorias': 42, 'proteinas': 3.4, 'carbohidratos': 5, 'grasas': 1},
+    'nata': {'calorias': 340, 'proteinas': 2, 'carbohidratos': 3, 'grasas': 35},
+    'mantequilla': {'calorias': 717, 'proteinas': 0.9, 'carbohidratos': 0.1, 'grasas': 81},
+    'queso': {'calorias': 402, 'proteinas': 25, 'carbohidratos': 1.3, 'grasas': 33},
+    'huevo': {'calorias': 155, 'proteinas': 13, 'carbohidratos': 1.1, 'grasas': 11},
+    'arroz': {'calorias': 130, 'proteinas': 2.7, 'carbohidratos': 28, 'grasas': 0.3},
+    'pasta': {'calorias': 131, 'proteinas': 5, 'carbohidratos': 25, 'grasas': 1.1},
+    'pan': {'calorias': 265, 'proteinas': 9, 'carbohidratos': 49, 'grasas': 3.2},
+    'harina': {'calorias': 364, 'proteinas': 10, 'carbohidratos': 76, 'grasas': 1},
+    'aceite': {'calorias': 884, 'proteinas': 0, 'carbohidratos': 0, 'grasas': 100},
+    'azucar': {'calorias': 387, 'proteinas': 0, 'carbohidratos': 100, 'grasas': 0},
+    'caldo': {'calorias': 10, 'proteinas': 1, 'carbohidratos': 1, 'grasas': 0.2},
+    'vino': {'calorias': 85, 'proteinas': 0.1, 'carbohidratos': 2.6, 'grasas': 0},
+    'agua': {'calorias': 0, 'proteinas': 0, 'carbohidratos': 0, 'grasas': 0},
+}
+
+# Gramos = cantidad * multiplicador + fijos (las demás unidades cuentan como gramos)
+CONVERSION_UNIDADES: Dict[str, Tuple[float, float]] = {
+    'kg': (1000, 0),
+    'ml': (1, 0),
+    'l': (1000, 0),
+    'unidad': (0, 100),
+    'cucharada': (0, 15),
+    'cda': (0, 15),
+    'pizca': (0, 1),
+}
+_GRAMOS = (1, 0)
+
+RESOLUTOR_INGREDIENTES = ResolutorIngredientes(INFO_NUTRICIONAL)
+
+
+class MotorNutricional:
+    """
+    Calcula nutrientes por porción sobre una tabla con el formato de
+    INFO_NUTRICIONAL. La matriz es de solo lectura: un motor puede
+    compartirse entre todas las interfaces.
+    """
+
+    __slots__ = ('_nombres', '_por_gramo', '_filas', '_resolutor')
+
+    def __init__(self, info: Dict[str, Dict[str, float]] = INFO_NUTRICIONAL,
+                 resolutor: Optional[ResolutorIngredientes] = None):
+        """
+        Args:
+            info: Tabla de alimentos (valores por 100 g)
+            resolutor: Resolutor sobre los mismos alimentos y en el mismo
+                orden (por defecto, el compartido si `info` es la tabla
+                de fábrica)
+        """
+        if resolutor is None:
+            resolutor = (RESOLUTOR_INGREDIENTES if info is INFO_NUTRICIONAL
+                         else ResolutorIngredientes(info))
+        if len(resolutor.alimentos) != len(info):
+            raise ValueError("El resolutor no corresponde a la tabla de alimentos")
+        self._resolutor = resolutor
+        self._nombres: Tuple[str, ...] = tuple(info)
+        # Valores por gramo (v / 100) y una última fila de ceros para SIN_ALIMENTO
+        self._por_gramo = np.zeros((len(info) + 1, len(NUTRIENTES)))
+        self._por_gramo[:-1] = [[info[a][n] for n in NUTRIENTES] for a in self._nombres]
+        self._por_gramo /= 100
+        self._por_gramo.flags.writeable = False
+        # Las mismas filas como tuplas: para una sola receta montar arrays no compensa
+        self._filas = tuple(map(tuple, self._por_gramo.tolist()))
+
+    @property
+    def alimentos(self) -> Tuple[str, ...]:
+        return self._nombres
+
+    @property
+    def resolutor(self) -> ResolutorIngredientes:
+        return self._resolutor
+
+    # ==================== RESOLUCIÓN ====================
+
+    def resolver(self, nombre: str) -> int:
+        """Id del alimento de un ingrediente o SIN_ALIMENTO."""
+        return self._resolutor.alimento(nombre)
+
+    @staticmethod
+    def gramos(ingrediente: Ingrediente) -> float:
+        """Cantidad del ingrediente expresada en gramos."""
+        multiplicador, fijos = CONVERSION_UNIDADES.get(ingrediente.unidad, _GRAMOS)
+        return ingrediente.cantidad * multiplicador + fijos
+
+    def get_stats(self) -> dict:
+        """Contadores de la caché de resolución (la del resolutor)."""
+        return self._resolutor.get_stats()
+
+    # ==================== CÁLCULO ====================
+
+    def _totales(self, listas: Sequence[Sequence[Ingrediente]], factores: np.ndarray) -> np.ndarray:
+        """
+        Nutrientes totales (recetas × nutrientes) ya escalados por `factores`.
+
+        Equivale a gramos @ por_gramo[alimentos] receta a receta; las
+        columnas de ingredientes se acumulan en orden para que las
+        sumas coincidan exactamente con el cálculo ingrediente a ingrediente.
+        """
+        ancho = max((len(ings) for ings in listas), default=0)
+        # Una sola pasada en Python (resolver y convertir); el resto es NumPy.
+        # En el lote cada nombre distinto consulta la caché compartida una vez
+        vistos: Dict[str, int] = {}
+        gramos = self.gramos
+        ids: List[int] = []
+        cantidades: List[float] = []
+        for ings in listas:
+            faltan = ancho - len(ings)
+            ids.extend([vistos[ing.nombre] if ing.nombre in vistos
+                        else vistos.setdefault(ing.nombre, self.resolver(ing.nombre))
+                        for ing in ings] + [SIN_ALIMENTO] * faltan)
+            cantidades.extend([gramos(ing) for ing in ings] + [0.0] * faltan)
+        forma = (len(listas), ancho)
+        alimentos = np.array(ids, dtype=np.intp).reshape(forma)
+        aportes = (self._por_gramo[alimentos]
+                   * np.array(cantidades, dtype=float).reshape(forma)[:, :, None]
+                   * factores[:, None, None])
+        totales = np.zeros((len(listas), len(NUTRIENTES)))
+        for c in range(ancho):
+            totales += aportes[:, c]
+        return totales
+
+    @staticmethod
+    def _redondear(fila: Iterable[float]) -> Dict[str, float]:
+        return {n: round(v, 1) for n, v in zip(NUTRIENTES, fila)}
+
+    def calcular(self, ingredientes: Sequence[Ingrediente], porciones_base: int,
+                 porciones_calc: int) -> Dict[str, float]:
+        """
+        Nutrientes por porción de una receta escalada a `porciones_calc`.
+
+        Returns:
+            {'calorias', 'proteinas', 'carbohidratos', 'grasas'} redondeados a 1 decimal
+        """
+        factor = porciones_calc / porciones_base
+        totales = [0.0] * len(NUTRIENTES)
+        for ing in ingredientes:
+            fila, gramos = self._filas[self.resolver(ing.nombre)], self.gramos(ing)
+            for k, valor in enumerate(fila):
+                totales[k] += valor * gramos * factor
+        return self._redondear(t / porciones_calc for t in totales)
+
+    def calcular_lote(self, recetas: Sequence[Receta],
+                      porciones: Optional[Sequence[int]] = None) -> List[Dict[str, float]]:
+        """
+        Nutrientes por porción de muchas recetas a la vez.
+
+        Args:
+            recetas: Recetas a calcular
+            porciones: Porciones de cada receta (por defecto, las suyas)
+        """
+        base = np.array([r.porciones for r in recetas], dtype=float)
+        calc = base if porciones is None else np.array(porciones, dtype=float)
+        totales = self._totales([r.ingredientes for r in recetas], calc / base)
+        return [self._redondear(fila) for fila in (totales / calc[:, None]).tolist()]
@@ -0,0 +1,126 @@
+"""
+=================================================================
+PERFIL NUTRICIONAL Y DE ALÉRGENOS DE UNA RECETA
+=================================================================
+Datos derivados de los ingredientes que se guardan junto a la receta
+(tabla receta_perfil) para que la interfaz solo tenga que leerlos.
+
+Los tres salen de resolver cada ingrediente con el mismo
+ResolutorIngredientes (una consulta a su caché por nombre).
+
+CONTENIDO:
+- Calorías y macronutrientes por porción (MotorNutricional)
+- Máscara de alérgenos (un bit por alérgeno)
+- Cobertura: fracción de ingredientes con alimento en la tabla
+  nutricional (cuánto hay que fiarse de las calorías)
+
+VERSIÓN:
+- VERSION_PERFIL es una huella de las tablas de las que sale el
+  perfil (INFO_NUTRICIONAL, CONVERSION_UNIDADES, ALERGENOS,
+  SINONIMOS y las reglas de normalización). Si
+  cambian, los perfiles guardados con otra versión quedan
+  desactualizados y se recalculan en segundo plano
+=================================================================
+"""
+
+from __future__ import annotations
+import hashlib
+import json
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple, TYPE_CHECKING
+
+from models.alergenos import ALERGENOS, alergenos_de_mascara
+from models.ingredientes import SIN_ALIMENTO, SINONIMOS, VERSION_NORMALIZACION, ResolutorIngredientes
+from models.nutricion import CONVERSION_UNIDADES, INFO_NUTRICIONAL, MotorNutricional
+
+if TYPE_CHECKING:
+    from models.receta import Receta
+
+
+def _huella_tablas() -> str:
+    tablas = {
+        'nutricion': INFO_NUTRICIONAL,
+        'unidades': CONVERSION_UNIDADES,
+        'alergenos': [(clave, info['ingredientes']) for clave, info in ALERGENOS.items()],
+        'sinonimos': SINONIMOS,
+        'normalizacion': VERSION_NORMALIZACION,
+    }
+    return hashlib.sha1(json.dumps(tablas, sort_keys=True).encode()).hexdigest()[:12]
+
+
+VERSION_PERFIL = _huella_tablas()
+
+
+@dataclass(frozen=True, slots=True)
+class PerfilReceta:
+    """Perfil de una receta tal como se guarda en receta_perfil."""
+    calorias: float
+    proteinas: float
+    carbohidratos: float
+    grasas: float
+    alergenos: int  # máscara de bits (ver BITS_ALERGENOS)
+    cobertura: float
+    version: str = VERSION_PERFIL
+
+    @property
+    def actualizado(self) -> bool:
+        """False si se calculó con otras tablas (pendiente de recalcular)."""
+        return self.version == VERSION_PERFIL
+
+    @property
+    def claves_alergenos(self) -> Tuple[str, ...]:
+        return alergenos_de_mascara(self.alergenos)
+
+    @property
+    def nutricion(self) -> Dict[str, float]:
+        """Nutrientes por porción con las claves de MotorNutricional."""
+        return {
+            'calorias': self.calorias,
+            'proteinas': self.proteinas,
+            'carbohidratos': self.carbohidratos,
+            'grasas': self.grasas,
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        datos = self.nutricion
+        datos.update(alergenos=list(self.claves_alergenos), cobertura=self.cobertura,
+                     version=self.version)
+        return datos
+
+    @classmethod
+    def from_row(cls, row) -> 'PerfilReceta':
+        return cls(row['calorias'], row['proteinas'], row['carbohidratos'], row['grasas'],
+                   row['alergenos'], row['cobertura'], row['version'])
+
+
+class CalculadorPerfiles:
+    """Calcula perfiles de una receta o de un lote con un motor y un resolutor compartidos."""
+
+    __slots__ = ('motor', 'resolutor')
+
+    def __init__(self, motor: Optional[MotorNutricional] = None):
+        self.motor = motor or MotorNutricional()
+        self.resolutor: ResolutorIngredientes = self.motor.resolutor
+
+    def _alergenos_y_cobertura(self, receta: Receta) -> Tuple[int, float]:
+        ingredientes = receta.ingredientes
+        if not ingredientes:
+            return 0, 0.0
+        mascara = resueltos = 0
+        for ing in ingredientes:
+            resuelto = self.resolutor.resolver(ing.nombre)
+            mascara |= resuelto.alergenos
+            resueltos += resuelto.alimento != SIN_ALIMENTO
+        return mascara, round(resueltos / len(ingredientes), 3)
+
+    def calcular(self, receta: Receta) -> PerfilReceta:
+        return self.calcular_lote([receta])[0]
+
+    def calcular_lote(self, recetas: Sequence[Receta]) -> List[PerfilReceta]:
+        """Perfiles de muchas recetas (nutrición por lotes, alérgenos por ingrediente resuelto)."""
+        nutricion = self.motor.calcular_lote(recetas)
+        return [
+            PerfilReceta(n['calorias'], n['proteinas'], n['carbohidratos'], n['grasas'],
+                         *self._alergenos_y_cobertura(receta))
+            for receta, n in zip(recetas, nutricion)
+        ]
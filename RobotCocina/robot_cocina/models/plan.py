@@ -0,0 +1,214 @@
+"""
+=================================================================
+PLAN DE EJECUCIÓN DE RECETAS
+=================================================================
+Compila, al preparar una receta, todo lo que el robot necesita
+durante la cocción.
+
+COMPILACIÓN:
+- Cada paso (dict) se convierte en su Tarea y se valida una vez
+- Un paso inválido rechaza la receta ANTES de empezar a cocinar
+- Los planes se cachean por (id de receta, huella de los pasos):
+  si la receta se edita, su huella cambia y se recompila
+
+SUMAS PREFIJAS:
+- _inicio[i] = segundos acumulados antes del paso i
+- _inicio[n] = duración total de la receta
+- Tiempo restante desde el paso i = total - _inicio[i] → O(1)
+
+Así el progreso y el tiempo restante no recorren los pasos en
+cada actualización (antes era O(pasos) por tick).
+=================================================================
+"""
+
+from __future__ import annotations
+import hashlib
+import json
+from array import array
+from itertools import accumulate
+from typing import Any, Dict, Iterable, Tuple, TYPE_CHECKING
+
+from models.tarea import Tarea, TareaCorte, TareaTemperatura, TareaMecanica, TipoOperacion
+from utils.cache import LRUCache
+from utils.exceptions import RecetaError, TareaInvalidaError
+
+if TYPE_CHECKING:
+    from models.receta import Receta
+
+
+def crear_tarea(paso: Dict[str, Any]) -> Tarea:
+    """
+    Factory Method para crear tareas desde definición de paso.
+    POLIMORFISMO: Retorna diferentes tipos de Tarea.
+
+    Raises:
+        TareaInvalidaError: Tipo de tarea desconocido
+        ValueError: Operación o parámetros no válidos
+    """
+    tipo = paso.get("tipo", "").lower()
+
+    if tipo == "corte":
+        return TareaCorte(
+            operacion=TipoOperacion(paso.get("operacion", "picar")),
+            duracion=int(paso.get("duracion", 30)),
+            velocidad=int(paso.get("velocidad", 5)),
+            descripcion=paso.get("descripcion", "")
+        )
+
+    elif tipo == "temperatura":
+        return TareaTemperatura(
+            operacion=TipoOperacion(paso.get("operacion", "hervir")),
+            duracion=int(paso.get("duracion", 60)),
+            temperatura=int(paso.get("temperatura", 100)),
+            velocidad=int(paso.get("velocidad", 1)),
+            descripcion=paso.get("descripcion", "")
+        )
+
+    elif tipo == "mecanica":
+        return TareaMecanica(
+            nombre=paso.get("nombre", paso.get("operacion", "Mezclar")),
+            duracion=int(paso.get("duracion", 30)),
+            velocidad=int(paso.get("velocidad", 5)),
+            descripcion=paso.get("descripcion", "")
+        )
+
+    else:
+        raise TareaInvalidaError(f"Tipo de tarea desconocido: {tipo}")
+
+
+class RecipePlan:
+    """
+    Plan inmutable: tareas validadas de una receta y sus sumas prefijas.
+
+        plan = RecipePlan.compilar(receta)
+        plan.tarea(3)                     # Tarea lista para ejecutar
+        plan.restante_desde(3)            # segundos desde el inicio del paso 3
+        plan.tiempo_restante(3, 40)       # ... con 40 s ya hechos del paso 3
+        plan.progreso(3, 0.5)             # % de la receta a mitad del paso 3
+    """
+
+    __slots__ = ('_tareas', '_duraciones', '_inicio')
+
+    # Planes compilados por (id de receta, huella de los pasos)
+    _cache = LRUCache(max_size=256)
+
+    def __init__(self, tareas: Iterable[Tarea]):
+        """
+        Args:
+            tareas: Tareas ya validadas, en orden de ejecución
+        """
+        self._tareas: Tuple[Tarea, ...] = tuple(tareas)
+        self._duraciones = array('q', (t.duracion for t in self._tareas))
+        self._inicio = array('q', accumulate(self._duraciones, initial=0))
+
+    # ==================== COMPILACIÓN ====================
+
+    @classmethod
+    def compilar(cls, receta: Receta) -> RecipePlan:
+        """
+        Devuelve el plan de la receta, compilándolo si no está en caché.
+
+        Raises:
+            RecetaError: Si la receta no tiene pasos o alguno no es válido
+        """
+        if receta.id is None:
+            # Receta sin guardar: no hay identidad estable para cachear
+            return cls.from_pasos(receta.pasos)
+
+        clave = (receta.id, cls.huella(receta.pasos))
+        plan = cls._cache.get(clave)
+        if plan is None:
+            plan = cls.from_pasos(receta.pasos)
+            cls._cache.put(clave, plan)
+        return plan
+
+    @classmethod
+    def from_pasos(cls, pasos: Iterable[Dict[str, Any]]) -> RecipePlan:
+        """
+        Convierte y valida todos los pasos.
+
+        Raises:
+            RecetaError: Indicando el primer paso inválido
+        """
+        tareas = []
+        for i, paso in enumerate(pasos, 1):
+            try:
+                tarea = crear_tarea(paso)
+            except (TareaInvalidaError, ValueError, TypeError) as e:
+                mensaje = e.mensaje if isinstance(e, TareaInvalidaError) else str(e)
+                raise RecetaError(f"Paso {i} inválido: {mensaje}")
+            valido, mensaje = tarea.validar()
+            if not valido:
+                raise RecetaError(f"Paso {i} inválido: {mensaje}")
+            tareas.append(tarea)
+
+        if not tareas:
+            raise RecetaError("La receta no tiene pasos definidos")
+        return cls(tareas)
+
+    @staticmethod
+    def huella(pasos: Iterable[Dict[str, Any]]) -> str:
+        """Huella de los pasos: cambia en cuanto se edita cualquier parámetro."""
+        datos = json.dumps(list(pasos), sort_keys=True, ensure_ascii=False)
+        return hashlib.blake2b(datos.encode(), digest_size=16).hexdigest()
+
+    @classmethod
+    def get_cache_stats(cls) -> dict:
+        """Estadísticas de la caché de planes."""
+        return cls._cache.get_stats()
+
+    @classmethod
+    def clear_cache(cls) -> None:
+        """Descarta todos los planes compilados."""
+        cls._cache.clear()
+
+    # ==================== CONSULTAS O(1) ====================
+
+    def __len__(self) -> int:
+        return len(self._tareas)
+
+    @property
+    def tareas(self) -> Tuple[Tarea, ...]:
+        return self._tareas
+
+    @property
+    def total_pasos(self) -> int:
+        return len(self._tareas)
+
+    @property
+    def duracion_total(self) -> int:
+        """Duración total de la receta en segundos."""
+        return self._inicio[-1]
+
+    def tarea(self, paso: int) -> Tarea:
+        """Tarea compilada del paso indicado."""
+        return self._tareas[paso]
+
+    def duracion(self, paso: int) -> int:
+        """Duración del paso indicado."""
+        return self._duraciones[paso]
+
+    def inicio(self, paso: int) -> int:
+        """Segundo de la receta en el que empieza el paso (0 para el primero)."""
+        return self._inicio[paso]
+
+    def restante_desde(self, paso: int) -> int:
+        """
+        Segundos que quedan desde el inicio del paso indicado.
+        Admite paso == total_pasos (devuelve 0).
+        """
+        return self._inicio[-1] - self._inicio[paso]
+
+    def tiempo_restante(self, paso: int, transcurrido_paso: int = 0) -> int:
+        """Segundos que quedan de receta con `transcurrido_paso` hechos del paso actual."""
+        return max(0, self.restante_desde(paso) - transcurrido_paso)
+
+    def progreso(self, paso: int, fraccion_paso: float = 0.0) -> int:
+        """
+        Progreso global (0-100) contando pasos completados, igual
+        que el indicador de la interfaz.
+        """
+        return int(((paso + fraccion_paso) / len(self._tareas)) * 100)
+
+    def __repr__(self) -> str:
+        return f"RecipePlan(pasos={self.total_pasos}, duracion_total={self.duracion_total}s)"
@@ -4,6 +4,9 @@ MODELOS DE RECETA E INGREDIENTE
 =================================================================
 Usa dataclasses para representación limpia de datos.
 Demuestra encapsulamiento y serialización.
+
+Las dataclasses usan slots=True: sin __dict__ por instancia, lo que
+reduce memoria y acelera el acceso a atributos en cargas masivas.
 =================================================================
 """
 
@@ -12,7 +15,27 @@ from typing import List, Dict, Any, Optional
 import json
 
 
-@dataclass
+def _formatear_tiempo(tiempo_total: int) -> str:
+    """Formatea una duración en segundos (compartido por Receta y RecetaResumen)."""
+    minutos = tiempo_total // 60
+    segundos = tiempo_total % 60
+    
+    if minutos >= 60:
+        horas = minutos // 60
+        minutos = minutos % 60
+        return f"{horas}h {minutos}min"
+    elif minutos > 0:
+        return f"{minutos} min" if segundos == 0 else f"{minutos}m {segundos}s"
+    else:
+        return f"{segundos}s"
+
+
+def _cargar_json(raw: Any) -> Any:
+    """Decodifica un campo JSON de la BD (o lo devuelve tal cual si ya es lista)."""
+    return json.loads(raw) if isinstance(raw, str) else raw
+
+
+@dataclass(slots=True)
 class Ingrediente:
     """
     Representa un ingrediente de una receta.
@@ -20,6 +43,7 @@ class Ingrediente:
     Usa @dataclass para:
     - Generación automática de __init__, __repr__, __eq__
     - Código más limpio y mantenible
+    - __slots__ (slots=True): menos memoria por instancia
     """
     nombre: str
     cantidad: float
@@ -56,7 +80,7 @@ class Ingrediente:
         )
 
 
-@dataclass
+@dataclass(slots=True)
 class Receta:
     """
     Representa una receta completa.
@@ -78,17 +102,7 @@ class Receta:
     @property
     def tiempo_str(self) -> str:
         """Tiempo formateado como string."""
-        minutos = self.tiempo_total // 60
-        segundos = self.tiempo_total % 60
-        
-        if minutos >= 60:
-            horas = minutos // 60
-            minutos = minutos % 60
-            return f"{horas}h {minutos}min"
-        elif minutos > 0:
-            return f"{minutos} min" if segundos == 0 else f"{minutos}m {segundos}s"
-        else:
-            return f"{segundos}s"
+        return _formatear_tiempo(self.tiempo_total)
     
     @property
     def num_pasos(self) -> int:
@@ -113,35 +127,134 @@ class Receta:
             "es_fabrica": 1 if self.es_fabrica else 0,
         }
     
+    @staticmethod
+    def _campos_basicos(data: Dict[str, Any]) -> Dict[str, Any]:
+        """Campos escalares comunes a la carga normal y a la diferida."""
+        return {
+            "id": data.get("id"),
+            "nombre": data.get("nombre", "Sin nombre"),
+            "descripcion": data.get("descripcion", ""),
+            "tiempo_total": int(data.get("tiempo_total", 0)),
+            "porciones": int(data.get("porciones", 4)),
+            "dificultad": data.get("dificultad", "Media"),
+            "es_fabrica": bool(data.get("es_fabrica", False)),
+        }
+    
     @classmethod
-    def from_dict(cls, data: Dict[str, Any]) -> 'Receta':
-        """Deserializa desde diccionario de BD."""
-        # Parsear ingredientes
-        ingredientes_raw = data.get("ingredientes", "[]")
-        if isinstance(ingredientes_raw, str):
-            ingredientes_data = json.loads(ingredientes_raw)
-        else:
-            ingredientes_data = ingredientes_raw
+    def from_dict(cls, data: Dict[str, Any], lazy: bool = False) -> 'Receta':
+        """
+        Deserializa desde diccionario de BD.
         
-        ingredientes = [Ingrediente.from_dict(i) for i in ingredientes_data]
+        Args:
+            data: Fila de la tabla recetas
+            lazy: Si es True devuelve una RecetaLazy que no decodifica
+                ingredientes ni pasos hasta que se accede a ellos
+        """
+        if lazy:
+            return RecetaLazy(
+                ingredientes_raw=data.get("ingredientes", "[]"),
+                pasos_raw=data.get("pasos", "[]"),
+                **cls._campos_basicos(data)
+            )
         
-        # Parsear pasos
-        pasos_raw = data.get("pasos", "[]")
-        if isinstance(pasos_raw, str):
-            pasos = json.loads(pasos_raw)
-        else:
-            pasos = pasos_raw
+        ingredientes = [Ingrediente.from_dict(i)
+                        for i in _cargar_json(data.get("ingredientes", "[]"))]
+        pasos = _cargar_json(data.get("pasos", "[]"))
         
         return cls(
-            id=data.get("id"),
-            nombre=data.get("nombre", "Sin nombre"),
-            descripcion=data.get("descripcion", ""),
             ingredientes=ingredientes,
             pasos=pasos,
+            **cls._campos_basicos(data)
+        )
+    
+    def __str__(self) -> str:
+        return f"{self.nombre} ({self.tiempo_str}, {self.num_pasos} pasos)"
+
+
+class RecetaLazy(Receta):
+    """
+    Receta con decodificación diferida.
+    
+    Guarda el JSON de ingredientes y pasos tal cual sale de la BD y solo lo
+    decodifica en el primer acceso. Listar miles de recetas para mostrar
+    nombre, tiempo o dificultad no paga el coste de json.loads ni de crear
+    los Ingrediente. Por lo demás se comporta como una Receta normal.
+    """
+    
+    __slots__ = ('_ingredientes', '_pasos', '_ingredientes_raw', '_pasos_raw')
+    
+    def __init__(self, *, ingredientes_raw: Any = "[]", pasos_raw: Any = "[]", **campos):
+        super().__init__(ingredientes=None, pasos=None, **campos)
+        self._ingredientes_raw = ingredientes_raw
+        self._pasos_raw = pasos_raw
+    
+    @property
+    def ingredientes(self) -> List[Ingrediente]:
+        if self._ingredientes_raw is not None:
+            self._ingredientes = [Ingrediente.from_dict(i)
+                                  for i in _cargar_json(self._ingredientes_raw)]
+            self._ingredientes_raw = None
+        return self._ingredientes
+    
+    @ingredientes.setter
+    def ingredientes(self, valor: List[Ingrediente]):
+        self._ingredientes = valor
+        self._ingredientes_raw = None
+    
+    @property
+    def pasos(self) -> List[Dict[str, Any]]:
+        if self._pasos_raw is not None:
+            self._pasos = _cargar_json(self._pasos_raw)
+            self._pasos_raw = None
+        return self._pasos
+    
+    @pasos.setter
+    def pasos(self, valor: List[Dict[str, Any]]):
+        self._pasos = valor
+        self._pasos_raw = None
+    
+    @property
+    def decodificada(self) -> bool:
+        """True si ingredientes y pasos ya se han decodificado."""
+        return self._ingredientes_raw is None and self._pasos_raw is None
+
+
+@dataclass(slots=True)
+class RecetaResumen:
+    """
+    Proyección ligera de una receta para listados (tarjetas del explorador).
+    
+    No contiene ingredientes ni pasos: solo sus recuentos. Para mostrar el
+    detalle hay que cargar la Receta completa por id.
+    """
+    id: int
+    nombre: str
+    descripcion: str
+    tiempo_total: int
+    porciones: int
+    dificultad: str
+    es_fabrica: bool
+    num_pasos: int
+    num_ingredientes: int
+    
+    @property
+    def tiempo_str(self) -> str:
+        """Tiempo formateado como string."""
+        return _formatear_tiempo(self.tiempo_total)
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'RecetaResumen':
+        """Deserializa desde una fila de la consulta de resumen."""
+        return cls(
+            id=data["id"],
+            nombre=data.get("nombre", "Sin nombre"),
+            descripcion=data.get("descripcion", ""),
             tiempo_total=int(data.get("tiempo_total", 0)),
             porciones=int(data.get("porciones", 4)),
             dificultad=data.get("dificultad", "Media"),
             es_fabrica=bool(data.get("es_fabrica", False)),
+            num_pasos=int(data.get("num_pasos", 0)),
+            num_ingredientes=int(data.get("num_ingredientes", 0)),
         )
     
     def __str__(self) -> str:
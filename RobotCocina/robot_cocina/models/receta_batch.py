@@ -0,0 +1,186 @@
+"""
+=================================================================
+LOTE COLUMNAR DE RECETAS
+=================================================================
+Representación compacta para cargas masivas (importación de
+catálogos, análisis nutricional por lotes, simulación de flotas).
+
+En lugar de un objeto Receta con una lista de objetos Ingrediente,
+cada campo se guarda en un array paralelo (módulo `array`). Los
+ingredientes de todas las recetas van seguidos en los mismos arrays
+y `_ing_inicio` marca dónde empiezan los de cada receta (formato CSR).
+Los nombres de ingredientes y unidades se guardan una sola vez en un
+vocabulario y los arrays solo almacenan su índice.
+=================================================================
+"""
+
+import json
+from array import array
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+from models.receta import Receta, Ingrediente
+
+
+class _Vocabulario:
+    """Cadenas internadas: cada valor distinto se guarda una vez."""
+
+    __slots__ = ('_valores', '_indices')
+
+    def __init__(self):
+        self._valores: List[str] = []
+        self._indices: Dict[str, int] = {}
+
+    def indice(self, valor: str) -> int:
+        idx = self._indices.get(valor)
+        if idx is None:
+            idx = len(self._valores)
+            self._valores.append(valor)
+            self._indices[valor] = idx
+        return idx
+
+    def __getitem__(self, idx: int) -> str:
+        return self._valores[idx]
+
+    def __len__(self) -> int:
+        return len(self._valores)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._valores)
+
+
+class RecetaBatch:
+    """
+    Colección columnar de recetas.
+
+    - append()/extend() convierten Receta al formato columnar
+    - batch[i] reconstruye la Receta i (solo cuando hace falta el objeto)
+    - iter_ingredientes() recorre todos los ingredientes sin crear objetos
+    """
+
+    __slots__ = (
+        '_ids', '_nombres', '_descripciones', '_tiempo_total', '_porciones',
+        '_dificultad', '_es_fabrica', '_pasos_json', '_num_pasos',
+        '_ing_inicio', '_ing_nombre', '_ing_cantidad', '_ing_unidad',
+        '_vocab_ingredientes', '_vocab_unidades', '_vocab_dificultad',
+    )
+
+    def __init__(self, recetas: Iterable[Receta] = ()):
+        # Una posición por receta
+        self._ids = array('q')                 # -1 = sin id
+        self._nombres: List[str] = []
+        self._descripciones: List[str] = []
+        self._tiempo_total = array('l')
+        self._porciones = array('h')
+        self._dificultad = array('B')
+        self._es_fabrica = array('b')
+        self._pasos_json: List[str] = []
+        self._num_pasos = array('H')
+        # Ingredientes de todas las recetas (CSR)
+        self._ing_inicio = array('q', [0])
+        self._ing_nombre = array('l')
+        self._ing_cantidad = array('d')
+        self._ing_unidad = array('l')
+        self._vocab_ingredientes = _Vocabulario()
+        self._vocab_unidades = _Vocabulario()
+        self._vocab_dificultad = _Vocabulario()
+        self.extend(recetas)
+
+    @classmethod
+    def from_filas(cls, filas: Iterable[dict]) -> 'RecetaBatch':
+        """Construye el lote directamente desde filas de la tabla recetas."""
+        batch = cls()
+        for fila in filas:
+            batch.append(Receta.from_dict(dict(fila), lazy=True))
+        return batch
+
+    # ==================== ESCRITURA ====================
+
+    def append(self, receta: Receta) -> int:
+        """Añade una receta y devuelve su posición en el lote."""
+        self._ids.append(-1 if receta.id is None else receta.id)
+        self._nombres.append(receta.nombre)
+        self._descripciones.append(receta.descripcion)
+        self._tiempo_total.append(receta.tiempo_total)
+        self._porciones.append(receta.porciones)
+        self._dificultad.append(self._vocab_dificultad.indice(receta.dificultad))
+        self._es_fabrica.append(1 if receta.es_fabrica else 0)
+        self._pasos_json.append(json.dumps(receta.pasos, ensure_ascii=False))
+        self._num_pasos.append(len(receta.pasos))
+
+        for ing in receta.ingredientes:
+            self._ing_nombre.append(self._vocab_ingredientes.indice(ing.nombre))
+            self._ing_cantidad.append(ing.cantidad)
+            self._ing_unidad.append(self._vocab_unidades.indice(ing.unidad))
+        self._ing_inicio.append(len(self._ing_nombre))
+        return len(self._nombres) - 1
+
+    def extend(self, recetas: Iterable[Receta]) -> None:
+        for receta in recetas:
+            self.append(receta)
+
+    # ==================== LECTURA ====================
+
+    def __len__(self) -> int:
+        return len(self._nombres)
+
+    def __getitem__(self, i: int) -> Receta:
+        """Reconstruye la Receta de la posición i."""
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("Índice de receta fuera de rango")
+        return Receta(
+            id=None if self._ids[i] == -1 else self._ids[i],
+            nombre=self._nombres[i],
+            descripcion=self._descripciones[i],
+            ingredientes=[Ingrediente(n, c, u) for n, c, u in self.ingredientes_de(i)],
+            pasos=json.loads(self._pasos_json[i]),
+            tiempo_total=self._tiempo_total[i],
+            porciones=self._porciones[i],
+            dificultad=self._vocab_dificultad[self._dificultad[i]],
+            es_fabrica=bool(self._es_fabrica[i]),
+        )
+
+    def __iter__(self) -> Iterator[Receta]:
+        for i in range(len(self)):
+            yield self[i]
+
+    def nombre(self, i: int) -> str:
+        return self._nombres[i]
+
+    def tiempo_total(self, i: int) -> int:
+        return self._tiempo_total[i]
+
+    def num_pasos(self, i: int) -> int:
+        return self._num_pasos[i]
+
+    def num_ingredientes(self, i: int) -> int:
+        return self._ing_inicio[i + 1] - self._ing_inicio[i]
+
+    def ingredientes_de(self, i: int) -> List[Tuple[str, float, str]]:
+        """Ingredientes de la receta i como tuplas (nombre, cantidad, unidad)."""
+        vocab_n, vocab_u = self._vocab_ingredientes, self._vocab_unidades
+        return [
+            (vocab_n[self._ing_nombre[k]], self._ing_cantidad[k], vocab_u[self._ing_unidad[k]])
+            for k in range(self._ing_inicio[i], self._ing_inicio[i + 1])
+        ]
+
+    def iter_ingredientes(self) -> Iterator[Tuple[int, str, float, str]]:
+        """
+        Recorre todos los ingredientes del lote como
+        (posición_receta, nombre, cantidad, unidad), sin crear Ingrediente.
+        """
+        vocab_n, vocab_u = self._vocab_ingredientes, self._vocab_unidades
+        inicio = self._ing_inicio
+        for i in range(len(self)):
+            for k in range(inicio[i], inicio[i + 1]):
+                yield i, vocab_n[self._ing_nombre[k]], self._ing_cantidad[k], vocab_u[self._ing_unidad[k]]
+
+    @property
+    def nombres_ingredientes(self) -> List[str]:
+        """Vocabulario de ingredientes distintos del lote."""
+        return list(self._vocab_ingredientes)
+
+    @property
+    def total_ingredientes(self) -> int:
+        return len(self._ing_nombre)
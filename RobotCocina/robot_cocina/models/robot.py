@@ -13,10 +13,14 @@ Versión: 4.0
 from __future__ import annotations
 from abc import ABC, abstractmethod
 from enum import Enum
-from typing import Optional, Callable, Dict, List, Any, TYPE_CHECKING
+from collections import deque
+from typing import Optional, Callable, Deque, Dict, List, Any, Tuple, TYPE_CHECKING
 import asyncio
+import inspect
 
-from models.tarea import Tarea, TareaCorte, TareaTemperatura, TareaMecanica, TipoOperacion
+from models.plan import RecipePlan
+from models.tarea import Tarea
+from utils.clock import Reloj, RelojReal
 from utils.exceptions import RobotApagadoError, TareaInvalidaError, RecetaError
 from utils.simulator import CookingSimulator
 
@@ -60,6 +64,248 @@ class ObservadorRobot(ABC):
         pass
 
 
+class ObservadorCallbacks(ObservadorRobot):
+    """Adapta funciones sueltas al contrato ObservadorRobot (las que falten se ignoran)."""
+    
+    def __init__(
+        self,
+        on_estado: Optional[Callable[[EstadoRobot], Any]] = None,
+        on_progreso: Optional[Callable[[int], Any]] = None,
+        on_evento: Optional[Callable[[str], Any]] = None,
+    ) -> None:
+        self._on_estado = on_estado
+        self._on_progreso = on_progreso
+        self._on_evento = on_evento
+    
+    def on_estado_changed(self, estado: EstadoRobot) -> Any:
+        if self._on_estado:
+            return self._on_estado(estado)
+    
+    def on_progreso_changed(self, progreso: int) -> Any:
+        if self._on_progreso:
+            return self._on_progreso(progreso)
+    
+    def on_evento(self, mensaje: str) -> Any:
+        if self._on_evento:
+            return self._on_evento(mensaje)
+
+
+class SuscripcionRobot:
+    """
+    Suscripción de un observador al bus de notificaciones.
+    
+    Guarda lo pendiente de entregar:
+    - cola ordenada de estados y eventos (nunca se fusionan)
+    - el último progreso publicado (los intermedios se descartan)
+    """
+    
+    __slots__ = ('observador', 'intervalo', 'activa', 'entregas', 'coalescidos',
+                 'descartados', '_bus', '_cola', '_progreso', '_ultima_entrega',
+                 '_programada', '_en_curso')
+    
+    def __init__(self, bus: BusNotificaciones, observador: ObservadorRobot, intervalo: float):
+        self.observador = observador
+        self.intervalo = intervalo
+        self.activa = True
+        # ===== ESTADÍSTICAS =====
+        self.entregas = 0
+        self.coalescidos = 0
+        self.descartados = 0
+        # ===== PENDIENTE =====
+        self._bus = bus
+        self._cola: Deque[Tuple[str, Any]] = deque()
+        self._progreso: Optional[int] = None
+        self._ultima_entrega = float('-inf')
+        self._programada = False
+        self._en_curso = False
+    
+    def cancelar(self) -> None:
+        """Da de baja la suscripción (lo pendiente ya no se entrega)."""
+        self._bus.cancelar(self)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "intervalo": self.intervalo,
+            "entregas": self.entregas,
+            "coalescidos": self.coalescidos,
+            "descartados": self.descartados,
+            "pendientes": len(self._cola) + (self._progreso is not None),
+        }
+
+
+class BusNotificaciones:
+    """
+    Reparto asíncrono de notificaciones del robot.
+    
+    - Publicar solo anota lo pendiente y programa la entrega en el
+      bucle de eventos: el bucle de cocción nunca ejecuta observadores
+    - Cada suscriptor recibe como mucho una entrega por `intervalo`
+      segundos; en ella llegan, en orden, los estados y eventos
+      pendientes y el ÚLTIMO progreso (latest-wins)
+    - Si un observador devuelve una corrutina, no se le entrega nada
+      más hasta que termine: un suscriptor lento solo se retrasa a sí mismo
+    - Sin bucle de eventos (scripts síncronos) la entrega es inmediata
+    """
+    
+    MAX_PENDIENTES = 256  # estados/eventos por suscriptor antes de descartar los más antiguos
+    
+    _MANEJADORES = {
+        'estado': 'on_estado_changed',
+        'progreso': 'on_progreso_changed',
+        'evento': 'on_evento',
+    }
+    
+    def __init__(self) -> None:
+        self._suscripciones: List[SuscripcionRobot] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._tareas: set = set()
+    
+    def suscribir(self, observador: ObservadorRobot, intervalo: float = 0.0) -> SuscripcionRobot:
+        """
+        Args:
+            observador: Destinatario (sus métodos pueden ser async)
+            intervalo: Segundos mínimos entre dos entregas a este observador
+        """
+        if intervalo < 0:
+            raise ValueError("El intervalo no puede ser negativo")
+        suscripcion = SuscripcionRobot(self, observador, intervalo)
+        self._suscripciones.append(suscripcion)
+        return suscripcion
+    
+    def cancelar(self, suscripcion: SuscripcionRobot) -> None:
+        suscripcion.activa = False
+        suscripcion._cola.clear()
+        suscripcion._progreso = None
+        if suscripcion in self._suscripciones:
+            self._suscripciones.remove(suscripcion)
+    
+    @property
+    def suscripciones(self) -> int:
+        return len(self._suscripciones)
+    
+    # ==================== PUBLICACIÓN ====================
+    
+    def publicar_estado(self, estado: EstadoRobot) -> None:
+        self._publicar('estado', estado)
+    
+    def publicar_evento(self, mensaje: str) -> None:
+        self._publicar('evento', mensaje)
+    
+    def publicar_progreso(self, progreso: int) -> None:
+        if not self._suscripciones or self._desde_otro_hilo(self.publicar_progreso, progreso):
+            return
+        for s in tuple(self._suscripciones):
+            if s._progreso is not None:
+                s.coalescidos += 1
+            s._progreso = progreso
+            self._programar(s)
+    
+    def _publicar(self, tipo: str, valor: Any) -> None:
+        if not self._suscripciones or self._desde_otro_hilo(self._publicar, tipo, valor):
+            return
+        for s in tuple(self._suscripciones):
+            if s._progreso is not None:
+                # El progreso anterior se entrega antes que este mensaje
+                s._cola.append(('progreso', s._progreso))
+                s._progreso = None
+            if len(s._cola) >= self.MAX_PENDIENTES:
+                s._cola.popleft()
+                s.descartados += 1
+            s._cola.append((tipo, valor))
+            self._programar(s)
+    
+    def _desde_otro_hilo(self, publicar: Callable[..., None], *args: Any) -> bool:
+        """Reenvía la publicación al bucle si llega desde otro hilo."""
+        try:
+            self._loop = asyncio.get_running_loop()
+            return False
+        except RuntimeError:
+            pass
+        loop = self._loop
+        if loop is None or loop.is_closed() or not loop.is_running():
+            return False  # sin bucle: entrega síncrona
+        loop.call_soon_threadsafe(publicar, *args)
+        return True
+    
+    # ==================== ENTREGA ====================
+    
+    def _programar(self, s: SuscripcionRobot) -> None:
+        if s._programada or s._en_curso:
+            return
+        loop = self._loop
+        if loop is None or loop.is_closed() or not loop.is_running():
+            self._entregar(s)
+            return
+        s._programada = True
+        espera = s._ultima_entrega + s.intervalo - loop.time()
+        if espera > 0:
+            loop.call_later(espera, self._entregar, s)
+        else:
+            loop.call_soon(self._entregar, s)
+    
+    def _entregar(self, s: SuscripcionRobot) -> None:
+        """Entrega todo lo pendiente de un suscriptor."""
+        s._programada = False
+        if not s.activa:
+            return
+        pendientes = list(s._cola)
+        s._cola.clear()
+        if s._progreso is not None:
+            pendientes.append(('progreso', s._progreso))
+            s._progreso = None
+        if not pendientes:
+            return
+        
+        loop = self._loop
+        s._ultima_entrega = loop.time() if loop is not None else 0.0
+        asincronas = []
+        for tipo, valor in pendientes:
+            s.entregas += 1
+            try:
+                resultado = getattr(s.observador, self._MANEJADORES[tipo])(valor)
+            except Exception as e:
+                print(f"[ROBOT] Error notificando observador: {e}")
+                continue
+            if inspect.isawaitable(resultado):
+                asincronas.append(resultado)
+        
+        if not asincronas:
+            return
+        if loop is None or not loop.is_running():
+            for corrutina in asincronas:
+                if inspect.iscoroutine(corrutina):
+                    corrutina.close()
+            return
+        s._en_curso = True
+        tarea = loop.create_task(self._esperar(s, asincronas))
+        self._tareas.add(tarea)
+        tarea.add_done_callback(self._tareas.discard)
+    
+    async def _esperar(self, s: SuscripcionRobot, asincronas: List[Any]) -> None:
+        """Espera a un observador asíncrono antes de volver a entregarle nada."""
+        try:
+            for pendiente in asincronas:
+                try:
+                    await pendiente
+                except Exception as e:
+                    print(f"[ROBOT] Error notificando observador: {e}")
+        finally:
+            s._en_curso = False
+            if s.activa and (s._cola or s._progreso is not None):
+                self._programar(s)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Estadísticas agregadas de todas las suscripciones."""
+        stats = [s.get_stats() for s in self._suscripciones]
+        return {
+            "suscripciones": len(stats),
+            "entregas": sum(s["entregas"] for s in stats),
+            "coalescidos": sum(s["coalescidos"] for s in stats),
+            "descartados": sum(s["descartados"] for s in stats),
+            "pendientes": sum(s["pendientes"] for s in stats),
+        }
+
+
 class Robot:
     """
     Clase principal del Robot de Cocina.
@@ -87,8 +333,14 @@ class Robot:
         EstadoRobot.ERROR: [EstadoRobot.IDLE],
     }
 
-    def __init__(self) -> None:
-        """Inicializa el robot en estado apagado."""
+    def __init__(self, reloj: Optional[Reloj] = None) -> None:
+        """
+        Inicializa el robot en estado apagado.
+        
+        Args:
+            reloj: Fuente de tiempo del simulador (por defecto, RelojReal;
+                   RelojVirtual ejecuta las recetas sin esperar)
+        """
         # ===== ESTADO INTERNO (ENCAPSULADO) =====
         self._estado: EstadoRobot = EstadoRobot.APAGADO
         
@@ -99,6 +351,7 @@ class Robot:
         # ===== EJECUCIÓN =====
         self._tarea_actual: Optional[Tarea] = None
         self._receta_actual: Optional[Receta] = None
+        self._plan: Optional[RecipePlan] = None
         self._paso_actual: int = 0
         self._total_pasos: int = 0
         
@@ -108,15 +361,18 @@ class Robot:
         self._duracion_paso_actual: int = 0
         self._tiempo_restante_paso: int = 0
         self._tiempo_restante_receta: int = 0
+        self._derivas: List[float] = []
         
         # ===== CONTROL =====
         self._cancelado: bool = False
         
         # ===== SIMULADOR (Composición) =====
-        self._simulator = CookingSimulator(velocidad_multiplicador=0.01)
+        self._reloj: Reloj = reloj or RelojReal()
+        self._simulator = CookingSimulator(velocidad_multiplicador=0.01, reloj=self._reloj)
         
         # ===== OBSERVADORES (Patrón Observer) =====
         self._observadores: List[ObservadorRobot] = []
+        self._bus = BusNotificaciones()
         
         # ===== CALLBACKS LEGACY =====
         self._callback_progreso: Optional[Callable[[int], None]] = None
@@ -164,6 +420,25 @@ class Robot:
     def receta_actual(self) -> Optional[Receta]:
         return self._receta_actual
 
+    @property
+    def reloj(self) -> Reloj:
+        """Reloj que marca el ritmo de la simulación."""
+        return self._reloj
+
+    @property
+    def velocidad_simulacion(self) -> float:
+        """Segundos de reloj por segundo de receta (1.0 = tiempo real)."""
+        return self._simulator.velocidad
+
+    @velocidad_simulacion.setter
+    def velocidad_simulacion(self, valor: float) -> None:
+        self._simulator.velocidad = valor
+
+    @property
+    def plan(self) -> Optional[RecipePlan]:
+        """Plan precalculado de la receta preparada."""
+        return self._plan
+
     @property
     def paso_actual(self) -> int:
         return self._paso_actual
@@ -195,6 +470,24 @@ class Robot:
         if observador in self._observadores:
             self._observadores.remove(observador)
 
+    def suscribir(self, observador: ObservadorRobot, intervalo: float = 0.1) -> SuscripcionRobot:
+        """
+        Suscribe un observador con entrega asíncrona y limitada.
+        
+        A diferencia de agregar_observador (síncrono, en cada tick), el
+        observador recibe como mucho una entrega cada `intervalo` segundos
+        con los estados/eventos pendientes y el último progreso. Es lo
+        indicado para la interfaz y cualquier observador lento.
+        
+        Returns:
+            Suscripción (suscripcion.cancelar() para darla de baja)
+        """
+        return self._bus.suscribir(observador, intervalo)
+
+    def get_stats_notificaciones(self) -> Dict[str, Any]:
+        """Estadísticas del bus: entregas, progresos fusionados y descartes."""
+        return self._bus.get_stats()
+
     # ==========================================================
     # CALLBACKS LEGACY (compatibilidad)
     # ==========================================================
@@ -214,6 +507,7 @@ class Robot:
 
     def _notificar_cambio_estado(self) -> None:
         """Notifica a todos los observadores sobre cambio de estado."""
+        self._bus.publicar_estado(self._estado)
         for obs in self._observadores:
             try:
                 obs.on_estado_changed(self._estado)
@@ -228,6 +522,7 @@ class Robot:
 
     def _notificar_progreso(self, progreso: int) -> None:
         """Notifica progreso a observadores."""
+        self._bus.publicar_progreso(progreso)
         for obs in self._observadores:
             try:
                 obs.on_progreso_changed(progreso)
@@ -243,6 +538,7 @@ class Robot:
     def _notificar_evento(self, mensaje: str) -> None:
         """Notifica un evento."""
         print(f"[ROBOT EVENTO] {mensaje}")
+        self._bus.publicar_evento(mensaje)
         
         for obs in self._observadores:
             try:
@@ -357,6 +653,7 @@ class Robot:
         Raises:
             RobotApagadoError: Si el robot está apagado
             TareaInvalidaError: Si no se puede preparar en el estado actual
+            RecetaError: Si la receta no tiene pasos o alguno no es válido
         """
         if self._estado == EstadoRobot.APAGADO:
             raise RobotApagadoError("El robot está apagado")
@@ -364,25 +661,25 @@ class Robot:
         if self._estado not in (EstadoRobot.IDLE, EstadoRobot.FINALIZADO):
             raise TareaInvalidaError(f"No se puede preparar receta en estado: {self._estado.value}")
         
-        if not receta.pasos:
-            raise RecetaError("La receta no tiene pasos definidos")
+        # Compilar y validar todos los pasos antes de tocar el estado
+        plan = RecipePlan.compilar(receta)
         
         # Configurar receta
         self._receta_actual = receta
+        self._plan = plan
         self._tarea_actual = None
         self._paso_actual = 0
-        self._total_pasos = len(receta.pasos)
+        self._total_pasos = plan.total_pasos
         self._progreso_actual = 0
         self._progreso_receta = 0
+        self._derivas = []
         self._cancelado = False
         
         # Reset simulador
         self._simulator.reset()
         
-        # Calcular tiempo total
-        self._tiempo_restante_receta = sum(
-            int(p.get("duracion", 0)) for p in receta.pasos
-        )
+        # Tiempo total (sumas prefijas del plan)
+        self._tiempo_restante_receta = self._plan.duracion_total
         
         # Cambiar estado
         if self._cambiar_estado(EstadoRobot.PREPARADO):
@@ -392,6 +689,19 @@ class Robot:
             return True
         return False
 
+    def descartar_receta(self) -> bool:
+        """
+        Descarta la receta preparada o terminada y vuelve a IDLE,
+        notificándolo (varias interfaces pueden mirar el mismo robot).
+        
+        Returns:
+            True si había una receta que descartar
+        """
+        if self._estado not in (EstadoRobot.PREPARADO, EstadoRobot.FINALIZADO):
+            return False
+        self._reset_todo()
+        return self._cambiar_estado(EstadoRobot.IDLE)
+
     async def comenzar_receta(self) -> bool:
         """
         Ejecuta la receta preparada paso a paso.
@@ -407,11 +717,27 @@ class Robot:
         if self._estado != EstadoRobot.PREPARADO:
             raise TareaInvalidaError("No hay receta preparada")
         
-        if not self._receta_actual:
+        if not self._receta_actual or self._plan is None:
             raise RecetaError("No hay receta cargada")
         
-        pasos = self._receta_actual.pasos
-        total = len(pasos)
+        # Toda la receta es una sesión del simulador: con un reloj virtual
+        # compartido, el tiempo no avanza mientras el robot cambia de paso
+        with self._simulator.sesion():
+            return await self._ejecutar_pasos()
+
+    def sesion(self):
+        """
+        Context manager que mantiene al robot como participante del reloj
+        entre recetas (lotes, planificadores). Con RelojVirtual compartido
+        evita que otros robots adelanten el tiempo mientras este prepara
+        la siguiente receta.
+        """
+        return self._simulator.sesion()
+
+    async def _ejecutar_pasos(self) -> bool:
+        """Bucle principal de comenzar_receta: recorre las tareas del plan."""
+        plan = self._plan
+        total = plan.total_pasos
         
         # Iniciar ejecución
         self._cancelado = False
@@ -421,7 +747,7 @@ class Robot:
         print(f"[ROBOT] Ejecutando {total} pasos")
         
         # ========== BUCLE PRINCIPAL DE PASOS ==========
-        for i, paso in enumerate(pasos):
+        for i, tarea in enumerate(plan.tareas):
             # Verificar cancelación
             if self._cancelado:
                 print(f"[ROBOT] Cancelado antes del paso {i+1}")
@@ -431,21 +757,18 @@ class Robot:
             # Actualizar estado del paso
             self._paso_actual = i
             self._progreso_actual = 0
-            self._progreso_receta = int((i / total) * 100)
+            self._progreso_receta = plan.progreso(i)
             
             # Tiempo restante
-            self._tiempo_restante_receta = sum(
-                int(p.get("duracion", 0)) for p in pasos[i:]
-            )
+            self._tiempo_restante_receta = plan.restante_desde(i)
             
             # Notificar cambio de paso
             self._notificar_progreso(0)
             
-            print(f"[ROBOT] === Paso {i+1}/{total}: {paso.get('operacion', paso.get('nombre', '?'))} ===")
+            print(f"[ROBOT] === Paso {i+1}/{total}: {tarea.nombre} ===")
             
-            # Crear y ejecutar tarea
+            # Ejecutar tarea (ya validada al compilar el plan)
             try:
-                tarea = self._crear_tarea(paso)
                 resultado = await self._ejecutar_tarea(tarea)
                 
                 if not resultado:
@@ -455,10 +778,12 @@ class Robot:
                         self._finalizar(EstadoRobot.ERROR, "Error en ejecución")
                     return False
                 
+                self._derivas.append(self._simulator.ultima_deriva)
                 print(f"[ROBOT] Paso {i+1} completado ✓")
                 
-                # CRÍTICO: Pequeña pausa entre pasos para que la UI se actualice
-                await asyncio.sleep(0.1)
+                # Ceder el bucle entre pasos para que la UI se actualice
+                # (sin retrasar la receta: los plazos del simulador ya marcan el ritmo)
+                await asyncio.sleep(0)
                 
             except Exception as e:
                 print(f"[ROBOT ERROR] Paso {i+1}: {e}")
@@ -478,12 +803,7 @@ class Robot:
         return True
 
     async def _ejecutar_tarea(self, tarea: Tarea) -> bool:
-        """Ejecuta una tarea individual."""
-        # Validar
-        valido, msg = tarea.validar()
-        if not valido:
-            raise TareaInvalidaError(msg)
-        
+        """Ejecuta una tarea individual (validada al compilar el plan)."""
         # Configurar
         self._tarea_actual = tarea
         self._progreso_actual = 0
@@ -518,19 +838,16 @@ class Robot:
             self._progreso_actual = int((actual / total) * 100)
             self._tiempo_restante_paso = max(0, total - actual)
         
-        # Progreso global
-        if self._receta_actual and self._total_pasos > 0:
+        # Progreso global (O(1) con el plan precalculado)
+        plan = self._plan
+        if plan is not None and plan.total_pasos > 0:
             progreso_paso = actual / total if total > 0 else 1
-            self._progreso_receta = int(
-                ((self._paso_actual + progreso_paso) / self._total_pasos) * 100
-            )
+            self._progreso_receta = plan.progreso(self._paso_actual, progreso_paso)
             
-            # Tiempo restante total
-            pasos_futuros = sum(
-                int(p.get("duracion", 0))
-                for p in self._receta_actual.pasos[self._paso_actual + 1:]
+            # Tiempo restante total: lo que queda del paso + pasos futuros
+            self._tiempo_restante_receta = (
+                self._tiempo_restante_paso + plan.restante_desde(self._paso_actual + 1)
             )
-            self._tiempo_restante_receta = self._tiempo_restante_paso + pasos_futuros
         
         self._notificar_progreso(self._progreso_actual)
 
@@ -538,41 +855,6 @@ class Robot:
     # UTILIDADES
     # ==========================================================
 
-    def _crear_tarea(self, paso: Dict[str, Any]) -> Tarea:
-        """
-        Factory Method para crear tareas desde definición de paso.
-        POLIMORFISMO: Retorna diferentes tipos de Tarea.
-        """
-        tipo = paso.get("tipo", "").lower()
-        
-        if tipo == "corte":
-            return TareaCorte(
-                operacion=TipoOperacion(paso.get("operacion", "picar")),
-                duracion=int(paso.get("duracion", 30)),
-                velocidad=int(paso.get("velocidad", 5)),
-                descripcion=paso.get("descripcion", "")
-            )
-        
-        elif tipo == "temperatura":
-            return TareaTemperatura(
-                operacion=TipoOperacion(paso.get("operacion", "hervir")),
-                duracion=int(paso.get("duracion", 60)),
-                temperatura=int(paso.get("temperatura", 100)),
-                velocidad=int(paso.get("velocidad", 1)),
-                descripcion=paso.get("descripcion", "")
-            )
-        
-        elif tipo == "mecanica":
-            return TareaMecanica(
-                nombre=paso.get("nombre", paso.get("operacion", "Mezclar")),
-                duracion=int(paso.get("duracion", 30)),
-                velocidad=int(paso.get("velocidad", 5)),
-                descripcion=paso.get("descripcion", "")
-            )
-        
-        else:
-            raise TareaInvalidaError(f"Tipo de tarea desconocido: {tipo}")
-
     def _finalizar(self, estado: EstadoRobot, mensaje: str) -> None:
         """Finaliza la ejecución con un estado y mensaje."""
         self._reset_parametros()
@@ -590,12 +872,14 @@ class Robot:
         """Resetea todo el estado."""
         self._reset_parametros()
         self._receta_actual = None
+        self._plan = None
         self._paso_actual = 0
         self._total_pasos = 0
         self._progreso_receta = 0
         self._duracion_paso_actual = 0
         self._tiempo_restante_paso = 0
         self._tiempo_restante_receta = 0
+        self._derivas = []
         self._cancelado = False
 
     # ==========================================================
@@ -624,6 +908,10 @@ class Robot:
             "velocidad": self._velocidad,
         }
 
+    def get_derivas(self) -> List[float]:
+        """Deriva medida (segundos) de cada paso completado de la receta actual."""
+        return list(self._derivas)
+
     def get_tiempos_restantes(self) -> Dict[str, int]:
         """Retorna los tiempos restantes."""
         return {
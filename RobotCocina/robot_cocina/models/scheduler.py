@@ -0,0 +1,386 @@
+"""
+=================================================================
+PLANIFICADOR DE RECETAS PARA LA FLOTA
+=================================================================
+Cola de peticiones de cocinado repartidas entre los robots libres
+de una RobotFleet.
+
+PETICIONES:
+- receta (o id de receta), porciones, prioridad y plazo opcional
+- La receta se compila al encolar: una petición inválida se
+  rechaza en el momento, no cuando le toca un robot
+
+POLÍTICAS (a igual prioridad; mayor prioridad siempre va antes):
+- FIFO: orden de llegada
+- SJF:  trabajo más corto primero (Receta.tiempo_total)
+- EDF:  plazo más temprano primero (sin plazo = al final)
+
+DESPACHO POR EVENTOS:
+- Al encolar y al terminar cada receta (sin bucles de sondeo)
+- El robot que acaba recibe la siguiente receta antes de salir de
+  su sesión del reloj: con RelojVirtual no se pierde tiempo entre
+  recetas y las métricas son exactas
+
+MÉTRICAS:
+- Profundidad de la cola (actual, máxima y media ponderada en el tiempo)
+- Espera (llegada → inicio) y retorno (llegada → fin)
+- Plazos cumplidos / incumplidos y utilización de la flota
+=================================================================
+"""
+
+from __future__ import annotations
+import asyncio
+import heapq
+import itertools
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any, Dict, List, Optional, Tuple, TYPE_CHECKING
+
+from models.fleet import RobotFleet
+from models.plan import RecipePlan
+from models.robot import EstadoRobot
+from utils.exceptions import RecetaError, RobotException
+
+if TYPE_CHECKING:
+    from database.async_db_handler import AsyncDatabaseHandler
+    from models.receta import Receta
+
+
+class PoliticaPlanificacion(Enum):
+    """Orden de la cola entre peticiones de igual prioridad."""
+    FIFO = "fifo"
+    SJF = "sjf"
+    EDF = "edf"
+
+
+class EstadoTrabajo(Enum):
+    """Ciclo de vida de una petición."""
+    EN_COLA = "en_cola"
+    COCINANDO = "cocinando"
+    COMPLETADO = "completado"
+    CANCELADO = "cancelado"
+    ERROR = "error"
+
+
+_TERMINADO = (EstadoTrabajo.COMPLETADO, EstadoTrabajo.CANCELADO, EstadoTrabajo.ERROR)
+
+
+@dataclass(slots=True, eq=False)
+class TrabajoCocina:
+    """
+    Petición encolada y su seguimiento. Los instantes están en la
+    escala del reloj de la flota.
+
+        trabajo = planificador.encolar(receta, prioridad=1, plazo=600)
+        await trabajo.resultado          # EstadoTrabajo final
+        trabajo.espera                   # segundos en cola
+    """
+    id: int
+    receta: Receta
+    porciones: int
+    prioridad: int
+    duracion_estimada: int
+    llegada: float
+    limite: Optional[float] = None
+    estado: EstadoTrabajo = EstadoTrabajo.EN_COLA
+    robot_id: Optional[str] = None
+    inicio: Optional[float] = None
+    fin: Optional[float] = None
+    resultado: Optional[asyncio.Future] = field(default=None, repr=False)
+
+    @property
+    def espera(self) -> Optional[float]:
+        """Segundos entre la llegada y el inicio (None si sigue en cola)."""
+        return None if self.inicio is None else self.inicio - self.llegada
+
+    @property
+    def retorno(self) -> Optional[float]:
+        """Segundos entre la llegada y el final (None si no ha terminado)."""
+        return None if self.fin is None else self.fin - self.llegada
+
+    @property
+    def plazo_cumplido(self) -> Optional[bool]:
+        """Si terminó antes del límite (None sin plazo o sin terminar)."""
+        if self.limite is None or self.fin is None:
+            return None
+        return self.fin <= self.limite
+
+
+class CookScheduler:
+    """
+    Reparte peticiones de cocinado entre los robots libres de una flota.
+
+        flota = RobotFleet(reloj=RelojVirtual())
+        for _ in range(4):
+            flota.agregar()
+        planificador = CookScheduler(flota, PoliticaPlanificacion.SJF)
+        planificador.encolar(receta, plazo=900)
+        await planificador.esperar()
+        planificador.get_metricas()
+    """
+
+    def __init__(self, flota: RobotFleet,
+                 politica: PoliticaPlanificacion = PoliticaPlanificacion.FIFO,
+                 db: Optional[AsyncDatabaseHandler] = None):
+        """
+        Args:
+            flota: Robots que cocinan las peticiones
+            politica: Orden de la cola a igual prioridad
+            db: Base de datos para encolar por id de receta (enviar)
+        """
+        self._flota = flota
+        self._politica = politica
+        self._db = db
+        self._cola: List[Tuple[int, float, int, TrabajoCocina]] = []
+        self._secuencia = itertools.count(1)
+        self._activos: Dict[int, TrabajoCocina] = {}
+        self._cocinando = 0
+        self._inactivo = asyncio.Event()
+        self._inactivo.set()
+
+        # ===== MÉTRICAS =====
+        reloj = flota.reloj
+        self._inicio = reloj.ahora()
+        self._en_cola = 0
+        self._cola_max = 0
+        self._area_cola = 0.0
+        self._ultimo_cambio = self._inicio
+        self._enviados = 0
+        self._contadores = {estado: 0 for estado in _TERMINADO}
+        self._iniciados = 0
+        self._espera_total = 0.0
+        self._espera_max = 0.0
+        self._terminados = 0
+        self._retorno_total = 0.0
+        self._plazos_cumplidos = 0
+        self._plazos_incumplidos = 0
+
+    # ==================== PETICIONES ====================
+
+    async def enviar(self, receta_id: int, porciones: Optional[int] = None,
+                     prioridad: int = 0, plazo: Optional[float] = None) -> TrabajoCocina:
+        """
+        Carga la receta de la base de datos y la encola.
+
+        Raises:
+            RecetaError: Si no hay base de datos o la receta no existe
+        """
+        if self._db is None:
+            raise RecetaError("El planificador no tiene base de datos para cargar recetas")
+        receta = await self._db.get_recipe_by_id(receta_id)
+        if receta is None:
+            raise RecetaError(f"No existe la receta {receta_id}")
+        return self.encolar(receta, porciones, prioridad, plazo)
+
+    def encolar(self, receta: Receta, porciones: Optional[int] = None,
+                prioridad: int = 0, plazo: Optional[float] = None) -> TrabajoCocina:
+        """
+        Añade una petición y la despacha si hay un robot libre.
+
+        Args:
+            receta: Receta a cocinar
+            porciones: Porciones pedidas (por defecto, las de la receta)
+            prioridad: Mayor valor = antes, sea cual sea la política
+            plazo: Segundos de reloj desde ahora para tenerla terminada
+
+        Returns:
+            El trabajo, que se actualiza a medida que avanza
+
+        Raises:
+            RecetaError: Si la receta no tiene pasos o alguno no es válido
+        """
+        plan = RecipePlan.compilar(receta)
+        ahora = self._flota.reloj.ahora()
+        trabajo = TrabajoCocina(
+            id=next(self._secuencia),
+            receta=receta,
+            porciones=porciones or receta.porciones,
+            prioridad=prioridad,
+            duracion_estimada=receta.tiempo_total or plan.duracion_total,
+            llegada=ahora,
+            limite=None if plazo is None else ahora + plazo,
+            resultado=asyncio.get_running_loop().create_future(),
+        )
+        self._activos[trabajo.id] = trabajo
+        self._enviados += 1
+        self._inactivo.clear()
+        heapq.heappush(self._cola, self._clave(trabajo))
+        self._cambiar_cola(+1)
+        self._despachar()
+        return trabajo
+
+    def cancelar(self, trabajo_id: int) -> bool:
+        """
+        Retira una petición que sigue en cola.
+        Las que ya cocinan se detienen con la parada de emergencia del robot.
+        """
+        trabajo = self._activos.get(trabajo_id)
+        if trabajo is None or trabajo.estado != EstadoTrabajo.EN_COLA:
+            return False
+        # Se descarta de la cola al salir por la cima (borrado perezoso)
+        self._cambiar_cola(-1)
+        self._terminar(trabajo, EstadoTrabajo.CANCELADO)
+        return True
+
+    async def esperar(self) -> None:
+        """
+        Espera a que la cola se vacíe y terminen todas las recetas.
+        (Si ningún robot puede aceptar recetas, no vuelve nunca.)
+        """
+        await self._inactivo.wait()
+
+    def trabajo(self, trabajo_id: int) -> Optional[TrabajoCocina]:
+        """Trabajo en cola o cocinando (los terminados ya no se guardan)."""
+        return self._activos.get(trabajo_id)
+
+    @property
+    def politica(self) -> PoliticaPlanificacion:
+        return self._politica
+
+    @politica.setter
+    def politica(self, valor: PoliticaPlanificacion) -> None:
+        """Cambia la política y reordena la cola pendiente."""
+        self._politica = valor
+        self._cola = [self._clave(t) for _, _, _, t in self._cola
+                      if t.estado == EstadoTrabajo.EN_COLA]
+        heapq.heapify(self._cola)
+
+    @property
+    def en_cola(self) -> int:
+        return self._en_cola
+
+    # ==================== DESPACHO ====================
+
+    def _clave(self, trabajo: TrabajoCocina) -> Tuple[int, float, int, TrabajoCocina]:
+        """Entrada del heap: (-prioridad, criterio de la política, orden de llegada)."""
+        if self._politica == PoliticaPlanificacion.SJF:
+            criterio = float(trabajo.duracion_estimada)
+        elif self._politica == PoliticaPlanificacion.EDF:
+            criterio = trabajo.limite if trabajo.limite is not None else float('inf')
+        else:
+            criterio = trabajo.llegada
+        return (-trabajo.prioridad, criterio, trabajo.id, trabajo)
+
+    def _siguiente(self) -> Optional[TrabajoCocina]:
+        """Saca el trabajo más urgente que siga en cola."""
+        while self._cola:
+            trabajo = heapq.heappop(self._cola)[-1]
+            if trabajo.estado == EstadoTrabajo.EN_COLA:
+                return trabajo
+        return None
+
+    def _despachar(self, robot_id: Optional[str] = None) -> None:
+        """Asigna trabajos a robots libres (solo a `robot_id` si se indica)."""
+        if not self._en_cola:
+            return
+        if robot_id is not None:
+            libres = [robot_id] if self._flota.disponible(robot_id) else []
+        elif self._cocinando >= len(self._flota):
+            return  # todos los robots están ocupados con trabajos del planificador
+        else:
+            libres = self._flota.disponibles()
+
+        for rid in libres:
+            trabajo = self._siguiente()
+            if trabajo is None:
+                return
+            self._iniciar(trabajo, rid)
+
+    def _iniciar(self, trabajo: TrabajoCocina, robot_id: str) -> None:
+        """Lanza el trabajo en el robot y contabiliza la espera."""
+        self._cambiar_cola(-1)
+        try:
+            self._flota.lanzar(
+                robot_id, trabajo.receta,
+                al_terminar=lambda _rid, tarea, t=trabajo: self._al_terminar(t, tarea),
+            )
+        except RobotException as e:
+            print(f"[PLANIFICADOR] No se pudo lanzar el trabajo {trabajo.id} en {robot_id}: {e}")
+            self._terminar(trabajo, EstadoTrabajo.ERROR)
+            return
+
+        trabajo.estado = EstadoTrabajo.COCINANDO
+        trabajo.robot_id = robot_id
+        trabajo.inicio = self._flota.reloj.ahora()
+        self._cocinando += 1
+        self._iniciados += 1
+        espera = trabajo.inicio - trabajo.llegada
+        self._espera_total += espera
+        self._espera_max = max(self._espera_max, espera)
+
+    def _al_terminar(self, trabajo: TrabajoCocina, tarea: asyncio.Task) -> None:
+        """Registra el resultado y da la siguiente receta al mismo robot."""
+        self._cocinando -= 1
+        if tarea.cancelled():
+            estado = EstadoTrabajo.CANCELADO
+        elif tarea.exception() is not None or not tarea.result():
+            robot = self._flota.robot(trabajo.robot_id)
+            cancelada = tarea.exception() is None and robot.estado != EstadoRobot.ERROR
+            estado = EstadoTrabajo.CANCELADO if cancelada else EstadoTrabajo.ERROR
+        else:
+            estado = EstadoTrabajo.COMPLETADO
+        self._terminar(trabajo, estado)
+        self._despachar(trabajo.robot_id)
+
+    def _terminar(self, trabajo: TrabajoCocina, estado: EstadoTrabajo) -> None:
+        """Cierra el trabajo con su estado final."""
+        trabajo.estado = estado
+        trabajo.fin = self._flota.reloj.ahora()
+        self._contadores[estado] += 1
+        if trabajo.inicio is not None:
+            self._terminados += 1
+            self._retorno_total += trabajo.fin - trabajo.llegada
+            if trabajo.limite is not None:
+                if trabajo.fin <= trabajo.limite:
+                    self._plazos_cumplidos += 1
+                else:
+                    self._plazos_incumplidos += 1
+        del self._activos[trabajo.id]
+        if not trabajo.resultado.done():
+            trabajo.resultado.set_result(estado)
+        if not self._activos:
+            self._inactivo.set()
+
+    def _cambiar_cola(self, delta: int) -> None:
+        """Actualiza la profundidad de la cola y su integral en el tiempo."""
+        ahora = self._flota.reloj.ahora()
+        self._area_cola += self._en_cola * (ahora - self._ultimo_cambio)
+        self._ultimo_cambio = ahora
+        self._en_cola += delta
+        self._cola_max = max(self._cola_max, self._en_cola)
+
+    # ==================== MÉTRICAS ====================
+
+    def get_metricas(self) -> Dict[str, Any]:
+        """
+        Métricas del planificador (segundos en la escala del reloj).
+
+        - cola_media: profundidad media ponderada por el tiempo
+        - espera_*: llegada → inicio de los trabajos lanzados
+        - retorno_medio: llegada → fin de los trabajos lanzados
+        - utilizacion: la de la flota (fracción de tiempo cocinando)
+        """
+        ahora = self._flota.reloj.ahora()
+        area = self._area_cola + self._en_cola * (ahora - self._ultimo_cambio)
+        transcurrido = ahora - self._inicio
+        return {
+            "politica": self._politica.value,
+            "en_cola": self._en_cola,
+            "cola_max": self._cola_max,
+            "cola_media": area / transcurrido if transcurrido > 0 else float(self._en_cola),
+            "cocinando": self._cocinando,
+            "enviados": self._enviados,
+            "completados": self._contadores[EstadoTrabajo.COMPLETADO],
+            "cancelados": self._contadores[EstadoTrabajo.CANCELADO],
+            "errores": self._contadores[EstadoTrabajo.ERROR],
+            "espera_media": self._espera_total / self._iniciados if self._iniciados else 0.0,
+            "espera_max": self._espera_max,
+            "retorno_medio": self._retorno_total / self._terminados if self._terminados else 0.0,
+            "plazos_cumplidos": self._plazos_cumplidos,
+            "plazos_incumplidos": self._plazos_incumplidos,
+            "utilizacion": self._flota.get_metricas()["utilizacion"],
+        }
+
+    def __repr__(self) -> str:
+        return (f"CookScheduler(politica={self._politica.value}, en_cola={self._en_cola}, "
+                f"cocinando={self._cocinando})")
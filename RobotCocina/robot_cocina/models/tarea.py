@@ -14,6 +14,9 @@ POLIMORFISMO:
 - Cada subclase implementa aplicar() de forma diferente
 - Cada subclase genera mensajes específicos
 
+MEMORIA:
+- Toda la jerarquía declara __slots__ (sin __dict__ por instancia)
+
 =================================================================
 """
 
@@ -59,6 +62,8 @@ class Tarea(ABC):
     - Atributos protegidos con validación
     """
     
+    __slots__ = ('_nombre', '_duracion', '_descripcion')
+    
     def __init__(self, nombre: str, duracion: int, descripcion: str = ""):
         """
         Inicializa una tarea.
@@ -136,6 +141,8 @@ class TareaCorte(Tarea):
     POLIMORFISMO: Implementa aplicar() configurando velocidad
     """
     
+    __slots__ = ('_operacion', '_velocidad')
+    
     VELOCIDAD_MIN = 1
     VELOCIDAD_MAX = 10
     
@@ -197,6 +204,8 @@ class TareaTemperatura(Tarea):
     POLIMORFISMO: Implementa aplicar() configurando temperatura y velocidad
     """
     
+    __slots__ = ('_operacion', '_temperatura', '_velocidad')
+    
     TEMP_MIN = 0
     TEMP_MAX = 200
     
@@ -265,6 +274,8 @@ class TareaMecanica(Tarea):
     POLIMORFISMO: Implementa aplicar() configurando velocidad
     """
     
+    __slots__ = ('_velocidad',)
+    
     def __init__(
         self,
         nombre: str,
@@ -0,0 +1,11 @@
+"""
+Configuración de pytest.
+
+Los módulos se importan como en app.py (desde robot_cocina/), así que
+las pruebas funcionan igual con `pytest` que con `python -m pytest`.
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
@@ -0,0 +1,100 @@
+"""
+Pruebas de las cachés de DatabaseHandler sobre una BD temporal con
+las recetas de fábrica.
+"""
+
+import contextlib
+import io
+
+import pytest
+
+from database.db_handler import DatabaseHandler
+
+
+@pytest.fixture
+def db(tmp_path):
+    handler = DatabaseHandler(str(tmp_path / "robot_cocina.db"))
+    with contextlib.redirect_stdout(io.StringIO()):
+        handler.initialize_database()
+    yield handler
+    handler.close()
+
+
+def test_listado_leido_antes_de_una_escritura_no_se_cachea(db):
+    clave = ('todas', False, True)
+
+    def cargar_y_escribir():
+        recetas = [db.get_recipe_by_id(1)]
+        # Otro hilo escribe mientras este listado se está cargando
+        db._invalidar_receta()
+        return recetas
+
+    db._lista_cacheada(clave, cargar_y_escribir)
+    assert clave not in db._cache_listas
+    # Sin escrituras de por medio el listado sí se cachea
+    db.get_all_recipes()
+    assert clave in db._cache_listas
+
+
+def test_receta_leida_antes_de_una_escritura_no_se_cachea(db, monkeypatch):
+    receta = db.get_recipe_by_id(1)
+    db.clear_cache()
+    conexion_original = db.get_connection
+
+    @contextlib.contextmanager
+    def conexion_con_escritura():
+        with conexion_original() as conn:
+            yield conn
+        # La escritura termina entre la lectura y el guardado en caché
+        db._invalidar_receta(receta.id)
+
+    monkeypatch.setattr(db, 'get_connection', conexion_con_escritura)
+    assert db.get_recipe_by_id(receta.id).nombre == receta.nombre
+    monkeypatch.undo()
+    assert receta.id not in db._cache_recetas
+
+
+def _sin_perfiles(db):
+    with db.get_connection() as conn:
+        conn.execute('DELETE FROM receta_perfil')
+        conn.execute('UPDATE recetas SET alergenos = NULL')
+        conn.commit()
+    db.clear_cache()
+
+
+def test_recalcular_perfiles_invalida_los_listados_sin_alergenos(db):
+    esperadas = [r.id for r in db.query_recipes(excluir_alergenos=['gluten'], limit=None)]
+    assert esperadas
+    _sin_perfiles(db)
+    # Sin perfil la receta no pasa ningún filtro de alérgenos
+    assert db.query_recipes(excluir_alergenos=['gluten'], limit=None) == []
+    db.query_recipes(limit=None)
+
+    assert db.rebuild_profiles() == db.get_recipe_count()
+    assert [r.id for r in db.query_recipes(excluir_alergenos=['gluten'], limit=None)] == esperadas
+    # Los listados sin filtro de alérgenos no dependen de los perfiles
+    hits = db.get_cache_stats()['listas']['hits']
+    db.query_recipes(limit=None)
+    assert db.get_cache_stats()['listas']['hits'] == hits + 1
+
+
+def test_perfil_bajo_demanda_invalida_los_listados_sin_alergenos(db):
+    receta_id = db.query_recipes(excluir_alergenos=['huevo'], limit=1)[0].id
+    _sin_perfiles(db)
+    assert db.query_recipes(excluir_alergenos=['huevo'], limit=None) == []
+
+    db.get_recipe_profile(receta_id)
+    assert [r.id for r in db.query_recipes(excluir_alergenos=['huevo'], limit=None)] == [receta_id]
+
+
+def test_con_perfiles_pendientes_no_se_cachean_los_filtros_de_alergenos(db):
+    _sin_perfiles(db)
+    db.query_recipes(excluir_alergenos=['gluten'])
+    db.query_recipes()
+    assert db.get_cache_stats()['listas']['tamaño'] == 1
+
+    db.rebuild_profiles()
+    sin_gluten = db.query_recipes(excluir_alergenos=['gluten'])
+    assert sin_gluten
+    assert db.get_cache_stats()['listas']['tamaño'] == 2
+    assert db.query_recipes(excluir_alergenos=['gluten']) == sin_gluten
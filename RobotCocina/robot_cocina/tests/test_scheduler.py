@@ -0,0 +1,137 @@
+"""
+Pruebas de CookScheduler sobre un RelojVirtual.
+
+A velocidad 1.0 cada segundo de receta es un segundo de reloj, así
+que los instantes de inicio y fin son exactos y no hay que esperar.
+"""
+
+import asyncio
+
+import pytest
+
+from models.fleet import RobotFleet
+from models.receta import Receta, Ingrediente
+from models.scheduler import CookScheduler, EstadoTrabajo, PoliticaPlanificacion
+from utils.clock import RelojVirtual
+
+
+def _receta(nombre: str, duracion: int) -> Receta:
+    pasos = [{"tipo": "temperatura", "operacion": "hervir", "duracion": duracion,
+              "temperatura": 100, "velocidad": 1}]
+    return Receta(nombre, "", [Ingrediente("agua", 1000, "ml")], pasos, duracion)
+
+
+def _planificador(politica: PoliticaPlanificacion = PoliticaPlanificacion.FIFO,
+                  robots: int = 1, reloj: RelojVirtual = None) -> CookScheduler:
+    flota = RobotFleet(reloj=reloj or RelojVirtual(), velocidad_simulacion=1.0)
+    for _ in range(robots):
+        flota.agregar()
+    return CookScheduler(flota, politica)
+
+
+async def _cola_con_bloqueo(politica: PoliticaPlanificacion) -> dict:
+    """
+    Un robot ocupado 100 s y tres peticiones en cola a la vez:
+    larga (300 s, plazo 2000), corta (100 s, plazo 3000) y
+    media (200 s, plazo 1000). Devuelve el inicio de cada una.
+    """
+    planificador = _planificador(politica)
+    planificador.encolar(_receta("bloqueo", 100))
+    trabajos = {
+        "larga": planificador.encolar(_receta("larga", 300), plazo=2000),
+        "corta": planificador.encolar(_receta("corta", 100), plazo=3000),
+        "media": planificador.encolar(_receta("media", 200), plazo=1000),
+    }
+    await planificador.esperar()
+    assert all(t.estado == EstadoTrabajo.COMPLETADO for t in trabajos.values())
+    return {nombre: t.inicio for nombre, t in trabajos.items()}
+
+
+@pytest.mark.parametrize("politica, esperado", [
+    (PoliticaPlanificacion.FIFO, {"larga": 100, "corta": 400, "media": 500}),
+    (PoliticaPlanificacion.SJF, {"corta": 100, "media": 200, "larga": 400}),
+    (PoliticaPlanificacion.EDF, {"media": 100, "larga": 300, "corta": 600}),
+])
+def test_orden_de_la_cola_segun_politica(politica, esperado):
+    assert asyncio.run(_cola_con_bloqueo(politica)) == esperado
+
+
+def test_prioridad_va_antes_que_la_politica():
+    async def escenario():
+        planificador = _planificador(PoliticaPlanificacion.SJF)
+        planificador.encolar(_receta("bloqueo", 100))
+        corta = planificador.encolar(_receta("corta", 50))
+        urgente = planificador.encolar(_receta("urgente", 500), prioridad=1)
+        await planificador.esperar()
+        return urgente.inicio, corta.inicio
+
+    assert asyncio.run(escenario()) == (100, 600)
+
+
+def test_cancelar_en_cola_la_descarta_sin_lanzarla():
+    async def escenario():
+        planificador = _planificador()
+        bloqueo = planificador.encolar(_receta("bloqueo", 100))
+        cancelada = planificador.encolar(_receta("cancelada", 300))
+        siguiente = planificador.encolar(_receta("siguiente", 100))
+
+        assert planificador.en_cola == 2
+        assert planificador.cancelar(cancelada.id)
+        # Borrado perezoso: la profundidad baja ya, el heap se limpia al despachar
+        assert planificador.en_cola == 1
+        assert await cancelada.resultado == EstadoTrabajo.CANCELADO
+        assert planificador.trabajo(cancelada.id) is None
+        # Ni dos veces ni sobre un trabajo que ya cocina
+        assert not planificador.cancelar(cancelada.id)
+        assert not planificador.cancelar(bloqueo.id)
+
+        await planificador.esperar()
+        return cancelada, siguiente, planificador.get_metricas()
+
+    cancelada, siguiente, metricas = asyncio.run(escenario())
+    assert cancelada.inicio is None and cancelada.robot_id is None
+    assert siguiente.inicio == 100
+    assert metricas["completados"] == 2
+    assert metricas["cancelados"] == 1
+    assert metricas["en_cola"] == 0
+
+
+def test_plazos_cumplidos_e_incumplidos():
+    async def escenario():
+        planificador = _planificador()
+        planificador.encolar(_receta("bloqueo", 100))
+        a_tiempo = planificador.encolar(_receta("a tiempo", 100), plazo=200)
+        tarde = planificador.encolar(_receta("tarde", 100), plazo=250)
+        await planificador.esperar()
+        return a_tiempo, tarde, planificador.get_metricas()
+
+    a_tiempo, tarde, metricas = asyncio.run(escenario())
+    assert (a_tiempo.fin, a_tiempo.limite, a_tiempo.plazo_cumplido) == (200, 200, True)
+    assert (tarde.fin, tarde.limite, tarde.plazo_cumplido) == (300, 250, False)
+    assert metricas["plazos_cumplidos"] == 1
+    assert metricas["plazos_incumplidos"] == 1
+
+
+def test_metricas_de_espera_cola_y_utilizacion():
+    async def escenario():
+        reloj = RelojVirtual()
+        planificador = _planificador(robots=2, reloj=reloj)
+        planificador.encolar(_receta("r1", 100))
+        planificador.encolar(_receta("r2", 100))
+        tercera = planificador.encolar(_receta("r3", 100))
+        await planificador.esperar()
+        # Flota parada otros 100 s: baja la utilización y la cola media
+        await reloj.dormir(100)
+        return tercera, planificador.get_metricas()
+
+    tercera, metricas = asyncio.run(escenario())
+    assert tercera.espera == 100 and tercera.retorno == 200
+    assert metricas["completados"] == 3
+    assert metricas["espera_media"] == pytest.approx(100 / 3)
+    assert metricas["espera_max"] == 100
+    assert metricas["retorno_medio"] == pytest.approx(400 / 3)
+    assert metricas["cola_max"] == 1
+    # Un trabajo en cola durante 100 de 300 s
+    assert metricas["cola_media"] == pytest.approx(1 / 3)
+    # 300 s de cocina sobre 2 robots × 300 s
+    assert metricas["utilizacion"] == pytest.approx(0.5)
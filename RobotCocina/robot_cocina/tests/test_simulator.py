@@ -0,0 +1,192 @@
+"""
+Pruebas de CookingSimulator (pausa, parada, agrupado de ticks y
+deriva) sobre un RelojVirtual: ninguna espera tiempo real.
+"""
+
+import asyncio
+import threading
+
+import pytest
+
+from utils.clock import RelojVirtual
+from utils.simulator import CookingSimulator
+
+# 100 s de receta a velocidad 0.1: 10 s de reloj en 100 ticks de 0.1 s
+DURACION = 100
+VELOCIDAD = 0.1
+NOMINAL = 10.0
+TICKS = 100
+
+
+class RelojConLatencia(RelojVirtual):
+    """Reloj virtual en el que cada espera vence `latencia` s tarde (bucle saturado)."""
+
+    def __init__(self, latencia: float):
+        super().__init__()
+        self.latencia = latencia
+
+    async def dormir_hasta(self, instante, espera):
+        await super().dormir_hasta(instante + self.latencia, espera)
+
+
+def _simulador(reloj: RelojVirtual):
+    """Simulador y lista de (instante, progreso) de cada callback."""
+    simulador = CookingSimulator(VELOCIDAD, reloj=reloj)
+    progresos = []
+    return simulador, progresos, lambda actual, _total: progresos.append((reloj.ahora(), actual))
+
+
+def test_sin_retrasos_no_agrupa_ni_deriva():
+    async def escenario():
+        reloj = RelojVirtual()
+        simulador, progresos, callback = _simulador(reloj)
+        completada = await simulador.simular_tarea(DURACION, callback)
+        return reloj, simulador, progresos, completada
+
+    reloj, simulador, progresos, completada = asyncio.run(escenario())
+    assert completada
+    assert reloj.ahora() == pytest.approx(NOMINAL)
+    assert simulador.ticks_agrupados == 0
+    assert simulador.ultima_deriva == pytest.approx(0.0, abs=1e-9)
+    # Inicial + un callback por tick + el 100 % final
+    assert len(progresos) == TICKS + 2
+    assert progresos[1] == (pytest.approx(0.1), 1)
+
+
+def test_ticks_tardios_se_agrupan():
+    latencia = 0.35
+
+    async def escenario():
+        reloj = RelojConLatencia(latencia)
+        simulador, progresos, callback = _simulador(reloj)
+        completada = await simulador.simular_tarea(DURACION, callback)
+        return simulador, progresos, completada
+
+    simulador, progresos, completada = asyncio.run(escenario())
+    assert completada
+    entregados = len(progresos) - 2
+    assert simulador.ticks_agrupados > 0
+    # Cada tick se entrega o se agrupa, nunca se pierde ni se repite
+    assert entregados + simulador.ticks_agrupados == TICKS
+    # El primer tick despierta en 0.45 s: salta directamente al cuarto
+    assert progresos[1] == (pytest.approx(0.1 + latencia), 4)
+    valores = [p for _, p in progresos]
+    assert valores == sorted(valores) and valores[-1] == DURACION
+    # Los plazos son absolutos: la latencia no se acumula tick a tick
+    assert 0 < simulador.ultima_deriva <= latencia
+
+
+def test_pausa_no_emite_progreso_y_no_cuenta_como_deriva():
+    pausa = 30.0
+
+    async def escenario():
+        reloj = RelojVirtual()
+        simulador, progresos, registrar = _simulador(reloj)
+
+        def callback(actual, total):
+            registrar(actual, total)
+            if actual == DURACION // 2 and not simulador.esta_pausado:
+                simulador.pausar()
+
+        tarea = asyncio.create_task(simulador.simular_tarea(DURACION, callback))
+        while not simulador.esta_pausado:
+            await asyncio.sleep(0)
+        inicio_pausa = reloj.ahora()
+        emitidos = len(progresos)
+        # En pausa el simulador no participa: el reloj avanza sin él
+        await reloj.dormir(pausa)
+        assert len(progresos) == emitidos
+        simulador.reanudar()
+        completada = await tarea
+        return reloj, simulador, progresos, inicio_pausa, completada
+
+    reloj, simulador, progresos, inicio_pausa, completada = asyncio.run(escenario())
+    assert completada
+    assert inicio_pausa == pytest.approx(NOMINAL / 2)
+    assert reloj.ahora() == pytest.approx(NOMINAL + pausa)
+    assert not any(inicio_pausa < t < inicio_pausa + pausa for t, _ in progresos)
+    assert simulador.ultima_deriva == pytest.approx(0.0, abs=1e-9)
+    assert simulador.ticks_agrupados == 0
+
+
+def test_detener_desde_otro_hilo_despierta_la_espera_pendiente():
+    async def escenario():
+        reloj = RelojVirtual()
+        # Un participante que nunca espera: el reloj no puede avanzar y
+        # el primer tick del simulador queda pendiente
+        reloj.entrar()
+        simulador, progresos, callback = _simulador(reloj)
+        tarea = asyncio.create_task(simulador.simular_tarea(DURACION, callback))
+        while not reloj.pendientes:
+            await asyncio.sleep(0)
+        assert not tarea.done()
+
+        hilo = threading.Thread(target=simulador.detener)
+        hilo.start()
+        hilo.join()
+        completada = await asyncio.wait_for(tarea, timeout=1.0)
+        reloj.salir()
+        return reloj, simulador, progresos, completada
+
+    reloj, simulador, progresos, completada = asyncio.run(escenario())
+    assert completada is False
+    assert simulador.esta_detenido
+    # La espera se interrumpió, no venció: el tiempo no avanzó
+    assert reloj.ahora() == 0.0
+    assert progresos == [(0.0, 0)]
+
+
+def test_detener_desde_otro_hilo_durante_la_pausa():
+    async def escenario():
+        reloj = RelojVirtual()
+        simulador, progresos, registrar = _simulador(reloj)
+
+        def callback(actual, total):
+            registrar(actual, total)
+            if actual == 10 and not simulador.esta_pausado:
+                simulador.pausar()
+
+        tarea = asyncio.create_task(simulador.simular_tarea(DURACION, callback))
+        while not simulador.esta_pausado:
+            await asyncio.sleep(0)
+        hilo = threading.Thread(target=simulador.detener)
+        hilo.start()
+        hilo.join()
+        completada = await asyncio.wait_for(tarea, timeout=1.0)
+        return progresos, completada
+
+    progresos, completada = asyncio.run(escenario())
+    assert completada is False
+    assert progresos[-1][1] == 10
+
+
+def test_detener_un_participante_no_deja_avanzar_al_que_duerme():
+    async def escenario():
+        reloj = RelojVirtual()
+        # Este escenario es el segundo participante (como otro robot de la flota)
+        reloj.entrar()
+        simulador, _, callback = _simulador(reloj)
+        fin = {}
+
+        async def cocinar():
+            # En sesión el simulador sigue participando tras detenerse
+            with simulador.sesion():
+                fin['completada'] = await simulador.simular_tarea(DURACION, callback)
+                fin['instante'] = reloj.ahora()
+
+        tarea = asyncio.create_task(cocinar())
+        while not reloj.pendientes:
+            await asyncio.sleep(0)
+        simulador.detener()
+        # El simulador interrumpido vuelve a estar activo: esta espera no puede
+        # saltar el tiempo hasta que él termine y deje el reloj
+        await reloj.dormir_hasta(5.0, asyncio.get_running_loop().create_future())
+        despierta = reloj.ahora()
+        await tarea
+        reloj.salir()
+        return fin, despierta
+
+    fin, despierta = asyncio.run(escenario())
+    assert fin['completada'] is False
+    assert fin['instante'] == 0.0
+    assert despierta == 5.0
@@ -3,14 +3,17 @@ INTERFAZ PRINCIPAL DEL ROBOT DE COCINA - v11.0
 Paleta de colores optimizada y diálogo final funcional
 """
 
-from nicegui import ui
-from database.db_handler import DatabaseHandler
-from models.robot import Robot, EstadoRobot
+from nicegui import Client, ui
+from database.async_db_handler import AsyncDatabaseHandler
+from models.robot import Robot, EstadoRobot, ObservadorCallbacks
 from models.receta import Receta, Ingrediente
+from models.alergenos import ALERGENOS
+from models.nutricion import NUTRIENTES
 from utils.exceptions import TareaInvalidaError
 from models.controller import RobotController
 import asyncio
 import time
+from typing import Optional
 
 
 class MainInterface:
@@ -28,72 +31,21 @@ class MainInterface:
         'remover': '🥄', 'emulsionar': '🫗', 'montar': '🍦', 'incorporar': '➕', 'tamizar': '🕳️'
     }
     
-    # Sistema de alérgenos
-    ALERGENOS = {
-        'gluten': {'icono': '🌾', 'nombre': 'Gluten', 'color': '#d97706',
-                   'ingredientes': ['harina', 'pan', 'pasta', 'trigo', 'cebada', 'centeno', 'avena', 'sémola', 'cuscús']},
-        'lactosa': {'icono': '🥛', 'nombre': 'Lácteos', 'color': '#0ea5e9',
-                    'ingredientes': ['leche', 'nata', 'queso', 'mantequilla', 'yogur', 'crema', 'bechamel']},
-        'huevo': {'icono': '🥚', 'nombre': 'Huevo', 'color': '#eab308',
-                  'ingredientes': ['huevo', 'yema', 'clara', 'mayonesa']},
-        'frutos_secos': {'icono': '🥜', 'nombre': 'Frutos Secos', 'color': '#92400e',
-                         'ingredientes': ['almendra', 'nuez', 'avellana', 'pistacho', 'anacardo', 'cacahuete', 'piñon']},
-        'pescado': {'icono': '🐟', 'nombre': 'Pescado', 'color': '#0284c7',
-                    'ingredientes': ['merluza', 'salmon', 'bacalao', 'atun', 'anchoa', 'sardina', 'pescado']},
-        'marisco': {'icono': '🦐', 'nombre': 'Marisco', 'color': '#dc2626',
-                    'ingredientes': ['gamba', 'langostino', 'mejillon', 'almeja', 'calamar', 'pulpo', 'marisco']},
-        'soja': {'icono': '🫘', 'nombre': 'Soja', 'color': '#65a30d',
-                 'ingredientes': ['soja', 'tofu', 'edamame', 'salsa de soja']},
-        'apio': {'icono': '🥬', 'nombre': 'Apio', 'color': '#16a34a',
-                 'ingredientes': ['apio']},
-        'mostaza': {'icono': '🟡', 'nombre': 'Mostaza', 'color': '#ca8a04',
-                    'ingredientes': ['mostaza']},
-        'sesamo': {'icono': '⚪', 'nombre': 'Sésamo', 'color': '#a3a3a3',
-                   'ingredientes': ['sesamo', 'ajonjoli']},
-    }
+    # Sistema de alérgenos (la detección se guarda en el perfil de cada receta)
+    ALERGENOS = ALERGENOS
     
-    INFO_NUTRICIONAL = {
-        'tomate': {'calorias': 18, 'proteinas': 0.9, 'carbohidratos': 3.9, 'grasas': 0.2},
-        'cebolla': {'calorias': 40, 'proteinas': 1.1, 'carbohidratos': 9, 'grasas': 0.1},
-        'ajo': {'calorias': 149, 'proteinas': 6.4, 'carbohidratos': 33, 'grasas': 0.5},
-        'zanahoria': {'calorias': 41, 'proteinas': 0.9, 'carbohidratos': 10, 'grasas': 0.2},
-        'patata': {'calorias': 77, 'proteinas': 2, 'carbohidratos': 17, 'grasas': 0.1},
-        'calabacín': {'calorias': 17, 'proteinas': 1.2, 'carbohidratos': 3.1, 'grasas': 0.3},
-        'calabaza': {'calorias': 26, 'proteinas': 1, 'carbohidratos': 6.5, 'grasas': 0.1},
-        'pimiento': {'calorias': 20, 'proteinas': 0.9, 'carbohidratos': 4.6, 'grasas': 0.2},
-        'pepino': {'calorias': 16, 'proteinas': 0.7, 'carbohidratos': 3.6, 'grasas': 0.1},
-        'berenjena': {'calorias': 25, 'proteinas': 1, 'carbohidratos': 6, 'grasas': 0.2},
-        'puerro': {'calorias': 61, 'proteinas': 1.5, 'carbohidratos': 14, 'grasas': 0.3},
-        'champiñon': {'calorias': 22, 'proteinas': 3.1, 'carbohidratos': 3.3, 'grasas': 0.3},
-        'espinaca': {'calorias': 23, 'proteinas': 2.9, 'carbohidratos': 3.6, 'grasas': 0.4},
-        'brocoli': {'calorias': 34, 'proteinas': 2.8, 'carbohidratos': 7, 'grasas': 0.4},
-        'coliflor': {'calorias': 25, 'proteinas': 1.9, 'carbohidratos': 5, 'grasas': 0.3},
-        'judias': {'calorias': 31, 'proteinas': 1.8, 'carbohidratos': 7, 'grasas': 0.1},
-        'manzana': {'calorias': 52, 'proteinas': 0.3, 'carbohidratos': 14, 'grasas': 0.2},
-        'limon': {'calorias': 29, 'proteinas': 1.1, 'carbohidratos': 9, 'grasas': 0.3},
-        'pollo': {'calorias': 239, 'proteinas': 27, 'carbohidratos': 0, 'grasas': 14},
-        'ternera': {'calorias': 250, 'proteinas': 26, 'carbohidratos': 0, 'grasas': 15},
-        'cerdo': {'calorias': 242, 'proteinas': 27, 'carbohidratos': 0, 'grasas': 14},
-        'carne': {'calorias': 250, 'proteinas': 26, 'carbohidratos': 0, 'grasas': 15},
-        'merluza': {'calorias': 89, 'proteinas': 17, 'carbohidratos': 0, 'grasas': 2},
-        'salmon': {'calorias': 208, 'proteinas': 20, 'carbohidratos': 0, 'grasas': 13},
-        'pescado': {'calorias': 100, 'proteinas': 18, 'carbohidratos': 0, 'grasas': 3},
-        'leche': {'calorias': 42, 'proteinas': 3.4, 'carbohidratos': 5, 'grasas': 1},
-        'nata': {'calorias': 340, 'proteinas': 2, 'carbohidratos': 3, 'grasas': 35},
-        'mantequilla': {'calorias': 717, 'proteinas': 0.9, 'carbohidratos': 0.1, 'grasas': 81},
-        'queso': {'calorias': 402, 'proteinas': 25, 'carbohidratos': 1.3, 'grasas': 33},
-        'huevo': {'calorias': 155, 'proteinas': 13, 'carbohidratos': 1.1, 'grasas': 11},
-        'arroz': {'calorias': 130, 'proteinas': 2.7, 'carbohidratos': 28, 'grasas': 0.3},
-        'pasta': {'calorias': 131, 'proteinas': 5, 'carbohidratos': 25, 'grasas': 1.1},
-        'pan': {'calorias': 265, 'proteinas': 9, 'carbohidratos': 49, 'grasas': 3.2},
-        'harina': {'calorias': 364, 'proteinas': 10, 'carbohidratos': 76, 'grasas': 1},
-        'aceite': {'calorias': 884, 'proteinas': 0, 'carbohidratos': 0, 'grasas': 100},
-        'azucar': {'calorias': 387, 'proteinas': 0, 'carbohidratos': 100, 'grasas': 0},
-        'caldo': {'calorias': 10, 'proteinas': 1, 'carbohidratos': 1, 'grasas': 0.2},
-        'vino': {'calorias': 85, 'proteinas': 0.1, 'carbohidratos': 2.6, 'grasas': 0},
-        'agua': {'calorias': 0, 'proteinas': 0, 'carbohidratos': 0, 'grasas': 0},
+    # Rangos del filtro de tiempo: (mínimo, máximo) en segundos, inclusive
+    RANGOS_TIEMPO = {
+        'Todos': (None, None),
+        '< 15 min': (None, 899),
+        '15-30 min': (900, 1800),
+        '> 30 min': (1801, None),
     }
     
+    RECETAS_POR_PAGINA = 24
+    
+    INTERVALO_NOTIFICACIONES = 0.1  # segundos entre actualizaciones del robot
+    
     CATEGORIAS = {
         'Todas': None, '⭐ Favoritas': 'favoritas',
         '🥣 Sopas y Cremas': ['Gazpacho', 'Sopa', 'Crema', 'Vichyssoise'],
@@ -105,9 +57,12 @@ class MainInterface:
         '🍮 Postres': ['Natillas', 'Compota'],
     }
 
-    def __init__(self, db: DatabaseHandler):
+    def __init__(self, db: AsyncDatabaseHandler, robot: Optional[Robot] = None):
+        # Todas las llamadas a la BD se hacen con await: se ejecutan fuera
+        # del bucle de eventos y no frenan los ticks del simulador
         self.db = db
-        self.robot = Robot()
+        # El robot puede venir de una RobotFleet (uno por unidad de cocina)
+        self.robot = robot if robot is not None else Robot()
         self.controller = RobotController(self.robot)
         self._ejecutando = False
         self._velocidad_simulacion = 0.01
@@ -117,48 +72,35 @@ class MainInterface:
         self._modo_oscuro = False
         self._ultima_receta = None
         self._receta_completada_id = None
-        self.robot.registrar_callback_estado(self._on_estado_changed)
-        self.robot.registrar_callback_progreso(self._on_progreso_changed)
-        self.robot.registrar_callback_evento(self._on_evento)
+        # Panel de ejecución diferencial: qué hay construido ahora mismo
+        self._paso_mostrado = None
+        self._lista_de = None
+        self._filas_pasos = []
+        self._receta_mostrada = None
+        # Entrega asíncrona y limitada: los ticks del simulador no esperan
+        # a la interfaz y cada navegador recibe como mucho
+        # 1 / INTERVALO_NOTIFICACIONES actualizaciones de progreso por segundo
+        self._suscribir()
 
-    def _calcular_nutricion(self, ingredientes, porciones_base, porciones_calc):
-        factor = porciones_calc / porciones_base
-        total = {'calorias': 0, 'proteinas': 0, 'carbohidratos': 0, 'grasas': 0}
-        for ing in ingredientes:
-            nombre_lower = ing.nombre.lower()
-            for key, value in self.INFO_NUTRICIONAL.items():
-                if key in nombre_lower:
-                    cantidad_g = ing.cantidad
-                    if ing.unidad == 'kg': cantidad_g *= 1000
-                    elif ing.unidad in ('ml', 'l'): cantidad_g = ing.cantidad * (1000 if ing.unidad == 'l' else 1)
-                    elif ing.unidad == 'unidad': cantidad_g = 100
-                    elif ing.unidad in ('cucharada', 'cda'): cantidad_g = 15
-                    elif ing.unidad == 'pizca': cantidad_g = 1
-                    for k in total: total[k] += (value[k] / 100) * cantidad_g * factor
-                    break
-        for k in total: total[k] = round(total[k] / porciones_calc, 1)
-        return total
+    def _suscribir(self):
+        self._suscripcion = self.robot.suscribir(
+            ObservadorCallbacks(self._on_estado_changed, self._on_progreso_changed, self._on_evento),
+            intervalo=self.INTERVALO_NOTIFICACIONES,
+        )
 
-    def _detectar_alergenos(self, ingredientes):
-        """Detecta alérgenos presentes en una lista de ingredientes"""
-        alergenos_detectados = []
-        for ing in ingredientes:
-            nombre_lower = ing.nombre.lower()
-            for alergeno_key, alergeno_info in self.ALERGENOS.items():
-                if alergeno_key not in [a['key'] for a in alergenos_detectados]:
-                    for ingrediente_alergeno in alergeno_info['ingredientes']:
-                        if ingrediente_alergeno in nombre_lower:
-                            alergenos_detectados.append({
-                                'key': alergeno_key,
-                                'icono': alergeno_info['icono'],
-                                'nombre': alergeno_info['nombre'],
-                                'color': alergeno_info['color'],
-                                'encontrado_en': ing.nombre
-                            })
-                            break
-        return alergenos_detectados
+    def cerrar(self):
+        """Deja de recibir notificaciones del robot (el navegador se ha ido)."""
+        self._suscripcion.cancelar()
 
-    def create_ui(self):
+    def _reconectar(self):
+        """El navegador ha vuelto tras un corte: se suscribe de nuevo y se pone al día."""
+        if self._suscripcion.activa:
+            return
+        self._suscribir()
+        self._sincronizar_receta()
+        self._on_estado_changed(self.robot.estado)
+
+    def create_ui(self, client: Client):
         # CSS con paleta de colores optimizada
         ui.add_head_html('''<style>
             :root {
@@ -303,7 +245,14 @@ class MainInterface:
                     with ui.tab_panel('crear'):
                         self._crear_formulario_receta()
         
-        self._actualizar_botones()
+        # Cada navegador tiene su interfaz: al desconectarse deja de
+        # suscribirse y, si vuelve antes de que NiceGUI borre el cliente,
+        # se suscribe otra vez
+        client.on_disconnect(self.cerrar)
+        client.on_connect(self._reconectar)
+        # El robot es compartido: la página nueva muestra lo que ya esté haciendo
+        self._sincronizar_receta()
+        self._on_estado_changed(self.robot.estado)
 
     def _toggle_modo_oscuro(self):
         self._modo_oscuro = not self._modo_oscuro
@@ -346,14 +295,44 @@ class MainInterface:
                 ui.label('Selecciona una receta').classes('text-secondary').style('font-size: 0.85rem;')
 
     def _actualizar_lista_pasos(self):
-        self.lista_pasos_container.clear()
-        if not self.robot.receta_actual:
-            with self.lista_pasos_container:
-                ui.label('Selecciona una receta').classes('text-secondary').style('font-size: 0.85rem;')
+        """
+        Construye la lista una vez por plan y después solo cambia el
+        indicador y la clase de los pasos cuyo estado ha cambiado.
+        """
+        plan = self.robot.plan
+        if plan is None or not self.robot.receta_actual:
+            if self._lista_de is not None:
+                self._lista_de = None
+                self._filas_pasos = []
+                self.lista_pasos_container.clear()
+                with self.lista_pasos_container:
+                    ui.label('Selecciona una receta').classes('text-secondary').style('font-size: 0.85rem;')
             return
+        
         pasos = self.robot.receta_actual.pasos
         pa = self.robot.paso_actual
         estado = self.robot.estado
+        if self._lista_de is not plan:
+            self._construir_lista_pasos(plan, pasos, pa, estado)
+            return
+        
+        for i, fila in enumerate(self._filas_pasos):
+            clase, indicador = self._estado_paso(i, pa, estado)
+            if (clase, indicador) == fila[2:]:
+                continue
+            card, badge, clase_anterior, _ = fila
+            if clase_anterior:
+                card.classes(remove=clase_anterior)
+            if clase:
+                card.classes(clase)
+            badge.set_text(indicador)
+            badge.props('color=white' if clase == 'paso-actual' else 'color=grey')
+            self._filas_pasos[i] = (card, badge, clase, indicador)
+
+    def _construir_lista_pasos(self, plan, pasos, pa, estado):
+        self._lista_de = plan
+        self._filas_pasos = []
+        self.lista_pasos_container.clear()
         with self.lista_pasos_container:
             for i, paso in enumerate(pasos):
                 op = paso.get('operacion', paso.get('nombre', 'Paso'))
@@ -361,24 +340,27 @@ class MainInterface:
                 duracion = paso.get('duracion', 0)
                 m, s = divmod(duracion, 60)
                 tiempo_str = f'{m}:{s:02d}' if m else f'{s}s'
+                clase, indicador = self._estado_paso(i, pa, estado)
                 
-                if estado in (EstadoRobot.EJECUTANDO, EstadoRobot.PAUSADO):
-                    if i < pa:
-                        clase, indicador = 'paso-completado', '✓'
-                    elif i == pa:
-                        clase, indicador = 'paso-actual', '▶' if estado == EstadoRobot.EJECUTANDO else '❚❚'
-                    else:
-                        clase, indicador = '', str(i + 1)
-                elif estado == EstadoRobot.FINALIZADO:
-                    clase, indicador = 'paso-completado', '✓'
-                else:
-                    clase, indicador = '', str(i + 1)
-                
-                with ui.card().classes(f'w-full p-2 card-custom {clase}'):
+                with ui.card().classes(f'w-full p-2 card-custom {clase}') as card:
                     with ui.row().classes('items-center gap-2 w-full'):
-                        ui.badge(indicador).props('color=grey' if clase != 'paso-actual' else 'color=white')
+                        badge = ui.badge(indicador).props('color=grey' if clase != 'paso-actual' else 'color=white')
                         ui.label(f'{icono} {op.title()}').classes('text-primary').style('flex: 1; font-size: 0.85rem;')
                         ui.label(tiempo_str).classes('text-secondary').style('font-size: 0.75rem;')
+                self._filas_pasos.append((card, badge, clase, indicador))
+
+    @staticmethod
+    def _estado_paso(i, pa, estado):
+        """(clase CSS, indicador) de un paso de la lista."""
+        if estado in (EstadoRobot.EJECUTANDO, EstadoRobot.PAUSADO):
+            if i < pa:
+                return 'paso-completado', '✓'
+            if i == pa:
+                return 'paso-actual', '▶' if estado == EstadoRobot.EJECUTANDO else '❚❚'
+            return '', str(i + 1)
+        if estado == EstadoRobot.FINALIZADO:
+            return 'paso-completado', '✓'
+        return '', str(i + 1)
 
     def _crear_panel_ejecucion(self):
         with ui.card().classes('w-full p-4 card-custom'):
@@ -386,6 +368,7 @@ class MainInterface:
             self.paso_container = ui.column().classes('w-full')
             with self.paso_container:
                 self._mostrar_esperando()
+            self._paso_mostrado = 'esperando'
         
         with ui.card().classes('w-full p-4 card-custom'):
             ui.label('Progreso General').classes('text-primary').style('font-weight: 600; margin-bottom: 12px;')
@@ -441,48 +424,75 @@ class MainInterface:
                 self.search_input.on('keyup', self._filtrar_recetas)
                 self.filtro_categoria = ui.select(list(self.CATEGORIAS.keys()), value='Todas', label='Categoría', on_change=self._filtrar_recetas).props('outlined dense').style('width: 150px;')
                 self.filtro_dificultad = ui.select(['Todas', 'Fácil', 'Media', 'Difícil'], value='Todas', label='Dificultad', on_change=self._filtrar_recetas).props('outlined dense').style('width: 120px;')
-                self.filtro_tiempo = ui.select(['Todos', '< 15 min', '15-30 min', '> 30 min'], value='Todos', label='Tiempo', on_change=self._filtrar_recetas).props('outlined dense').style('width: 120px;')
+                self.filtro_tiempo = ui.select(list(self.RANGOS_TIEMPO.keys()), value='Todos', label='Tiempo', on_change=self._filtrar_recetas).props('outlined dense').style('width: 120px;')
+                self.filtro_alergenos = ui.select({k: f'{a["icono"]} {a["nombre"]}' for k, a in self.ALERGENOS.items()}, value=[], multiple=True, label='Sin alérgenos', on_change=self._filtrar_recetas).props('outlined dense use-chips').style('min-width: 160px;')
             self.recipe_grid = ui.row().classes('w-full gap-3').style('flex-wrap: wrap;')
-            self._cargar_recetas()
+            with ui.row().classes('w-full justify-center'):
+                self.btn_mas_recetas = ui.button('Cargar más', icon='expand_more', on_click=self._cargar_pagina_recetas).props('flat no-caps')
+            # Los diálogos de detalle se anclan aquí y no a la tarjeta que los
+            # abrió, para que sobrevivan a las recargas de la cuadrícula
+            self._contenedor_dialogos = ui.element('div')
+            self._generacion_explorador = 0
+            # Primera carga en cuanto el cliente está conectado
+            ui.timer(0, self._cargar_recetas, once=True)
 
-    def _cargar_recetas(self):
-        self.recipe_grid.clear()
-        self._favoritos_ids = self.db.get_favorite_ids()
-        with self.recipe_grid:
-            for r in self.db.get_all_recipes():
-                self._crear_card_receta(r)
+    async def _cargar_recetas(self):
+        """Recarga el explorador desde la primera página con los filtros actuales."""
+        await self._filtrar_recetas()
 
-    def _filtrar_recetas(self, e=None):
-        self.recipe_grid.clear()
-        self._favoritos_ids = self.db.get_favorite_ids()
+    async def _cargar_flags(self, recetas):
+        """Notas y favoritos de todas las tarjetas de la página en una sola consulta."""
+        flags = await self.db.get_recipe_flags([r.id for r in recetas])
+        self._flags_recetas.update(flags)
+        self._favoritos_ids.update(rid for rid, f in flags.items() if f['favorita'])
+
+    def _filtros_explorador(self):
+        """Filtros seleccionados en el explorador, con las claves de query_recipes()."""
         cat = self.filtro_categoria.value
-        if cat == '⭐ Favoritas':
-            recetas = self.db.get_favorites()
-        else:
-            recetas = self.db.get_all_recipes()
-            if cat != 'Todas':
-                kw = self.CATEGORIAS.get(cat, [])
-                if kw:
-                    recetas = [r for r in recetas if any(k.lower() in r.nombre.lower() for k in kw)]
-        busq = (self.search_input.value or '').lower()
-        if busq:
-            recetas = [r for r in recetas if busq in r.nombre.lower() or busq in r.descripcion.lower()]
         dif = self.filtro_dificultad.value
-        if dif != 'Todas':
-            recetas = [r for r in recetas if r.dificultad == dif]
-        tiempo = self.filtro_tiempo.value
-        if tiempo == '< 15 min':
-            recetas = [r for r in recetas if r.tiempo_total < 900]
-        elif tiempo == '15-30 min':
-            recetas = [r for r in recetas if 900 <= r.tiempo_total <= 1800]
-        elif tiempo == '> 30 min':
-            recetas = [r for r in recetas if r.tiempo_total > 1800]
+        tiempo_min, tiempo_max = self.RANGOS_TIEMPO.get(self.filtro_tiempo.value, (None, None))
+        return {
+            'categoria': self.CATEGORIAS.get(cat) if cat not in ('Todas', '⭐ Favoritas') else None,
+            'favoritos': cat == '⭐ Favoritas',
+            'dificultad': dif if dif != 'Todas' else None,
+            'tiempo_min': tiempo_min,
+            'tiempo_max': tiempo_max,
+            'excluir_alergenos': list(self.filtro_alergenos.value or []) or None,
+        }
+
+    async def _filtrar_recetas(self, e=None):
+        self.recipe_grid.clear()
+        self._recetas_mostradas = 0
+        self._flags_recetas = {}
+        self._favoritos_ids = set()
+        # Invalida las cargas en curso lanzadas con los filtros anteriores
+        self._generacion_explorador += 1
+        await self._cargar_pagina_recetas()
+
+    async def _cargar_pagina_recetas(self):
+        """Añade la siguiente página de resultados (filtrada y paginada en SQL)."""
+        generacion = self._generacion_explorador
+        filtros = self._filtros_explorador()
+        busq = (self.search_input.value or '').strip()
+        offset = self._recetas_mostradas
+        # Se pide una receta de más para saber si quedan páginas
+        limite = self.RECETAS_POR_PAGINA + 1
+        if busq:
+            recetas = await self.db.search_recipes(busq, filtros, limit=limite, offset=offset, resumen=True)
+        else:
+            recetas = await self.db.query_recipes(**filtros, limit=limite, offset=offset, resumen=True)
+        hay_mas = len(recetas) > self.RECETAS_POR_PAGINA
+        recetas = recetas[:self.RECETAS_POR_PAGINA]
+        await self._cargar_flags(recetas)
+        if generacion != self._generacion_explorador:
+            return  # Los filtros cambiaron mientras se consultaba
         with self.recipe_grid:
-            if not recetas:
+            if not recetas and offset == 0:
                 ui.label('No se encontraron recetas').classes('text-secondary')
-            else:
-                for r in recetas:
-                    self._crear_card_receta(r)
+            for r in recetas:
+                self._crear_card_receta(r)
+        self._recetas_mostradas += len(recetas)
+        self.btn_mas_recetas.set_visibility(hay_mas)
 
     def _crear_card_receta(self, receta):
         colores = {'Fácil': '#10b981', 'Media': '#f59e0b', 'Difícil': '#ef4444'}
@@ -497,14 +507,15 @@ class MainInterface:
         elif any(x in n for x in ['puré', 'verduras', 'pisto']): icono = '🥗'
         else: icono = '🍽️'
         
-        es_fav = receta.id in self._favoritos_ids
-        notas = self.db.get_notes(receta.id)
+        flags = self._flags_recetas.get(receta.id, {})
+        es_fav = flags.get('favorita', False)
+        tiene_notas = flags.get('notas', 0) > 0
         
-        with ui.card().classes('p-3 recipe-card').style(f'width: 250px; border-left: 3px solid {color} !important;').on('click', lambda r=receta: self._mostrar_detalle_receta(r)):
+        with ui.card().classes('p-3 recipe-card').style(f'width: 250px; border-left: 3px solid {color} !important;').on('click', lambda r=receta: self._abrir_receta(r.id)):
             with ui.row().classes('w-full items-center gap-2 mb-2'):
                 ui.label(icono).style('font-size: 1.2rem;')
                 ui.label(receta.nombre).classes('text-primary').style('font-weight: 600; flex: 1; font-size: 0.9rem;')
-                if len(notas) > 0:
+                if tiene_notas:
                     ui.icon('note', size='14px').style('color: var(--text-secondary);')
                 if es_fav:
                     ui.icon('star', size='14px').style('color: #f59e0b;')
@@ -514,12 +525,23 @@ class MainInterface:
                 ui.label(f'{receta.tiempo_str} · {receta.num_pasos} pasos').classes('text-secondary').style('font-size: 0.75rem;')
                 ui.badge(receta.dificultad).style(f'background: {color}; color: white; font-size: 0.65rem;')
 
-    def _mostrar_detalle_receta(self, receta):
-        es_fav = self.db.is_favorite(receta.id)
-        notas = self.db.get_notes(receta.id)
-        alergenos = self._detectar_alergenos(receta.ingredientes)
+    async def _abrir_receta(self, recipe_id):
+        """Carga la receta completa (la tarjeta solo tiene el resumen) y la muestra."""
+        receta = await self.db.get_recipe_by_id(recipe_id)
+        if receta:
+            await self._mostrar_detalle_receta(receta)
+        else:
+            ui.notify('La receta ya no existe', type='warning')
+
+    async def _mostrar_detalle_receta(self, receta):
+        # Nutrición y alérgenos ya calculados: se leen del perfil guardado
+        es_fav, notas, perfil = await asyncio.gather(
+            self.db.is_favorite(receta.id), self.db.get_notes(receta.id),
+            self.db.get_recipe_profile(receta.id)
+        )
+        alergenos = [self.ALERGENOS[clave] for clave in perfil.claves_alergenos] if perfil else []
         
-        with ui.dialog() as dialog, ui.card().classes('p-0').style('width: 600px; max-width: 95vw; max-height: 90vh; overflow-y: auto;'):
+        with self._contenedor_dialogos, ui.dialog() as dialog, ui.card().classes('p-0').style('width: 600px; max-width: 95vw; max-height: 90vh; overflow-y: auto;'):
             # Header
             with ui.row().classes('w-full items-center justify-between p-4').style('background: linear-gradient(135deg, #1e3a5f, #0d1b2a);'):
                 with ui.column().classes('gap-0'):
@@ -544,6 +566,11 @@ class MainInterface:
                                     ui.label(a['nombre']).style(f'font-size: 0.75rem; color: {a["color"]}; font-weight: 500;')
                 
                 # Notas existentes
+                async def borrar_nota(nota):
+                    await self.db.delete_note(nota['id'])
+                    dialog.close()
+                    await self._abrir_receta(receta.id)
+                
                 if notas:
                     with ui.card().classes('w-full p-3 card-custom'):
                         ui.label(f'📝 Notas ({len(notas)})').classes('text-primary').style('font-weight: 600; font-size: 0.85rem; margin-bottom: 8px;')
@@ -553,7 +580,7 @@ class MainInterface:
                                     ui.label(nota['nota']).classes('text-primary').style('font-size: 0.85rem;')
                                     fecha = nota['fecha'][:10] if nota.get('fecha') else ''
                                     ui.label(fecha).classes('text-secondary').style('font-size: 0.7rem;')
-                                ui.button(icon='delete', on_click=lambda n=nota: (self.db.delete_note(n['id']), dialog.close(), self._mostrar_detalle_receta(self.db.get_recipe_by_id(receta.id)))).props('flat round size=xs color=negative')
+                                ui.button(icon='delete', on_click=lambda n=nota: borrar_nota(n)).props('flat round size=xs color=negative')
                 
                 # Porciones
                 with ui.card().classes('w-full p-3 card-custom'):
@@ -585,9 +612,8 @@ class MainInterface:
                     def toggle_nutricion():
                         nutricion_visible[0] = not nutricion_visible[0]
                         nutricion_container.clear()
-                        if nutricion_visible[0]:
-                            porc = int(porciones_input.value or receta.porciones)
-                            info = self._calcular_nutricion(receta.ingredientes, receta.porciones, porc)
+                        if nutricion_visible[0] and perfil:
+                            info = perfil.nutricion  # por porción: no depende de las porciones
                             with nutricion_container:
                                 with ui.row().classes('w-full gap-4 p-3').style('background: var(--bg-card-alt); border-radius: 4px;'):
                                     for val, label, color in [(info["calorias"], 'kcal', '#ef4444'), (f'{info["proteinas"]}g', 'prot', '#3b82f6'), (f'{info["carbohidratos"]}g', 'carbs', '#f59e0b'), (f'{info["grasas"]}g', 'grasas', '#8b5cf6')]:
@@ -625,20 +651,24 @@ class MainInterface:
                     ui.label('📝 Añadir Nota').classes('text-primary').style('font-weight: 600; font-size: 0.85rem; margin-bottom: 8px;')
                     nueva_nota = ui.input(placeholder='Escribe una nota...').props('outlined dense').classes('w-full')
                     
-                    def guardar_nota():
+                    async def guardar_nota():
                         if nueva_nota.value and nueva_nota.value.strip():
-                            self.db.add_note(receta.id, nueva_nota.value.strip())
+                            await self.db.add_note(receta.id, nueva_nota.value.strip())
                             ui.notify('Nota guardada', type='positive')
                             dialog.close()
-                            self._mostrar_detalle_receta(self.db.get_recipe_by_id(receta.id))
-                            self._cargar_recetas()
+                            await self._abrir_receta(receta.id)
+                            await self._cargar_recetas()
                     
                     ui.button('Guardar Nota', icon='save', on_click=guardar_nota).props('flat dense no-caps color=primary').classes('mt-2')
                 
                 # Acciones
+                async def alternar_favorito():
+                    dialog.close()
+                    await self._toggle_favorito(receta)
+                
                 with ui.row().classes('w-full justify-between mt-2'):
                     with ui.row().classes('gap-1'):
-                        ui.button(icon='star' if es_fav else 'star_border', on_click=lambda: (self._toggle_favorito(receta), dialog.close())).props('flat round')
+                        ui.button(icon='star' if es_fav else 'star_border', on_click=alternar_favorito).props('flat round')
                         if receta.es_fabrica:
                             ui.button(icon='content_copy', on_click=lambda: self._duplicar_receta(receta, dialog)).props('flat round')
                         if not receta.es_fabrica:
@@ -655,14 +685,14 @@ class MainInterface:
                         ui.button('Preparar', icon='play_arrow', on_click=preparar).props('color=positive no-caps')
         dialog.open()
 
-    def _toggle_favorito(self, receta):
+    async def _toggle_favorito(self, receta):
         if receta.id in self._favoritos_ids:
-            self.db.remove_favorite(receta.id)
+            await self.db.remove_favorite(receta.id)
             ui.notify('Quitada de favoritos', type='info')
         else:
-            self.db.add_favorite(receta.id)
+            await self.db.add_favorite(receta.id)
             ui.notify('Añadida a favoritos', type='positive')
-        self._cargar_recetas()
+        await self._cargar_recetas()
 
     def _duplicar_receta(self, receta, parent):
         with ui.dialog() as d, ui.card().classes('p-4 card-custom'):
@@ -670,12 +700,12 @@ class MainInterface:
             nombre_input = ui.input(label='Nombre', value=f'{receta.nombre} (copia)').props('outlined dense').classes('w-full mt-2')
             with ui.row().classes('justify-end gap-2 mt-3'):
                 ui.button('Cancelar', on_click=d.close).props('flat no-caps')
-                def dup():
-                    self.db.duplicate_recipe(receta.id, nombre_input.value)
+                async def dup():
+                    await self.db.duplicate_recipe(receta.id, nombre_input.value)
                     ui.notify('Receta duplicada', type='positive')
                     d.close()
                     parent.close()
-                    self._cargar_recetas()
+                    await self._cargar_recetas()
                 ui.button('Duplicar', on_click=dup).props('color=primary no-caps')
         d.open()
 
@@ -685,12 +715,12 @@ class MainInterface:
             ui.label('Esta acción no se puede deshacer.').classes('text-secondary').style('font-size: 0.85rem;')
             with ui.row().classes('justify-end gap-2 mt-3'):
                 ui.button('Cancelar', on_click=d.close).props('flat no-caps')
-                def si():
-                    self.db.delete_user_recipe(receta.id)
+                async def si():
+                    await self.db.delete_user_recipe(receta.id)
                     ui.notify('Receta eliminada', type='warning')
                     d.close()
                     parent.close()
-                    self._cargar_recetas()
+                    await self._cargar_recetas()
                 ui.button('Eliminar', on_click=si).props('color=negative no-caps')
         d.open()
 
@@ -746,7 +776,7 @@ class MainInterface:
             with ui.row().classes('w-full justify-end gap-2 mt-4'):
                 ui.button('Cancelar', on_click=dialog.close).props('flat no-caps')
                 
-                def guardar():
+                async def guardar():
                     ings = [Ingrediente(r.nombre.value, float(r.cantidad.value or 0), r.unidad.value) for r in edit_ings.default_slot.children if hasattr(r, 'nombre') and r.nombre.value]
                     pasos, tiempo = [], 0
                     for c in edit_pasos.default_slot.children:
@@ -759,25 +789,31 @@ class MainInterface:
                     if not edit_nombre.value or not ings or not pasos:
                         ui.notify('Completa todos los campos', type='negative')
                         return
-                    receta.nombre = edit_nombre.value
-                    receta.descripcion = edit_desc.value
-                    receta.porciones = int(edit_porc.value or 4)
-                    receta.dificultad = edit_dif.value
-                    receta.ingredientes = ings
-                    receta.pasos = pasos
-                    receta.tiempo_total = tiempo
-                    self.db.update_recipe(receta)
+                    # Receta nueva: la recibida está en la caché compartida por
+                    # todos los navegadores y no se toca hasta que se guarde
+                    editada = Receta(
+                        id=receta.id,
+                        nombre=edit_nombre.value,
+                        descripcion=edit_desc.value,
+                        ingredientes=ings,
+                        pasos=pasos,
+                        tiempo_total=tiempo,
+                        porciones=int(edit_porc.value or 4),
+                        dificultad=edit_dif.value,
+                        es_fabrica=receta.es_fabrica,
+                    )
+                    await self.db.update_recipe(editada)
                     ui.notify('Receta actualizada', type='positive')
                     dialog.close()
-                    self._cargar_recetas()
+                    await self._cargar_recetas()
                 
                 ui.button('Guardar', icon='save', on_click=guardar).props('color=primary no-caps')
         dialog.open()
 
     # ==================== HISTORIAL Y ESTADÍSTICAS ====================
     
-    def _mostrar_historial(self):
-        historial = self.db.get_history(limit=30)
+    async def _mostrar_historial(self):
+        historial = await self.db.get_history(limit=30)
         with ui.dialog() as dialog, ui.card().classes('p-4 card-custom').style('width: 450px; max-width: 95vw;'):
             with ui.row().classes('w-full items-center justify-between mb-4'):
                 ui.label('Historial de Recetas').classes('text-primary').style('font-size: 1.1rem; font-weight: 600;')
@@ -795,13 +831,18 @@ class MainInterface:
                                 ui.label(h['receta_nombre']).classes('text-primary').style('font-weight: 500; font-size: 0.9rem;')
                                 fecha = h['fecha_inicio'][:16].replace('T', ' ') if h['fecha_inicio'] else ''
                                 ui.label(fecha).classes('text-secondary').style('font-size: 0.7rem;')
+            async def limpiar():
+                await self.db.clear_history()
+                ui.notify('Historial limpiado')
+                dialog.close()
+            
             with ui.row().classes('w-full justify-between mt-4'):
-                ui.button('Limpiar', icon='delete', on_click=lambda: (self.db.clear_history(), ui.notify('Historial limpiado'), dialog.close())).props('flat no-caps color=negative')
+                ui.button('Limpiar', icon='delete', on_click=limpiar).props('flat no-caps color=negative')
                 ui.button('Cerrar', on_click=dialog.close).props('flat no-caps')
         dialog.open()
 
-    def _mostrar_estadisticas(self):
-        stats = self.db.get_stats()
+    async def _mostrar_estadisticas(self):
+        stats = await self.db.get_stats()
         with ui.dialog() as dialog, ui.card().classes('p-4 card-custom').style('width: 400px;'):
             ui.label('Estadísticas').classes('text-primary').style('font-size: 1.1rem; font-weight: 600; margin-bottom: 16px;')
             with ui.row().classes('w-full gap-3'):
@@ -906,7 +947,7 @@ class MainInterface:
             self._add_ingrediente()
         self._add_paso()
 
-    def _guardar_receta(self):
+    async def _guardar_receta(self):
         nombre = (self.new_nombre.value or '').strip()
         if not nombre:
             ui.notify('Nombre requerido', type='negative')
@@ -927,10 +968,10 @@ class MainInterface:
             ui.notify('Añade pasos', type='negative')
             return
         receta = Receta(nombre=nombre, descripcion=self.new_descripcion.value or nombre, ingredientes=ings, pasos=pasos, tiempo_total=tiempo, porciones=int(self.new_porciones.value or 4), dificultad=self.new_dificultad.value)
-        self.db.add_recipe(receta)
+        await self.db.add_recipe(receta)
         ui.notify(f'Receta "{nombre}" guardada', type='positive')
         self._limpiar_formulario()
-        self._cargar_recetas()
+        await self._cargar_recetas()
     # ==================== EJECUCIÓN ====================
     
     def _preparar_receta(self, receta):
@@ -938,18 +979,34 @@ class MainInterface:
             self._ultima_receta = receta
             self._receta_completada_id = receta.id
             self.robot.preparar_receta(receta)
-            nombre_corto = receta.nombre[:18] + '...' if len(receta.nombre) > 18 else receta.nombre
-            self.dash_receta.set_text(nombre_corto)
-            m, s = divmod(receta.tiempo_total, 60)
-            self.dash_tiempo.set_text(f'{m:02d}:{s:02d}')
-            self._mostrar_receta_activa(receta)
-            self._actualizar_lista_pasos()
-            self._reset_displays()
+            self._sincronizar_receta()
             ui.notify(f'Receta preparada: {receta.nombre}', type='positive')
             self._actualizar_botones()
         except Exception as e:
             ui.notify(str(e), type='negative')
 
+    def _sincronizar_receta(self):
+        """
+        Muestra la receta cargada en el robot, la haya preparado este
+        navegador u otro. Solo construye algo cuando la receta cambia.
+        """
+        receta = self.robot.receta_actual
+        if receta is None or receta is self._receta_mostrada:
+            return
+        self._receta_mostrada = receta
+        nombre_corto = receta.nombre[:18] + '...' if len(receta.nombre) > 18 else receta.nombre
+        self.dash_receta.set_text(nombre_corto)
+        m, s = divmod(receta.tiempo_total, 60)
+        self.dash_tiempo.set_text(f'{m:02d}:{s:02d}')
+        self._mostrar_receta_activa(receta)
+        self._actualizar_lista_pasos()
+        if self.robot.estado == EstadoRobot.PREPARADO:
+            self._reset_displays()
+
+    def _limpiar_receta_activa(self):
+        self._receta_mostrada = None
+        self.receta_activa_container.clear()
+
     def _mostrar_receta_activa(self, receta):
         self.receta_activa_container.clear()
         with self.receta_activa_container:
@@ -967,26 +1024,26 @@ class MainInterface:
         self._tiempo_inicio = time.time()
         self.robot._simulator.velocidad = self._velocidad_simulacion
         if self.robot.receta_actual:
-            self._exec_id = self.db.start_execution(self.robot.receta_actual, self._porciones_actuales)
+            self._exec_id = await self.db.start_execution(self.robot.receta_actual, self._porciones_actuales)
         
         try:
             completada = await self.robot.comenzar_receta()
             duracion = int(time.time() - self._tiempo_inicio) if self._tiempo_inicio else 0
             if self._exec_id:
-                self.db.finish_execution(self._exec_id, completada=completada, duracion_real=duracion)
-            if completada:
+                await self.db.finish_execution(self._exec_id, completada=completada, duracion_real=duracion)
+            if completada and self._suscripcion.activa:
                 # Pequeña pausa para asegurar que la UI se actualiza
                 await asyncio.sleep(0.2)
-                self._mostrar_dialogo_completado(duracion)
+                await self._mostrar_dialogo_completado(duracion)
         except Exception as e:
             ui.notify(str(e), type='negative')
             if self._exec_id:
-                self.db.finish_execution(self._exec_id, completada=False, duracion_real=0)
+                await self.db.finish_execution(self._exec_id, completada=False, duracion_real=0)
         finally:
             self._ejecutando = False
             self._exec_id = None
 
-    def _mostrar_dialogo_completado(self, duracion_segundos):
+    async def _mostrar_dialogo_completado(self, duracion_segundos):
         receta = self._ultima_receta
         if not receta:
             return
@@ -996,8 +1053,9 @@ class MainInterface:
         m, s = divmod(tiempo_real, 60)
         tiempo_str = f'{m} min' if not s else f'{m}m {s}s'
         
-        # Calcular nutrición
-        nutricion = self._calcular_nutricion(receta.ingredientes, receta.porciones, self._porciones_actuales)
+        # Nutrición por porción del perfil guardado
+        perfil = await self.db.get_recipe_profile(receta.id) if receta.id is not None else None
+        nutricion = perfil.nutricion if perfil else dict.fromkeys(NUTRIENTES, '--')
         
         # Calcular gramos SÓLIDOS por porción (excluir líquidos como agua, caldo, vino)
         factor = self._porciones_actuales / receta.porciones
@@ -1050,42 +1108,41 @@ class MainInterface:
                     ui.label('Añadir nota (opcional)').classes('text-primary').style('font-weight: 500; font-size: 0.75rem; margin-bottom: 6px;')
                     nota_input = ui.textarea(placeholder='Ej: Quedó muy bueno...').props('outlined dense').classes('w-full').style('min-height: 40px;')
                 
-                def cerrar_dialogo():
+                async def cerrar_dialogo():
                     if nota_input.value and nota_input.value.strip():
-                        self.db.add_note(self._receta_completada_id, nota_input.value.strip())
+                        await self.db.add_note(self._receta_completada_id, nota_input.value.strip())
                         ui.notify('Nota guardada', type='positive')
                     dialog.close()
-                    # Resetear el robot a estado IDLE para poder seguir usándolo
-                    self.robot._estado = EstadoRobot.IDLE
-                    self.robot._reset_todo()
-                    self.receta_activa_container.clear()
+                    # Volver a IDLE para seguir usándolo (si nadie ha preparado otra ya)
+                    if self.robot.estado == EstadoRobot.FINALIZADO:
+                        self.controller.descartar_receta()
+                    self._limpiar_receta_activa()
                     self._limpiar_paso()
                     self._reset_displays()
                     self._actualizar_lista_pasos()
                     self._actualizar_botones()
-                    self._cargar_recetas()
+                    await self._cargar_recetas()
                 
                 ui.button('Cerrar', on_click=cerrar_dialogo).props('color=positive no-caps unelevated').classes('w-full')
         
         dialog.open()
 
-    def _cancelar_receta(self):
+    async def _cancelar_receta(self):
         if self.robot.estado == EstadoRobot.PREPARADO:
-            self.robot._estado = EstadoRobot.IDLE
-            self.robot._reset_todo()
-            self.receta_activa_container.clear()
+            self.controller.descartar_receta()
+            self._limpiar_receta_activa()
             self._limpiar_paso()
             self._reset_displays()
             self._actualizar_lista_pasos()
             self._actualizar_botones()
             ui.notify('Receta cancelada', type='warning')
         elif self.robot.estado in (EstadoRobot.EJECUTANDO, EstadoRobot.PAUSADO):
-            if self._exec_id:
-                dur = int(time.time() - self._tiempo_inicio) if self._tiempo_inicio else 0
-                self.db.finish_execution(self._exec_id, completada=False, duracion_real=dur)
-                self._exec_id = None
+            exec_id, self._exec_id = self._exec_id, None
             self.robot.parada_emergencia()
             self._ejecutando = False
+            if exec_id:
+                dur = int(time.time() - self._tiempo_inicio) if self._tiempo_inicio else 0
+                await self.db.finish_execution(exec_id, completada=False, duracion_real=dur)
 
     def _confirmar_emergencia(self):
         if self.robot.estado not in (EstadoRobot.EJECUTANDO, EstadoRobot.PAUSADO):
@@ -1094,12 +1151,20 @@ class MainInterface:
         with ui.dialog() as d, ui.card().classes('p-4 card-custom'):
             ui.label('⚠️ Parada de Emergencia').style('font-weight: 600; color: #ef4444;')
             ui.label('¿Detener la receta inmediatamente?').classes('text-secondary')
+            
+            async def detener():
+                d.close()
+                await self._parada_emergencia()
+            
             with ui.row().classes('justify-end gap-2 mt-3'):
                 ui.button('Cancelar', on_click=d.close).props('flat no-caps')
-                ui.button('Detener', on_click=lambda: (d.close(), self._parada_emergencia())).props('color=negative no-caps')
+                ui.button('Detener', on_click=detener).props('color=negative no-caps')
         d.open()
 
     def _limpiar_paso(self):
+        if self._paso_mostrado == 'esperando':
+            return
+        self._paso_mostrado = 'esperando'
         self.paso_container.clear()
         with self.paso_container:
             self._mostrar_esperando()
@@ -1134,7 +1199,15 @@ class MainInterface:
         self.header_status.set_text(texto)
         self.dash_estado.set_text(dash)
         
+        if estado in (EstadoRobot.PREPARADO, EstadoRobot.EJECUTANDO, EstadoRobot.PAUSADO):
+            self._sincronizar_receta()
+        if estado in (EstadoRobot.APAGADO, EstadoRobot.IDLE, EstadoRobot.PREPARADO) and not self._ejecutando:
+            self._tiempo_inicio = None
+        
         if estado == EstadoRobot.EJECUTANDO:
+            if self._tiempo_inicio is None:
+                # La receta la empezó otro navegador: se cuenta desde que se ve
+                self._tiempo_inicio = time.time()
             self._mostrar_paso_actual()
             self._actualizar_lista_pasos()
         elif estado == EstadoRobot.FINALIZADO:
@@ -1147,7 +1220,7 @@ class MainInterface:
             self._limpiar_paso()
             self._actualizar_lista_pasos()
             if not self.robot.receta_actual:
-                self.receta_activa_container.clear()
+                self._limpiar_receta_activa()
                 self.dash_receta.set_text('Ninguna')
                 self.dash_tiempo.set_text('--:--')
         self._actualizar_botones()
@@ -1184,7 +1257,9 @@ class MainInterface:
         
         params = self.robot.get_parametros_activos()
         self._actualizar_indicadores(params.get('temperatura', 0), params.get('velocidad', 0))
+        # Solo reconstruyen algo cuando cambia el paso; si no, no envían nada
         self._mostrar_paso_actual()
+        self._actualizar_lista_pasos()
 
     def _on_evento(self, msg):
         pass
@@ -1196,6 +1271,11 @@ class MainInterface:
         pasos = self.robot.receta_actual.pasos
         if idx >= len(pasos):
             return
+        # La tarjeta solo cambia con el paso: se construye una vez por paso
+        clave = (self.robot.plan, idx)
+        if self._paso_mostrado == clave:
+            return
+        self._paso_mostrado = clave
         paso = pasos[idx]
         op = paso.get('operacion', paso.get('nombre', 'Paso'))
         icono = self.ICONOS_OPERACION.get(op.lower(), '📌')
@@ -1229,6 +1309,9 @@ class MainInterface:
                             ui.label(f'Vel. {paso["velocidad"]}').style('font-weight: 600; color: white;')
 
     def _mostrar_completado(self):
+        if self._paso_mostrado == 'completado':
+            return
+        self._paso_mostrado = 'completado'
         self.paso_container.clear()
         with self.paso_container:
             with ui.card().classes('w-full p-8 items-center').style('background: linear-gradient(135deg, #10b981, #059669) !important; border: none !important;'):
@@ -1254,7 +1337,7 @@ class MainInterface:
     def _apagar_robot(self):
         try:
             if self.controller.apagar():
-                self.receta_activa_container.clear()
+                self._limpiar_receta_activa()
                 self._limpiar_paso()
                 self._reset_displays()
                 self._actualizar_lista_pasos()
@@ -1276,15 +1359,15 @@ class MainInterface:
         except TareaInvalidaError as e:
             ui.notify(str(e), type='negative')
 
-    def _parada_emergencia(self):
-        if self._exec_id:
-            dur = int(time.time() - self._tiempo_inicio) if self._tiempo_inicio else 0
-            self.db.finish_execution(self._exec_id, completada=False, duracion_real=dur)
-            self._exec_id = None
+    async def _parada_emergencia(self):
+        exec_id, self._exec_id = self._exec_id, None
         self.controller.parada_emergencia()
         self._ejecutando = False
-        self.receta_activa_container.clear()
+        self._limpiar_receta_activa()
         self._limpiar_paso()
         self._reset_displays()
         self._actualizar_lista_pasos()
         ui.notify('Parada de emergencia activada', type='negative')
+        if exec_id:
+            dur = int(time.time() - self._tiempo_inicio) if self._tiempo_inicio else 0
+            await self.db.finish_execution(exec_id, completada=False, duracion_real=dur)
@@ -0,0 +1,94 @@
+"""
+Caché LRU en memoria, acotada y segura entre hilos.
+La usan el DatabaseHandler (recetas y listados), RecipePlan (planes
+compilados) y ResolutorIngredientes (nombres de ingredientes).
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+
+class LRUCache:
+    """
+    Caché LRU thread-safe con límite de tamaño.
+
+    - get()/put() en O(1) sobre un OrderedDict
+    - Al superar `max_size` se expulsa la entrada usada hace más tiempo
+    - Contadores de aciertos, fallos y expulsiones para monitorización
+    """
+
+    _AUSENTE = object()
+
+    def __init__(self, max_size: int = 256):
+        """
+        Args:
+            max_size: Número máximo de entradas (0 desactiva la caché)
+        """
+        if max_size < 0:
+            raise ValueError("El tamaño de la caché no puede ser negativo")
+        self._max_size = max_size
+        self._datos: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._expulsiones = 0
+
+    def get(self, clave: Hashable, defecto: Any = None) -> Any:
+        """Devuelve el valor cacheado (y lo marca como reciente) o `defecto`."""
+        with self._lock:
+            valor = self._datos.get(clave, self._AUSENTE)
+            if valor is self._AUSENTE:
+                self._misses += 1
+                return defecto
+            self._datos.move_to_end(clave)
+            self._hits += 1
+            return valor
+
+    def put(self, clave: Hashable, valor: Any) -> None:
+        """Guarda un valor, expulsando el menos reciente si hace falta."""
+        if self._max_size == 0:
+            return
+        with self._lock:
+            self._datos[clave] = valor
+            self._datos.move_to_end(clave)
+            while len(self._datos) > self._max_size:
+                self._datos.popitem(last=False)
+                self._expulsiones += 1
+
+    def invalidate(self, clave: Hashable) -> None:
+        """Elimina una entrada concreta."""
+        with self._lock:
+            self._datos.pop(clave, None)
+
+    def invalidate_where(self, predicado: Callable[[Hashable], bool]) -> int:
+        """Elimina las entradas cuya clave cumple el predicado."""
+        with self._lock:
+            claves = [k for k in self._datos if predicado(k)]
+            for k in claves:
+                del self._datos[k]
+        return len(claves)
+
+    def clear(self) -> None:
+        """Vacía la caché (conserva los contadores)."""
+        with self._lock:
+            self._datos.clear()
+
+    def __len__(self) -> int:
+        return len(self._datos)
+
+    def __contains__(self, clave: Hashable) -> bool:
+        return clave in self._datos
+
+    def get_stats(self) -> dict:
+        """Contadores de la caché."""
+        with self._lock:
+            total = self._hits + self._misses
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / total, 3) if total else 0.0,
+                "expulsiones": self._expulsiones,
+                "tamaño": len(self._datos),
+                "max_size": self._max_size,
+            }
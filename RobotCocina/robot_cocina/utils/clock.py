@@ -0,0 +1,194 @@
+"""
+=================================================================
+RELOJES DE SIMULACIÓN
+=================================================================
+Abstracción del paso del tiempo para CookingSimulator y Robot.
+
+- RelojReal: tiempo de pared (reloj monotónico + bucle asyncio)
+- RelojVirtual: el tiempo avanza al instante hasta el siguiente
+  plazo pendiente, en el mismo orden que en tiempo real. Permite
+  validar recetas completas y planificar capacidad sin esperar.
+
+PARTICIPANTES (solo relevante en el reloj virtual):
+Un participante es un actor que programa esperas en el reloj (un
+simulador durante una receta). El reloj virtual solo salta al
+siguiente plazo cuando TODOS los participantes están esperando;
+así nadie se queda atrás mientras otro avanza el tiempo.
+- dormir_hasta(): para participantes ya registrados con entrar()
+- dormir(): para cualquier corrutina; participa solo mientras espera
+- interrumpir(): despierta una espera desde fuera (detener); el reloj
+  la da por terminada en el acto, no cuando la corrutina despierte
+=================================================================
+"""
+
+import asyncio
+import heapq
+import itertools
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, List, Tuple
+
+
+def _resolver(espera: asyncio.Future) -> None:
+    """Despierta una espera si sigue pendiente."""
+    if not espera.done():
+        espera.set_result(None)
+
+
+class Reloj(ABC):
+    """
+    Interfaz común de los relojes.
+
+    ABSTRACCIÓN: el simulador solo pregunta la hora y espera plazos;
+    no sabe si el tiempo es real o virtual.
+    """
+
+    @abstractmethod
+    def ahora(self) -> float:
+        """Instante actual en segundos (monotónico)."""
+        pass
+
+    @abstractmethod
+    async def dormir_hasta(self, instante: float, espera: asyncio.Future) -> None:
+        """
+        Espera hasta `instante` (el llamante debe ser participante).
+
+        Args:
+            instante: Plazo en la escala de ahora()
+            espera: Futuro de la espera; interrumpir(espera) la despierta antes
+        """
+        pass
+
+    def interrumpir(self, espera: asyncio.Future) -> None:
+        """Despierta una espera de dormir_hasta() antes de su plazo."""
+        _resolver(espera)
+
+    async def dormir(self, segundos: float) -> None:
+        """Espera `segundos` (sin posibilidad de interrupción)."""
+        espera = asyncio.get_running_loop().create_future()
+        self.entrar()
+        try:
+            await self.dormir_hasta(self.ahora() + segundos, espera)
+        finally:
+            self.salir()
+
+    def entrar(self) -> None:
+        """Registra un participante activo."""
+
+    def salir(self) -> None:
+        """Da de baja un participante activo."""
+
+
+class RelojReal(Reloj):
+    """Tiempo de pared: los plazos se cumplen con temporizadores del bucle."""
+
+    def ahora(self) -> float:
+        return time.monotonic()
+
+    async def dormir_hasta(self, instante: float, espera: asyncio.Future) -> None:
+        loop = asyncio.get_running_loop()
+        temporizador = loop.call_later(max(0.0, instante - self.ahora()), _resolver, espera)
+        try:
+            await espera
+        finally:
+            temporizador.cancel()
+
+
+class _EsperaVirtual:
+    """Entrada de la cola de plazos del reloj virtual."""
+
+    __slots__ = ('espera', 'disparada', 'interrumpida')
+
+    def __init__(self, espera: asyncio.Future):
+        self.espera = espera
+        self.disparada = False
+        self.interrumpida = False
+
+
+class RelojVirtual(Reloj):
+    """
+    Reloj de simulación por eventos discretos.
+
+        reloj = RelojVirtual()
+        robot = Robot(reloj=reloj)
+        ...
+        await robot.comenzar_receta()   # termina al instante
+        reloj.ahora()                   # segundos "simulados" transcurridos
+
+    - Los plazos se guardan en un heap ordenado por (instante, orden de llegada)
+    - Cuando todos los participantes esperan, se despierta SOLO el plazo
+      más temprano y el tiempo salta hasta él
+    - Cada tick y cada transición se emite igual que en tiempo real
+    """
+
+    def __init__(self, inicio: float = 0.0):
+        """
+        Args:
+            inicio: Instante inicial del reloj en segundos
+        """
+        self._ahora = inicio
+        self._cola: List[Tuple[float, int, _EsperaVirtual]] = []
+        self._orden = itertools.count()
+        self._activos = 0
+        self._esperando = 0
+        self._entradas: Dict[asyncio.Future, _EsperaVirtual] = {}
+
+    def ahora(self) -> float:
+        return self._ahora
+
+    def entrar(self) -> None:
+        self._activos += 1
+
+    def salir(self) -> None:
+        self._activos = max(0, self._activos - 1)
+        # El que sale puede ser el último que faltaba por esperar
+        self._avanzar()
+
+    async def dormir_hasta(self, instante: float, espera: asyncio.Future) -> None:
+        entrada = _EsperaVirtual(espera)
+        heapq.heappush(self._cola, (instante, next(self._orden), entrada))
+        self._entradas[espera] = entrada
+        self._esperando += 1
+        self._avanzar()
+        try:
+            if espera.done():
+                # Era el plazo más temprano y ya se ha disparado: ceder el bucle
+                # una vez para que otras corrutinas (órdenes de parada, nuevos
+                # participantes) no esperen a que termine la simulación entera
+                await asyncio.sleep(0)
+            else:
+                await espera
+        finally:
+            del self._entradas[espera]
+            if not (entrada.disparada or entrada.interrumpida):
+                # Cancelada o resuelta sin interrumpir(): se descuenta al despertar
+                self._esperando -= 1
+
+    def interrumpir(self, espera: asyncio.Future) -> None:
+        # Descontar ya: hasta que la corrutina despierte sigue contando
+        # como esperando y otro participante podría hacer avanzar el tiempo
+        entrada = self._entradas.get(espera)
+        if entrada is not None and not espera.done():
+            entrada.interrumpida = True
+            self._esperando -= 1
+        _resolver(espera)
+
+    def _avanzar(self) -> None:
+        """Dispara el plazo más temprano si no queda ningún participante activo."""
+        while self._cola and self._esperando >= self._activos:
+            instante, _, entrada = heapq.heappop(self._cola)
+            if entrada.espera.done():
+                continue
+            self._ahora = max(self._ahora, instante)
+            entrada.disparada = True
+            self._esperando -= 1
+            entrada.espera.set_result(None)
+            return
+
+    @property
+    def pendientes(self) -> int:
+        """Plazos en cola (incluye los ya interrumpidos aún no descartados)."""
+        return len(self._cola)
+
+    def __repr__(self) -> str:
+        return f"RelojVirtual(ahora={self._ahora:.3f}s, activos={self._activos}, esperando={self._esperando})"
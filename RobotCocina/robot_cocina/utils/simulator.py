@@ -9,13 +9,28 @@ USO DE ASYNC/AWAIT:
 - La UI permanece responsive durante la simulación
 - Compatible con el event loop de NiceGUI
 
+RELOJ INYECTABLE (utils.clock):
+- RelojReal por defecto; RelojVirtual para simular sin esperar
+
+ESPERAS POR EVENTOS (sin sondeo):
+- En pausa, la corrutina espera un asyncio.Event: cero despertares
+- detener() interrumpe al instante la espera del tick en curso
+
+TICKS POR PLAZOS (sin deriva acumulada):
+- El tick i vence en inicio + i * intervalo (reloj monotónico)
+- Los ticks que llegan tarde se agrupan en uno solo con el progreso actual
+- La deriva medida de cada paso queda en `ultima_deriva`
+
 =================================================================
 """
 
 import asyncio
+from contextlib import contextmanager
 from typing import Callable, Optional
 from threading import Lock
 
+from utils.clock import Reloj, RelojReal
+
 
 class CookingSimulator:
     """
@@ -25,21 +40,40 @@ class CookingSimulator:
     - Simula el paso del tiempo de forma acelerada
     - Soporta pausa y reanudación
     - Callbacks para actualización de progreso
-    - Thread-safe
+    - Thread-safe: pausar/reanudar/detener pueden llamarse desde otro
+      hilo; los eventos se tocan siempre desde el bucle de la simulación
     """
     
-    def __init__(self, velocidad_multiplicador: float = 0.01):
+    def __init__(self, velocidad_multiplicador: float = 0.01, reloj: Optional[Reloj] = None):
         """
         Args:
             velocidad_multiplicador: Factor de velocidad.
                 0.01 = 100x más rápido (1 minuto real = 0.6 segundos simulados)
                 0.1 = 10x más rápido
                 1.0 = tiempo real
+            reloj: Fuente de tiempo (por defecto, RelojReal)
         """
         self._velocidad = velocidad_multiplicador
+        self._reloj = reloj or RelojReal()
+        self._unido = False
+        self._en_pausa = False
+        self._sesiones = 0
         self._pausado = False
         self._detenido = False
         self._lock = Lock()  # Thread safety
+        
+        # Sincronización con el bucle de la simulación en curso
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._reanudado: Optional[asyncio.Event] = None
+        self._espera: Optional[asyncio.Future] = None
+        
+        # Medidas de la última simulación
+        self._ultima_deriva: float = 0.0
+        self._ticks_agrupados: int = 0
+    
+    @property
+    def reloj(self) -> Reloj:
+        return self._reloj
     
     @property
     def velocidad(self) -> float:
@@ -71,6 +105,12 @@ class CookingSimulator:
         with self._lock:
             self._detenido = False
             self._pausado = False
+            # Eventos nuevos en cada simulación: quedan ligados al bucle actual
+            self._loop = asyncio.get_running_loop()
+            self._reanudado = asyncio.Event()
+            self._reanudado.set()
+        self._ultima_deriva = 0.0
+        self._ticks_agrupados = 0
         
         # Validar duración
         if duracion <= 0:
@@ -85,29 +125,69 @@ class CookingSimulator:
         num_pasos = min(duracion, 100)
         num_pasos = max(num_pasos, 10)  # Mínimo 10 actualizaciones
         
-        intervalo = duracion_real / num_pasos
-        
         print(f"[SIMULATOR] Iniciando: {duracion}s -> {duracion_real:.2f}s real ({num_pasos} pasos)")
         
         # Callback inicial
         self._safe_callback(callback_progreso, 0, duracion)
         
-        # Bucle de simulación
-        for i in range(1, num_pasos + 1):
+        # El simulador participa en el reloj mientras simula (y durante toda
+        # la sesión si la hay): el reloj virtual no avanza sin él
+        self._unirse()
+        try:
+            return await self._ejecutar_ticks(duracion, duracion_real, num_pasos, callback_progreso)
+        finally:
+            if not self._sesiones:
+                self._separarse()
+    
+    async def _ejecutar_ticks(
+        self,
+        duracion: int,
+        duracion_real: float,
+        num_pasos: int,
+        callback_progreso: Callable[[int, int], None]
+    ) -> bool:
+        """Bucle de ticks de simular_tarea. True si completó, False si se detuvo."""
+        intervalo = duracion_real / num_pasos
+        
+        # Bucle de simulación: cada tick se programa desde el instante inicial,
+        # así el coste de los callbacks y la latencia del bucle no se acumulan
+        reloj = self._reloj
+        inicio = reloj.ahora()
+        i = 0
+        while i < num_pasos:
             # Verificar detención
             if self._detenido:
                 print("[SIMULATOR] Detenido")
                 return False
             
-            # Manejar pausa
-            while self._pausado and not self._detenido:
-                await asyncio.sleep(0.05)
+            # Manejar pausa (espera al evento, sin despertares)
+            if self._pausado:
+                inicio_pausa = reloj.ahora()
+                # En pausa no se participa: el resto de simuladores sigue avanzando
+                self._separarse()
+                self._en_pausa = True
+                try:
+                    await self._reanudado.wait()
+                finally:
+                    self._en_pausa = False
+                    self._unirse()
+                # El tiempo en pausa desplaza todos los plazos pendientes
+                inicio += reloj.ahora() - inicio_pausa
             
             if self._detenido:
                 return False
             
-            # Esperar intervalo
-            await asyncio.sleep(intervalo)
+            # Esperar al plazo del siguiente tick (detener() lo interrumpe)
+            await self._dormir_hasta(inicio + (i + 1) * intervalo)
+            if self._detenido:
+                print("[SIMULATOR] Detenido")
+                return False
+            
+            # Ticks vencidos: se salta al más reciente en lugar de encadenarlos
+            vencidos = int((reloj.ahora() - inicio) / intervalo)
+            siguiente = min(num_pasos, max(i + 1, vencidos))
+            self._ticks_agrupados += siguiente - (i + 1)
+            i = siguiente
             
             # Calcular progreso
             tiempo_simulado = int((i / num_pasos) * duracion)
@@ -115,12 +195,84 @@ class CookingSimulator:
             # Notificar progreso
             self._safe_callback(callback_progreso, tiempo_simulado, duracion)
         
+        # Deriva: duración medida (sin pausas) frente a la nominal
+        self._ultima_deriva = reloj.ahora() - inicio - duracion_real
+        
         # Asegurar 100%
         self._safe_callback(callback_progreso, duracion, duracion)
         
-        print("[SIMULATOR] Completado ✓")
+        print(f"[SIMULATOR] Completado ✓ (deriva {self._ultima_deriva * 1000:+.1f} ms)")
         return True
     
+    async def _dormir_hasta(self, instante: float) -> None:
+        """Espera hasta `instante` (escala del reloj) o hasta que detener() la despierte."""
+        espera = self._loop.create_future()
+        self._espera = espera
+        try:
+            await self._reloj.dormir_hasta(instante, espera)
+        finally:
+            self._espera = None
+    
+    # ==================== PARTICIPACIÓN EN EL RELOJ ====================
+    
+    def _unirse(self) -> None:
+        if not self._unido:
+            self._unido = True
+            self._reloj.entrar()
+    
+    def _separarse(self) -> None:
+        if self._unido:
+            self._unido = False
+            self._reloj.salir()
+    
+    @contextmanager
+    def sesion(self):
+        """
+        Mantiene al simulador como participante del reloj entre tareas.
+        
+        El Robot ejecuta cada receta dentro de una sesión: así, con un
+        reloj virtual compartido, ningún otro simulador adelanta el tiempo
+        mientras este pasa de un paso al siguiente. Las sesiones se pueden
+        anidar (p. ej. un lote de recetas que contiene cada receta).
+        """
+        self._sesiones += 1
+        self._unirse()
+        try:
+            yield self
+        finally:
+            self._sesiones -= 1
+            if not self._sesiones:
+                self._separarse()
+    
+    def _en_bucle(self, funcion: Callable[[], None]) -> None:
+        """Ejecuta `funcion` en el bucle de la simulación (desde cualquier hilo)."""
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        try:
+            mismo_bucle = asyncio.get_running_loop() is loop
+        except RuntimeError:
+            mismo_bucle = False
+        if mismo_bucle:
+            funcion()
+        else:
+            loop.call_soon_threadsafe(funcion)
+    
+    def _al_reanudar(self) -> None:
+        """Libera la pausa y vuelve a participar en el reloj en el acto."""
+        if self._en_pausa:
+            # Sin esperar a que la corrutina despierte: si no, un reloj
+            # virtual podría avanzar antes de que el simulador vuelva
+            self._unirse()
+        self._reanudado.set()
+    
+    def _despertar(self) -> None:
+        """Libera la pausa y la espera en curso (tras detener)."""
+        if self._reanudado is not None:
+            self._reanudado.set()
+        if self._espera is not None:
+            self._reloj.interrumpir(self._espera)
+    
     def _safe_callback(
         self,
         callback: Callable[[int, int], None],
@@ -137,12 +289,16 @@ class CookingSimulator:
         """Pausa la simulación."""
         with self._lock:
             self._pausado = True
+            if self._reanudado is not None:
+                self._en_bucle(self._reanudado.clear)
         print("[SIMULATOR] Pausado")
     
     def reanudar(self) -> None:
         """Reanuda la simulación."""
         with self._lock:
             self._pausado = False
+            if self._reanudado is not None:
+                self._en_bucle(self._al_reanudar)
         print("[SIMULATOR] Reanudado")
     
     def detener(self) -> None:
@@ -150,6 +306,7 @@ class CookingSimulator:
         with self._lock:
             self._detenido = True
             self._pausado = False
+            self._en_bucle(self._despertar)
         print("[SIMULATOR] Detenido")
     
     def reset(self) -> None:
@@ -157,6 +314,18 @@ class CookingSimulator:
         with self._lock:
             self._detenido = False
             self._pausado = False
+            if self._reanudado is not None:
+                self._en_bucle(self._reanudado.set)
+    
+    @property
+    def ultima_deriva(self) -> float:
+        """Segundos de más (o de menos) que tardó la última tarea completada."""
+        return self._ultima_deriva
+    
+    @property
+    def ticks_agrupados(self) -> int:
+        """Ticks que llegaron tarde y se agruparon en la última simulación."""
+        return self._ticks_agrupados
     
     @property
     def esta_pausado(self) -> bool: